@@ -0,0 +1,75 @@
+"""
+Measures the solver calls and the wall time of BMC with windows of bounds
+(`--bmc-step`, `--bmc-geometric`) against the step-by-step loop, which issues
+one solver call per bound.
+
+Every configuration checks the first query of each task up to the maximal
+bound and reports the depth of the counterexample it finds, which must be the
+same for all configurations.
+
+Usage:
+$ python -m benchmarks.bmc_jump examples/QF_ABV/count2.moxi.json examples/QF_ABV/recount4.moxi.json
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from pysmt.environment import reset_env
+from pysmt.shortcuts import Not
+from moxichecker.model_checking import BMCInduction, BoundJumpingBMC
+from moxichecker.stats import STATS
+from moxichecker.tasks import load_task
+
+# name -> keyword arguments of BoundJumpingBMC, None for the step-by-step loop
+CONFIGURATIONS = {
+    "step-by-step": None,
+    "step 4": {"step": 4},
+    "step 16": {"step": 16},
+    "geometric 1": {"step": 1, "geometric": True},
+    "geometric 4": {"step": 4, "geometric": True},
+}
+
+
+def _measure(task: str, solver: str, config: dict, max_bound: int) -> tuple:
+    """Returns the depth of the counterexample, the solver calls and the time"""
+    reset_env()
+    STATS.reset()
+    STATS.enable()
+    system, queries = load_task(task)
+    prop = Not(queries[0][1])
+    start = time.perf_counter()
+    if config is None:
+        prover = BMCInduction(system, solver, check_ind=False, max_bound=max_bound)
+    else:
+        prover = BoundJumpingBMC(system, solver, max_bound=max_bound, **config)
+    verdict = prover.check_property(prop)
+    duration = time.perf_counter() - start
+    calls = sum(1 for event in STATS.events if event["event"] == "bmc")
+    trace = prover.traces.get(prop)
+    depth = len(trace) - 1 if verdict is False else None
+    return depth, calls, duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("tasks", metavar="FILE", nargs="+")
+    parser.add_argument("--solver", default="z3")
+    parser.add_argument("--max-bound", type=int, default=100)
+    args = parser.parse_args()
+
+    print(
+        f"{'task':<20} {'configuration':<15} {'depth':>6} {'calls':>6} {'time [s]':>9}"
+    )
+    for task in args.tasks:
+        for name, config in CONFIGURATIONS.items():
+            depth, calls, duration = _measure(task, args.solver, config, args.max_bound)
+            depth = "-" if depth is None else depth
+            print(
+                f"{Path(task).name.split('.')[0]:<20} {name:<15} "
+                f"{depth:>6} {calls:>6} {duration:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
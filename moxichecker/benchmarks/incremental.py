@@ -0,0 +1,104 @@
+"""
+Measures the latency per bound of the incremental BMC/k-induction engine with
+activation-literal assumptions against the former push-per-step encoding, for
+every available solver backend.
+
+The former encoding asserted each step in a new scope (`push()` per bound) and
+passed the query to `is_sat`, so the scope depth grew with the bound.
+
+Usage:
+$ python -m benchmarks.incremental examples/QF_LIA/CounterReset.moxi.json --max-bound 50
+"""
+
+import argparse
+import time
+
+from pysmt.exceptions import NoSolverAvailableError
+from pysmt.shortcuts import And, Not, TRUE
+from moxichecker.model_checking import BMCInductionIncr
+from moxichecker.tasks import load_task
+
+BACKENDS = ["btor", "cvc5", "msat", "yices", "z3"]
+
+
+class _PushPerStep(BMCInductionIncr):
+    """The former incremental encoding with one solver scope per bound"""
+
+    def _check_bmc(self, prop, k):
+        while self._bmc_bound < k:
+            self._bmc_bound += 1
+            self._push_bmc_constr(self._bmc_bound)
+            self.bmc_solver.push()
+        return self.bmc_solver.is_sat(Not(self._at_time(prop, k)))
+
+    def _check_kind(self, prop, k, invariants=()):
+        while self._kind_bound < k:
+            self._kind_bound += 1
+            b = self._kind_bound
+            if b == 0:
+                self.ind_solver.add_assertion(self._at_time(self.system.inv, 0))
+            else:
+                sp_constrs = (
+                    self._get_simple_path_row(b - 1)
+                    if self.use_simple_path and not self.lazy_simple_path
+                    else TRUE()
+                )
+                self.ind_solver.add_assertion(
+                    And(
+                        self.system.get_step(b - 1),
+                        self._at_time(prop, b - 1),
+                        sp_constrs,
+                    )
+                )
+            self.ind_solver.push()
+        return not self.ind_solver.is_sat(Not(self._at_time(prop, k)))
+
+
+def _measure(prover_class, system, solver: str, prop, max_bound: int) -> list:
+    prover = prover_class(system, solver)
+    latencies = []
+    for b in range(max_bound + 1):
+        start = time.perf_counter()
+        prover._check_bmc(prop, b)
+        prover._check_kind(prop, b)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("task", metavar="FILE")
+    parser.add_argument("--max-bound", type=int, default=30)
+    parser.add_argument("--step", type=int, default=5)
+    parser.add_argument(
+        "-s",
+        "--solver",
+        action="append",
+        dest="solvers",
+        help="backend to measure (repeatable, default: all)",
+    )
+    args = parser.parse_args()
+
+    system, queries = load_task(args.task)
+    prop = Not(queries[0][1])
+    bounds = list(range(0, args.max_bound + 1, args.step))
+    print(f"{'solver':>6} {'encoding':>12} " + " ".join(f"{b:>8}" for b in bounds))
+    for solver in args.solvers or BACKENDS:
+        for name, prover_class in [
+            ("push", _PushPerStep),
+            ("assumptions", BMCInductionIncr),
+        ]:
+            try:
+                latencies = _measure(prover_class, system, solver, prop, args.max_bound)
+            except NoSolverAvailableError:
+                print(f"{solver:>6} {name:>12} not available")
+                break
+            print(
+                f"{solver:>6} {name:>12} "
+                + " ".join(f"{latencies[b] * 1000:>8.2f}" for b in bounds)
+            )
+    print("(latency of the BMC and k-induction checks per bound in ms)")
+
+
+if __name__ == "__main__":
+    main()
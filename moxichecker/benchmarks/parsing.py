@@ -0,0 +1,58 @@
+"""
+Compares the time for reading the commands of a MoXI task from the .moxi file
+(S-expression reader) against the pre-converted .moxi.json file.
+
+Every .moxi file with a .moxi.json counterpart below the given directories is
+parsed, and the selected system is looked up as in `main`.
+
+Usage:
+$ python -m benchmarks.parsing examples --rounds 50
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from moxichecker.loader import load_commands
+from moxichecker.moxi2smt import (
+    get_check_system,
+    get_define_system,
+    get_logic,
+)
+
+
+def _measure(path: Path, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        commands = load_commands(str(path))
+        get_logic(commands)
+        check_sys_cmd = get_check_system(commands)
+        get_define_system(commands, check_sys_cmd["symbol"])
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directories", metavar="DIR", nargs="+")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    tasks = sorted(
+        path
+        for directory in args.directories
+        for path in Path(directory).rglob("*.moxi")
+        if path.with_name(path.name + ".json").exists()
+    )
+    print(f"{'task':<40} {'moxi [ms]':>10} {'json [ms]':>10}")
+    total_moxi = total_json = 0.0
+    for path in tasks:
+        moxi = _measure(path, args.rounds)
+        json = _measure(path.with_name(path.name + ".json"), args.rounds)
+        total_moxi += moxi
+        total_json += json
+        print(f"{path.name:<40} {moxi * 1000:>10.3f} {json * 1000:>10.3f}")
+    print(f"{'total':<40} {total_moxi * 1000:>10.3f} {total_json * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measures the start-up time of the command-line tool: `--version`, `--help`
+and an invalid argument must not load pySMT, and a small task shows how much
+of a run is spent in starting the interpreter and importing pySMT.
+
+Every command is run in a fresh interpreter. The report also lists whether
+pySMT was imported and the modules that took longest to import, as reported
+by `python -X importtime`.
+
+Usage:
+$ python benchmarks/startup.py examples/QF_LIA/IntCounter_reach.moxi.json --rounds 10
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+_IMPORT_TIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _run(args: list) -> subprocess.CompletedProcess:
+    # the run with an invalid argument fails on purpose
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def _measure(args: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        _run(args)
+    return (time.perf_counter() - start) / rounds
+
+
+def _get_imports(args: list) -> dict:
+    """Returns the cumulative import time in seconds of every top-level import"""
+    imports = {}
+    for line in _run(["-X", "importtime", *args]).stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match and len(match.group(2)) == 1:
+            imports[match.group(3)] = int(match.group(1)) / 1e6
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("task", metavar="FILE")
+    parser.add_argument("--solver", default="z3")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    checker = ["-m", "moxichecker.main"]
+    commands = {
+        "python": ["-c", "pass"],
+        "--version": [*checker, "--version"],
+        "--help": [*checker, "--help"],
+        "invalid argument": [*checker, "--mc-alg", "none", args.task],
+        "import pysmt.shortcuts": ["-c", "import pysmt.shortcuts"],
+        "task": [*checker, "-s", args.solver, args.task],
+    }
+    print(f"{'command':<25} {'time [ms]':>10} {'pysmt':>6}")
+    for name, command in commands.items():
+        duration = _measure(command, args.rounds)
+        imports = _get_imports(command)
+        pysmt = "yes" if "pysmt" in imports or "pysmt.shortcuts" in imports else "no"
+        print(f"{name:<25} {duration * 1000:>10.1f} {pysmt:>6}")
+
+    print("\nslowest top-level imports of the task:")
+    imports = _get_imports(commands["task"])
+    for module, seconds in sorted(imports.items(), key=lambda i: -i[1])[:10]:
+        print(f"{module:<40} {seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compares building the substitution maps x -> x@t, x' -> x@(t+1) per call
+(the former `_get_subs`) against the interned timed-symbol table of
+`TransitionSystem`.
+
+Usage:
+$ python -m benchmarks.timed_symbols examples/QF_ABV/recount4.moxi.json --frames 100
+"""
+
+import argparse
+import json
+import time
+
+from moxichecker.moxi2smt import (
+    at_time,
+    get_check_system,
+    get_define_system,
+    get_logic,
+    next_var,
+    TransitionSystem,
+)
+
+
+def _get_subs_per_call(system: TransitionSystem, i: int) -> dict:
+    subs_i = {}
+    for v in system.variables:
+        subs_i[v] = at_time(v, i)
+        subs_i[next_var(v)] = at_time(v, i + 1)
+    return subs_i
+
+
+def _measure(get_subs, system: TransitionSystem, frames: int, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for i in range(frames):
+            get_subs(system, i)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("moxi_json", metavar="FILE")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.moxi_json) as f:
+        moxi_json = json.load(f)
+    logic = get_logic(moxi_json)
+    check_sys_cmd = get_check_system(moxi_json)
+    system = TransitionSystem(
+        get_define_system(moxi_json, check_sys_cmd["symbol"]), logic
+    )
+
+    calls = args.frames * args.rounds
+    for name, get_subs in [
+        ("per call", _get_subs_per_call),
+        ("interned", TransitionSystem.get_subs),
+    ]:
+        elapsed = _measure(get_subs, system, args.frames, args.rounds)
+        print(
+            f"{name:>10}: {elapsed:8.4f} s total, "
+            f"{elapsed / calls * 1e6:8.2f} us per map "
+            f"({len(system.variables)} variables)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the translation of MoXI-JSON terms with and without the term cache
+of `_FormulaBuilder`.
+
+Each formula of the system (init, trans, inv) is translated by a new builder,
+as when a system is loaded. With --repeat N, trans is translated as the
+conjunction of N copies of itself, whose subterms are repeated in the JSON
+tree as in generated tasks.
+
+Usage:
+$ python -m benchmarks.translation examples/QF_ABV/recount4.moxi.json --repeat 10
+"""
+
+import argparse
+import json
+import time
+
+from moxichecker.moxi2smt import (
+    _FormulaBuilder,
+    _get_variables,
+    get_check_system,
+    get_define_system,
+    get_logic,
+)
+
+
+class _NoCache(dict):
+    """A term cache that stores nothing"""
+
+    def __setitem__(self, key, value):
+        pass
+
+
+class _UncachedBuilder(_FormulaBuilder):
+    def __init__(self, logic: str, variables: dict):
+        super().__init__(logic, variables)
+        self._cache = _NoCache()
+
+
+def _measure(builder_class, logic: str, variables: dict, terms: list, rounds: int):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for term in terms:
+            builder_class(logic, variables).build(term)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("moxi_json", metavar="FILE")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    with open(args.moxi_json) as f:
+        moxi_json = json.load(f)
+    logic = get_logic(moxi_json)
+    check_sys_cmd = get_check_system(moxi_json)
+    def_sys_cmd = get_define_system(moxi_json, check_sys_cmd["symbol"])
+    variables = _get_variables(def_sys_cmd)
+    trans = def_sys_cmd["trans"]
+    if args.repeat > 1:
+        trans = {"identifier": {"symbol": "and"}, "args": [trans] * args.repeat}
+    terms = [def_sys_cmd["init"], trans, def_sys_cmd["inv"]]
+
+    builder = _FormulaBuilder(logic, variables)
+    for term in terms:
+        builder.build(term)
+    print(f"{builder.num_terms} terms, {builder.num_cached} cache hits")
+    for name, builder_class in [
+        ("uncached", _UncachedBuilder),
+        ("cached", _FormulaBuilder),
+    ]:
+        elapsed = _measure(builder_class, logic, variables, terms, args.rounds)
+        print(f"{name:>10}: {elapsed / args.rounds * 1e3:8.3f} ms per system")
+
+
+if __name__ == "__main__":
+    main()
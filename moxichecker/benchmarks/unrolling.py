@@ -0,0 +1,63 @@
+"""
+Measures the time spent on building the BMC and k-induction encodings per bound.
+
+Only the formulas are constructed, no solver is queried, so the numbers show the
+cost of the unrolling itself. With the per-step cache the time per bound grows
+linearly with the bound instead of quadratically.
+
+Usage:
+$ python -m benchmarks.unrolling examples/QF_LIA/CounterReset.moxi.json --max-bound 200
+"""
+
+import argparse
+import json
+import time
+
+from pysmt.shortcuts import Not
+from moxichecker.moxi2smt import (
+    get_check_system,
+    get_define_system,
+    get_logic,
+    get_query,
+    TransitionSystem,
+)
+from moxichecker.model_checking import BMCInduction
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("moxi_json", metavar="FILE")
+    parser.add_argument("--max-bound", type=int, default=100)
+    parser.add_argument("--step", type=int, default=10)
+    parser.add_argument("-s", "--solver", default="z3")
+    parser.add_argument(
+        "--simple-path",
+        action="store_true",
+        help="include the (eager) simple-path constraints in the encoding",
+    )
+    args = parser.parse_args()
+
+    with open(args.moxi_json) as f:
+        moxi_json = json.load(f)
+    logic = get_logic(moxi_json)
+    check_sys_cmd = get_check_system(moxi_json)
+    system = TransitionSystem(
+        get_define_system(moxi_json, check_sys_cmd["symbol"]), logic
+    )
+    prop = Not(get_query(check_sys_cmd, logic)[1])
+    prover = BMCInduction(system, args.solver, use_simple_path=args.simple_path)
+
+    print(f"{'bound':>6} {'encode [ms]':>12} {'total [s]':>10}")
+    total = 0.0
+    for b in range(args.max_bound + 1):
+        start = time.perf_counter()
+        prover._get_bmc_query(prop, b)
+        prover._get_kind_query(prop, b)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        if b % args.step == 0:
+            print(f"{b:>6} {elapsed * 1000:>12.3f} {total:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Batch benchmarking of MoXIchecker over a corpus of verification tasks.
+
+Every task found below the given directories is checked with every
+combination of the requested algorithms and solvers. Each run is a separate
+process with its own time and memory limit; the verdicts are compared with the
+expected results encoded in the task names (`*_reach*` is unsafe,
+`*_unreach*` is safe), and the results are written as CSV and/or JSON.
+
+The memory limit is set with `prlimit` (util-linux) before the checker starts.
+A run that exceeds the time limit is killed with the process groups of all its
+processes. This includes the model checker of a run with `--timeout` in
+`--options`, which has a session of its own (see `_check_in_process`).
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from moxichecker.options import (
+    MC_ALGORITHMS,
+    SOLVERS,
+    combine_verdicts,
+    format_verdict,
+)
+
+DEFAULT_SUFFIXES = [".moxi.json"]
+
+# fields of the --stats report copied into the results
+_STATS_FIELDS = ["parse_time", "construction_time", "bound", "safe_bound", "solve_time"]
+
+_FIELDS = [
+    "task",
+    "mc_alg",
+    "solver",
+    "options",
+    "expected",
+    "verdict",
+    "status",
+    "wall_time",
+    "cpu_time",
+    "max_rss_mb",
+    *_STATS_FIELDS,
+]
+
+
+def _get_args(argv: Optional[list]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="MoXIchecker benchmark harness: runs every task under every "
+        "algorithm/solver combination"
+    )
+    parser.add_argument(
+        "directories",
+        metavar="DIR",
+        nargs="+",
+        help="directories that are searched recursively for tasks",
+    )
+    parser.add_argument(
+        "-m",
+        "--mc-alg",
+        metavar="STR",
+        action="append",
+        choices=MC_ALGORITHMS,
+        help="model-checking algorithm to run (repeatable, default: 'kind')",
+    )
+    parser.add_argument(
+        "-s",
+        "--solver",
+        metavar="STR",
+        action="append",
+        choices=SOLVERS,
+        help="backend SMT solver to use (repeatable, default: 'msat')",
+    )
+    parser.add_argument(
+        "--options",
+        metavar="ARGS",
+        default="",
+        help="further options passed to every run, e.g. --options='--preprocess'",
+    )
+    parser.add_argument(
+        "--suffix",
+        metavar="STR",
+        action="append",
+        help="file suffix of the tasks (repeatable, "
+        f"default: {', '.join(repr(s) for s in DEFAULT_SUFFIXES)})",
+    )
+    parser.add_argument(
+        "--timeout",
+        metavar="SEC",
+        type=float,
+        default=60.0,
+        help="wall-clock time limit per run (default: 60)",
+    )
+    parser.add_argument(
+        "--memory",
+        metavar="MB",
+        type=int,
+        default=4096,
+        help="address-space limit per run (default: 4096)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=os.cpu_count(),
+        help="number of runs executed in parallel (default: number of CPUs)",
+    )
+    parser.add_argument("--csv", metavar="FILE", help="write the results to FILE")
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    args = parser.parse_args(argv)
+    args.mc_alg = args.mc_alg or ["kind"]
+    args.solver = args.solver or ["msat"]
+    args.suffix = args.suffix or DEFAULT_SUFFIXES
+    return args
+
+
+def get_expected_verdict(task: Path) -> Optional[bool]:
+    """Returns True (safe) for *_unreach*, False (unsafe) for *_reach*"""
+    if "_unreach" in task.name:
+        return True
+    if "_reach" in task.name:
+        return False
+    return None
+
+
+def find_tasks(directories: list, suffixes: list) -> list[Path]:
+    return sorted(
+        path
+        for directory in directories
+        for path in Path(directory).rglob("*")
+        if path.is_file() and any(path.name.endswith(s) for s in suffixes)
+    )
+
+
+def _get_process_groups(pid: int) -> set[int]:
+    """Returns the process groups of the process and its descendants"""
+    children = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # the fields after the command name start with state, ppid, pgrp
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            # the process terminated in the meantime
+            continue
+        children.setdefault(int(fields[1]), []).append(
+            (int(stat.parent.name), int(fields[2]))
+        )
+    groups = {pid}
+    pending = [pid]
+    while pending:
+        for child, group in children.get(pending.pop(), []):
+            groups.add(group)
+            pending.append(child)
+    return groups
+
+
+def _run(task: Path, mc_alg: str, solver: str, args: argparse.Namespace) -> dict:
+    cmd = [
+        "prlimit",
+        # limited before the checker starts, as preexec_fn is not safe with threads
+        f"--as={args.memory * 1024 * 1024}",
+        "--",
+        sys.executable,
+        "-m",
+        "moxichecker.main",
+        "-m",
+        mc_alg,
+        "-s",
+        solver,
+        *shlex.split(args.options),
+        "--stats",
+        "json",
+        str(task),
+    ]
+    result = {
+        "task": str(task),
+        "mc_alg": mc_alg,
+        "solver": solver,
+        "options": args.options,
+        "expected": _format_verdict(get_expected_verdict(task)),
+        "verdict": None,
+    }
+    timed_out = threading.Event()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd,
+            stdout=out,
+            stderr=err,
+            # the process group also contains the workers of parallel algorithms
+            start_new_session=True,
+        )
+
+        def kill():
+            timed_out.set()
+            # the model checker of a run with --timeout has a session of its own
+            for group in _get_process_groups(proc.pid):
+                try:
+                    os.killpg(group, signal.SIGKILL)
+                except ProcessLookupError:
+                    # the process group terminated in the meantime
+                    pass
+
+        timer = threading.Timer(args.timeout, kill)
+        timer.start()
+        _, status, usage = os.wait4(proc.pid, 0)
+        timer.cancel()
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        result["wall_time"] = time.perf_counter() - start
+        result["cpu_time"] = usage.ru_utime + usage.ru_stime
+        result["max_rss_mb"] = usage.ru_maxrss / 1024
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read().decode(), err.read().decode()
+
+    if timed_out.is_set():
+        result["status"] = "timeout"
+        return result
+    if proc.returncode != 0:
+        memout = "MemoryError" in stderr or "bad_alloc" in stderr
+        result["status"] = "memout" if memout else "error"
+        logging.debug("%s failed:\n%s", " ".join(cmd), stderr)
+        return result
+    try:
+        report = json.loads(stdout.strip().splitlines()[-1])
+        verdict = combine_verdicts(list(report["verdicts"].values()))
+    except (IndexError, ValueError, KeyError, TypeError, AttributeError):
+        result["status"] = "error"
+        logging.debug("%s printed no statistics:\n%s", " ".join(cmd), stdout)
+        return result
+    result["verdict"] = format_verdict(verdict)
+    for field in _STATS_FIELDS:
+        result[field] = report.get(field)
+    expected = get_expected_verdict(task)
+    if verdict is None:
+        result["status"] = "unknown"
+    elif expected is None:
+        result["status"] = "done"
+    else:
+        result["status"] = "correct" if verdict == expected else "wrong"
+    return result
+
+
+def _format_verdict(verdict: Optional[bool]) -> Optional[str]:
+    # tasks without an expected verdict
+    if verdict is None:
+        return None
+    return format_verdict(verdict)
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = _get_args(argv)
+    logging.basicConfig(format="[%(levelname)s] %(message)s", level=logging.INFO)
+    tasks = find_tasks(args.directories, args.suffix)
+    runs = list(itertools.product(tasks, args.mc_alg, args.solver))
+    logging.info(
+        "Running %d tasks x %d configurations",
+        len(tasks),
+        len(runs) // max(len(tasks), 1),
+    )
+
+    results = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(_run, *run, args) for run in runs]
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            logging.info(
+                "%-50s %-6s %-6s %-8s %8.2fs",
+                result["task"],
+                result["mc_alg"],
+                result["solver"],
+                result["status"],
+                result["wall_time"],
+            )
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    logging.info(
+        "Summary: %s",
+        ", ".join(f"{n} {status}" for status, n in sorted(counts.items())),
+    )
+    return 1 if counts.get("wrong", 0) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Reader for word-level hardware models in the BTOR2 format.
+
+Every node of the BTOR2 DAG is translated exactly once, so shared sub-terms
+become shared FNodes. Bit-vectors of width 1 are represented by Booleans,
+which is how the MoXI translation of such models declares them.
+"""
+
+import logging
+from pysmt.shortcuts import (
+    FALSE,
+    TRUE,
+    And,
+    Array,
+    BV,
+    BVAdd,
+    BVAnd,
+    BVAShr,
+    BVConcat,
+    BVExtract,
+    BVLShl,
+    BVLShr,
+    BVMul,
+    BVNeg,
+    BVNot,
+    BVOr,
+    BVSDiv,
+    BVSExt,
+    BVSGE,
+    BVSGT,
+    BVSLE,
+    BVSLT,
+    BVSRem,
+    BVSub,
+    BVUDiv,
+    BVUGE,
+    BVUGT,
+    BVULE,
+    BVULT,
+    BVURem,
+    BVXor,
+    BVZExt,
+    EqualsOrIff,
+    Iff,
+    Implies,
+    Ite,
+    Not,
+    Or,
+    Select,
+    Store,
+    Symbol,
+    Xor,
+)
+from pysmt.typing import ArrayType, BVType, BOOL, PySMTType
+from pysmt.fnode import FNode
+from pysmt.exceptions import PysmtTypeError
+from moxichecker.moxi2smt import TransitionSystem, _bv_smod, next_var
+
+# operators on bit-vectors of width > 1, their width-1 versions are Boolean
+_BITWISE_OPERATIONS = {
+    "and": (BVAnd, And),
+    "or": (BVOr, Or),
+    "xor": (BVXor, Xor),
+    "nand": (lambda a, b: BVNot(BVAnd(a, b)), lambda a, b: Not(And(a, b))),
+    "nor": (lambda a, b: BVNot(BVOr(a, b)), lambda a, b: Not(Or(a, b))),
+    "xnor": (lambda a, b: BVNot(BVXor(a, b)), Iff),
+}
+
+# operators whose arguments are bit-vectors and whose result is a Boolean
+_PREDICATES = {
+    "ugt": BVUGT,
+    "ugte": BVUGE,
+    "ult": BVULT,
+    "ulte": BVULE,
+    "sgt": BVSGT,
+    "sgte": BVSGE,
+    "slt": BVSLT,
+    "slte": BVSLE,
+}
+
+# operators whose arguments and result are bit-vectors
+_ARITHMETIC_OPERATIONS = {
+    "add": BVAdd,
+    "sub": BVSub,
+    "mul": BVMul,
+    "udiv": BVUDiv,
+    "urem": BVURem,
+    "sdiv": BVSDiv,
+    "srem": BVSRem,
+    "smod": _bv_smod,
+    "sll": BVLShl,
+    "srl": BVLShr,
+    "sra": BVAShr,
+    "concat": BVConcat,
+}
+
+
+def parse_btor2(text: str, name: str = "main") -> tuple[TransitionSystem, list]:
+    """Returns the system and its bad-state properties as (name, formula)"""
+    reader = _Btor2Reader()
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        tokens = line.split(";", 1)[0].split()
+        if not tokens:
+            continue
+        try:
+            reader.add_line(tokens)
+        except (IndexError, KeyError, ValueError, PysmtTypeError) as e:
+            raise ValueError(f"Invalid BTOR2 line {line_number}: {line} ({e})")
+    if reader.fair:
+        logging.warning("Fairness and justice properties are ignored")
+    variables = reader.states + reader.inputs
+    system = TransitionSystem.from_formulas(
+        name,
+        "QF_ABV" if reader.has_arrays else "QF_BV",
+        variables,
+        reader.inputs,
+        And(reader.init),
+        And(reader.trans),
+        And(reader.constraints),
+    )
+    return system, reader.bad
+
+
+def _to_bv(formula: FNode) -> FNode:
+    if formula.get_type().is_bool_type():
+        return Ite(formula, BV(1, 1), BV(0, 1))
+    return formula
+
+
+def _from_bv(formula: FNode) -> FNode:
+    """Turns bit-vectors of width 1 into Booleans"""
+    if formula.get_type().is_bv_type() and formula.bv_width() == 1:
+        return EqualsOrIff(formula, BV(1, 1))
+    return formula
+
+
+class _Btor2Reader:
+    def __init__(self):
+        self.sorts = {}
+        self.nodes = {}
+        self.states = []
+        self.inputs = []
+        self.init = []
+        self.trans = []
+        self.constraints = []
+        self.bad = []
+        self.fair = []
+        self.has_arrays = False
+
+    def _get_sort(self, token: str) -> PySMTType:
+        return self.sorts[int(token)]
+
+    def _get_node(self, token: str) -> FNode:
+        i = int(token)
+        node = self.nodes[abs(i)]
+        if i > 0:
+            return node
+        return Not(node) if node.get_type().is_bool_type() else BVNot(node)
+
+    def _get_constant(self, sort: PySMTType, value: int) -> FNode:
+        if sort.is_bool_type():
+            return TRUE() if value & 1 else FALSE()
+        width = sort.width
+        return BV(value % (1 << width), width)
+
+    def add_line(self, tokens: list) -> None:
+        nid, op, args = int(tokens[0]), tokens[1], tokens[2:]
+        if op == "sort":
+            if args[0] == "bitvec":
+                width = int(args[1])
+                self.sorts[nid] = BOOL if width == 1 else BVType(width)
+            elif args[0] == "array":
+                self.has_arrays = True
+                index, element = self._get_sort(args[1]), self._get_sort(args[2])
+                self.sorts[nid] = ArrayType(index, element)
+            else:
+                raise ValueError(f"Unknown sort: {args[0]}")
+            return
+        if op in ("state", "input"):
+            default_name = f"{op}{nid}"
+            var = Symbol(
+                args[1] if len(args) > 1 else default_name, self._get_sort(args[0])
+            )
+            (self.states if op == "state" else self.inputs).append(var)
+            self.nodes[nid] = var
+            return
+        if op in ("init", "next"):
+            sort, state, value = self._get_sort(args[0]), *args[1:3]
+            state, value = self._get_node(state), self._get_node(value)
+            if sort.is_array_type() and not value.get_type().is_array_type():
+                value = Array(sort.index_type, value)
+            if op == "init":
+                self.init.append(EqualsOrIff(state, value))
+            else:
+                self.trans.append(EqualsOrIff(next_var(state), value))
+            return
+        if op in ("bad", "constraint", "fair", "justice", "output"):
+            if op == "justice":
+                self.fair.append(args)
+                return
+            node = self._get_node(args[0])
+            if op == "bad":
+                name = args[1] if len(args) > 1 else f"bad{len(self.bad)}"
+                self.bad.append((name, node))
+            elif op == "constraint":
+                self.constraints.append(node)
+            elif op == "fair":
+                self.fair.append(node)
+            return
+        self.nodes[nid] = self._get_operation(op, self._get_sort(args[0]), args[1:])
+
+    def _get_operation(self, op: str, sort: PySMTType, args: list) -> FNode:
+        if op in ("zero", "one", "ones"):
+            value = {"zero": 0, "one": 1, "ones": -1}[op]
+            return self._get_constant(sort, value)
+        if op in ("const", "constd", "consth"):
+            base = {"const": 2, "constd": 10, "consth": 16}[op]
+            return self._get_constant(sort, int(args[0], base))
+        if op == "slice":
+            upper, lower = int(args[1]), int(args[2])
+            return _from_bv(BVExtract(_to_bv(self._get_node(args[0])), lower, upper))
+        if op in ("uext", "sext"):
+            ext = BVZExt if op == "uext" else BVSExt
+            node, width = self._get_node(args[0]), int(args[1])
+            return node if width == 0 else ext(_to_bv(node), width)
+
+        nodes = [self._get_node(arg) for arg in args]
+        is_bool = sort.is_bool_type()
+        if op == "not":
+            return Not(nodes[0]) if is_bool else BVNot(nodes[0])
+        if op in ("inc", "dec", "neg"):
+            bv = _to_bv(nodes[0])
+            one = BV(1, bv.bv_width())
+            res = {"inc": BVAdd(bv, one), "dec": BVSub(bv, one), "neg": BVNeg(bv)}
+            return _from_bv(res[op])
+        if op in ("redand", "redor", "redxor"):
+            if nodes[0].get_type().is_bool_type():
+                return nodes[0]
+            bv = nodes[0]
+            width = bv.bv_width()
+            if op == "redand":
+                return EqualsOrIff(bv, BV((1 << width) - 1, width))
+            if op == "redor":
+                return Not(EqualsOrIff(bv, BV(0, width)))
+            bits = [EqualsOrIff(BVExtract(bv, i, i), BV(1, 1)) for i in range(width)]
+            res = bits[0]
+            for bit in bits[1:]:
+                res = Xor(res, bit)
+            return res
+        if op in _BITWISE_OPERATIONS:
+            bv_op, bool_op = _BITWISE_OPERATIONS[op]
+            return bool_op(*nodes) if is_bool else bv_op(*nodes)
+        if op in ("iff", "implies"):
+            return Iff(*nodes) if op == "iff" else Implies(*nodes)
+        if op in ("eq", "neq"):
+            eq = EqualsOrIff(*nodes)
+            return eq if op == "eq" else Not(eq)
+        if op in _PREDICATES:
+            return _PREDICATES[op](*[_to_bv(node) for node in nodes])
+        if op in _ARITHMETIC_OPERATIONS:
+            res = _ARITHMETIC_OPERATIONS[op](*[_to_bv(node) for node in nodes])
+            return _from_bv(res)
+        if op in ("rol", "ror"):
+            bv, amount = _to_bv(nodes[0]), _to_bv(nodes[1])
+            width = bv.bv_width()
+            amount = BVURem(amount, BV(width, width))
+            left = (BVLShl, BVLShr) if op == "rol" else (BVLShr, BVLShl)
+            res = BVOr(
+                left[0](bv, amount),
+                left[1](bv, BVSub(BV(width, width), amount)),
+            )
+            return _from_bv(res)
+        if op == "ite":
+            return Ite(*nodes)
+        if op == "read":
+            return Select(*nodes)
+        if op == "write":
+            return Store(*nodes)
+        raise ValueError(f"Unsupported operator: {op}")
@@ -0,0 +1,132 @@
+"""
+Persistent cache of model-checking results.
+
+An entry is keyed by a hash of the checked system (logic, variables, initial
+condition, transition relation, invariant and queries, in SMT-LIB syntax), the
+options that select and configure the model checker, and the tool version. It
+stores the verdicts of the queries and their counterexample traces. Only runs
+in which every query is decided are stored, as unknown verdicts depend on the
+limits and on the machine.
+
+Every entry is a JSON file in the cache directory. When the directory grows
+beyond its size limit, the least recently used entries are removed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from argparse import Namespace
+from pathlib import Path
+from typing import Optional
+from pysmt.fnode import FNode
+from pysmt.shortcuts import to_smtlib
+from moxichecker import __version__
+from moxichecker.moxi2smt import TransitionSystem
+
+# command-line options that take part in the key
+_KEY_OPTIONS = [
+    "mc_alg",
+    "solver",
+    "use_simple_path",
+    "lazy_simple_path",
+    "incr_solving",
+    "parallel_kind",
+    "aux_invariants",
+    "max_bound",
+    "bmc_step",
+    "bmc_geometric",
+    "use_lifting",
+    "max_frames",
+    "sim_prepass",
+    "sim_traces",
+    "sim_steps",
+    "sim_seed",
+]
+
+_SUFFIX = ".json"
+
+
+def get_key(system: TransitionSystem, props: list[FNode], args: Namespace) -> str:
+    """Returns the hash of the system, the properties and the options"""
+    content = {
+        "version": __version__,
+        "logic": system.logic,
+        "variables": [
+            [v.symbol_name(), str(v.symbol_type())] for v in system.variables
+        ],
+        "inputs": [v.symbol_name() for v in system.input_variables],
+        "init": to_smtlib(system.init),
+        "trans": to_smtlib(system.trans),
+        "inv": to_smtlib(system.inv),
+        "props": [to_smtlib(prop) for prop in props],
+        "options": {name: getattr(args, name, None) for name in _KEY_OPTIONS},
+    }
+    if args.mc_alg == "portfolio":
+        content["options"]["portfolio"] = [config for config, _ in args.portfolio]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+class VerdictCache:
+    def __init__(self, directory: str, max_size_mb: float):
+        self.directory = Path(directory)
+        self.max_size = max_size_mb * 1024 * 1024
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[tuple[list, list]]:
+        """Returns the verdicts and traces stored under the key, if any"""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            verdicts, traces = entry["verdicts"], entry["traces"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning("Ignoring invalid cache entry '%s': %s", path, e)
+            return None
+        # the access time is not reliable, the modification time marks the use
+        os.utime(path)
+        return verdicts, traces
+
+    def put(self, key: str, verdicts: list, traces: list) -> None:
+        """Stores an entry and removes the least recently used ones if the cache
+        exceeds its size limit"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {"verdicts": verdicts, "traces": traces}
+        # write to a temporary file first, as other runs may read the entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.directory.glob("*" + _SUFFIX):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                # removed by another run in the meantime
+                pass
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        size = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= stat.st_size
+            logging.debug("Removed cache entry '%s'", path.name)
+
+    def clear(self) -> int:
+        """Removes all entries and returns their number"""
+        entries = self._entries()
+        for path, _ in entries:
+            path.unlink(missing_ok=True)
+        return len(entries)
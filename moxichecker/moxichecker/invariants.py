@@ -0,0 +1,153 @@
+"""
+Generation of auxiliary invariants for k-induction.
+
+Candidate invariants are instantiated from templates with the values of
+simulated traces (see `moxichecker.simulation`): constant values and bounds
+of the state variables, equalities between them, and the parity of integers
+and bit-vectors. Only the candidates that hold in all simulated states are
+kept. Their inductive subset is then computed as in Houdini: the candidates
+that an initial state violates, or a successor of a state that satisfies all
+candidates, are dropped until no candidate is violated. The remaining
+candidates hold in all reachable states.
+"""
+
+import logging
+import time
+from typing import Optional
+import numpy as np
+from pysmt.fnode import FNode
+from pysmt.shortcuts import (
+    TRUE,
+    And,
+    Or,
+    Not,
+    Equals,
+    EqualsOrIff,
+    LE,
+    BVULE,
+    BVExtract,
+    BV,
+    Div,
+    Int,
+    Plus,
+    Times,
+    Solver,
+)
+from moxichecker.moxi2smt import TransitionSystem
+from moxichecker.simulation import RandomSimulation, UnsupportedError, _to_constant
+from moxichecker.stats import STATS
+
+# backends whose pySMT converters support integer division, which the parity
+# templates of integers use
+_INT_DIVISION_SOLVERS = {"cvc5", "z3"}
+# with nonlinear arithmetic, integer division makes the inductiveness checks
+# much harder, so the parity templates of integers are only used in
+_INT_PARITY_LOGIC = "QF_LIA"
+
+
+def find_invariants(system: TransitionSystem, solver: str) -> list[FNode]:
+    """Returns invariants of the system that are inductive together"""
+    start = time.perf_counter()
+    try:
+        states = RandomSimulation(system, solver).sample_states()
+    except UnsupportedError as e:
+        logging.warning("Auxiliary invariants: Not supported: %s", e)
+        return []
+    if not states:
+        return []
+    int_parity = system.logic == _INT_PARITY_LOGIC and solver in _INT_DIVISION_SOLVERS
+    candidates = _get_candidates(system, states, int_parity)
+    invariants = _houdini(system, solver, candidates)
+    logging.info(
+        "Found %d auxiliary invariant(s) among %d candidates",
+        len(invariants),
+        len(candidates),
+    )
+    logging.debug("Auxiliary invariants: %s", invariants)
+    STATS.set("aux_candidates", len(candidates))
+    STATS.set("aux_invariants", len(invariants))
+    STATS.set("aux_time", time.perf_counter() - start)
+    return invariants
+
+
+def _get_candidates(
+    system: TransitionSystem, states: list[dict], int_parity: bool
+) -> list[FNode]:
+    """Returns the instances of the templates that hold in all states"""
+    inputs = set(system.input_variables)
+    candidates = []
+    # variables with equal values in all states, by their type and values
+    classes = {}
+    for v in system.variables:
+        if v in inputs:
+            continue
+        values = np.concatenate([state[v] for state in states])
+        v_type = v.symbol_type()
+        lo, hi = values.min(), values.max()
+        if lo == hi:
+            candidates.append(EqualsOrIff(v, _to_constant(lo, v_type)))
+            continue
+        classes.setdefault((v_type, values.tobytes()), []).append(v)
+        if v_type.is_bool_type():
+            continue
+        if v_type.is_bv_type():
+            # the bounds of the type are no candidates
+            if lo > 0:
+                candidates.append(BVULE(_to_constant(lo, v_type), v))
+            if hi < (1 << v_type.width) - 1:
+                candidates.append(BVULE(v, _to_constant(hi, v_type)))
+            parity = values & np.uint64(1)
+            if (parity == parity[0]).all():
+                candidates.append(Equals(BVExtract(v, 0, 0), BV(int(parity[0]), 1)))
+            continue
+        candidates.append(LE(_to_constant(lo, v_type), v))
+        candidates.append(LE(v, _to_constant(hi, v_type)))
+        if v_type.is_int_type() and int_parity:
+            parity = values % 2
+            if (parity == parity[0]).all():
+                remainder = Int(int(parity[0]))
+                candidates.append(
+                    Equals(v, Plus(Times(Int(2), Div(v, Int(2))), remainder))
+                )
+    for equal in classes.values():
+        candidates.extend(EqualsOrIff(equal[0], w) for w in equal[1:])
+    return candidates
+
+
+def _houdini(
+    system: TransitionSystem, solver_name: str, candidates: list[FNode]
+) -> list[FNode]:
+    """Returns the largest subset of the candidates that holds in the initial
+    states and is inductive"""
+    solver = Solver(name=solver_name, logic=system.logic)
+    try:
+        solver.add_assertion(And(system.init, system.inv))
+        candidates = _drop_violated(solver, candidates)
+        solver.reset_assertions()
+        solver.add_assertion(
+            And(system.inv, system.trans, system.inv.substitute(system.prime_map))
+        )
+        return _drop_violated(solver, candidates, system.prime_map)
+    finally:
+        solver.exit()
+
+
+def _drop_violated(
+    solver: Solver, candidates: list[FNode], prime_map: Optional[dict] = None
+) -> list[FNode]:
+    """Drops the candidates that are violated in a model of the assertions,
+    until no model violates a candidate.
+
+    With the prime map, the candidates are checked in the next state of a
+    transition from a state that satisfies all candidates.
+    """
+    while candidates:
+        if prime_map is None:
+            assumption, targets = TRUE(), candidates
+        else:
+            assumption = And(candidates)
+            targets = [c.substitute(prime_map) for c in candidates]
+        if not solver.is_sat(And(assumption, Or(Not(t) for t in targets))):
+            break
+        candidates = [c for c, t in zip(candidates, targets) if solver.get_py_value(t)]
+    return candidates
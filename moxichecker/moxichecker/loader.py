@@ -0,0 +1,122 @@
+import json
+import re
+from typing import Optional, Union
+from moxichecker.moxi_parser import parse_moxi
+
+# commands whose bodies are small and kept after indexing
+_KEPT_COMMANDS = {"set-logic", "check-system"}
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+# text up to and including the next bracket outside of strings
+_CHUNK = re.compile(rf'[^][{{}}"]*(?:{_STRING}[^][{{}}"]*)*([][{{}}])')
+# a string followed by a colon and a string value
+_FIELD = re.compile(rf"({_STRING})(?:[ \t\n\r]*:[ \t\n\r]*({_STRING}))?")
+# top-level fields of a command that are read while scanning
+_FIELDS = {"command", "symbol"}
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Returns the position of the first non-whitespace character from pos"""
+    match = _WHITESPACE.match(text, pos)
+    assert match is not None  # the pattern matches the empty string
+    return match.end()
+
+
+class CommandIndex:
+    """The commands of a MoXI-JSON file, indexed by kind and symbol.
+
+    The top-level command list is scanned without decoding the command
+    bodies: only the brackets and strings are matched, and the "command" and
+    "symbol" fields are read. Small commands (set-logic, check-system) are
+    decoded and kept. Of all other commands only the text of the systems
+    referenced by a check-system is kept, and it is decoded when requested;
+    the rest of the file is released after indexing.
+    """
+
+    def __init__(self, text: str):
+        # command -> list of (symbol, decoded command or its text) in file order
+        self._index = {}
+        self._num_commands = 0
+        self._decoder = json.JSONDecoder()
+        self._scan(text)
+
+    def _scan(self, text: str) -> None:
+        spans = []
+        pos = _skip_whitespace(text, 0)
+        if not text.startswith("[", pos):
+            raise ValueError("MoXI-JSON file must contain a list of commands")
+        pos = _skip_whitespace(text, pos + 1)
+        while not text.startswith("]", pos):
+            if spans:
+                if not text.startswith(",", pos):
+                    raise ValueError(f"Expected ',' or ']' at position {pos}")
+                pos = _skip_whitespace(text, pos + 1)
+            end, fields = self._skip_command(text, pos)
+            if "command" not in fields:
+                raise ValueError(f"Invalid command at position {pos}")
+            spans.append((fields["command"], fields.get("symbol"), pos, end))
+            pos = _skip_whitespace(text, end)
+        self._num_commands = len(spans)
+        for kind, symbol, start, end in spans:
+            if kind in _KEPT_COMMANDS:
+                cmd = self._decoder.decode(text[start:end])
+                self._index.setdefault(kind, []).append((symbol, cmd))
+        referenced = {
+            cmd.get("symbol") for _, cmd in self._index.get("check-system", [])
+        }
+        for kind, symbol, start, end in spans:
+            if kind == "define-system" and symbol in referenced:
+                self._index.setdefault(kind, []).append((symbol, text[start:end]))
+
+    def _skip_command(self, text: str, pos: int) -> tuple[int, dict]:
+        """Returns the end of the command object at pos and its fields"""
+        if not text.startswith("{", pos):
+            raise ValueError(f"Invalid command at position {pos}")
+        fields = {}
+        depth = 0
+        while True:
+            chunk = _CHUNK.match(text, pos)
+            if chunk is None:
+                raise ValueError(f"Unterminated command at position {pos}")
+            if depth == 1:
+                self._read_fields(chunk.group()[:-1], fields)
+            pos = chunk.end()
+            if chunk.group(1) in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return pos, fields
+
+    @staticmethod
+    def _read_fields(text: str, fields: dict) -> None:
+        """Reads the string-valued fields in text between nested values"""
+        for match in _FIELD.finditer(text):
+            if match.group(2) is not None:
+                key = json.loads(match.group(1))
+                if key in _FIELDS:
+                    fields[key] = json.loads(match.group(2))
+
+    def find(self, kind: str, symbol: Optional[str] = None) -> Optional[dict]:
+        """Returns the 1st command of the given kind (and symbol), if any.
+
+        Only the systems referenced by a check-system can be found."""
+        for cmd_symbol, cmd in self._index.get(kind, []):
+            if symbol is None or cmd_symbol == symbol:
+                if isinstance(cmd, str):
+                    return self._decoder.decode(cmd)
+                return cmd
+        return None
+
+    def __len__(self) -> int:
+        return self._num_commands
+
+
+def load_commands(path: str) -> Union[CommandIndex, list]:
+    """Loads a MoXI-JSON file (*.json) or a MoXI file in S-expression syntax"""
+    with open(path) as f:
+        text = f.read()
+    if path.endswith(".json"):
+        return CommandIndex(text)
+    return list(parse_moxi(text))
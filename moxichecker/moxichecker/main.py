@@ -1,23 +1,26 @@
 import argparse
 import logging
-import json
+import os
+import shlex
+import sys
+import time
 from typing import Optional
-from pysmt.shortcuts import Not
 from moxichecker import __version__
-from moxichecker.moxi2smt import (
-    get_check_system,
-    get_define_system,
-    get_logic,
-    get_query,
-    TransitionSystem,
+from moxichecker.options import (
+    MC_ALGORITHMS,
+    SOLVERS,
+    combine_verdicts,
+    format_verdict,
 )
-from moxichecker.model_checking import MC_ALGORITHMS, get_prover
+from moxichecker.stats import STATS
 
 
-def _get_args(argv: Optional[list]) -> argparse.Namespace:
+def get_args(argv: Optional[list]) -> argparse.Namespace:
     # default values
     DEFAULT_ALG = "kind"
     DEFAULT_SOLVER = "msat"
+    DEFAULT_PORTFOLIO = ["-m kind", "-m kind --incr-solving", "-m pdr"]
+    DEFAULT_CACHE_SIZE = 100
 
     parser = argparse.ArgumentParser(description="MoXIchecker: MoXI Model Checker")
 
@@ -35,10 +38,43 @@ def _get_args(argv: Optional[list]) -> argparse.Namespace:
         "--solver",
         metavar="STR",
         required=False,
-        choices=["btor", "cvc5", "msat", "yices", "z3"],
+        choices=SOLVERS,
         default=DEFAULT_SOLVER,
         help=f"the backend SMT solver to use (default: '{DEFAULT_SOLVER}')",
     )
+    parser.add_argument(
+        "--preprocess",
+        help="simplify the system (equality and constant propagation, "
+        "cone-of-influence reduction) before model checking",
+        action="store_true",
+        required=False,
+    )
+    parser.add_argument(
+        "--timeout",
+        metavar="SEC",
+        type=float,
+        help="wall-clock time limit; when it expires, the running solver call is "
+        "interrupted (z3) and the undecided queries are reported as unknown; a "
+        "model checker that does not stop is killed shortly after",
+        required=False,
+    )
+    parser.add_argument(
+        "--witness",
+        metavar="FILE",
+        help="write the counterexample trace of every reachable query to FILE "
+        "(JSON lines: a header with the variable names, then the values per step); "
+        "with --preprocess, the trace is over the variables that are kept",
+        required=False,
+    )
+    parser.add_argument(
+        "--stats",
+        metavar="FORMAT",
+        choices=["json", "jsonl"],
+        help="print run-time statistics to stdout: 'json' prints one report at the "
+        "end, 'jsonl' prints every event (e.g. the check of a bound) as a JSON "
+        "line when it happens, followed by a summary line",
+        required=False,
+    )
     parser.add_argument(
         "--debug",
         help="show debugging messages",
@@ -54,7 +90,9 @@ def _get_args(argv: Optional[list]) -> argparse.Namespace:
     parser.add_argument(
         "moxi_json",
         metavar="FILE",
-        help="the verification task in the MoXI-JSON format",
+        nargs="?",
+        help="the verification task in the MoXI (*.moxi), MoXI-JSON (*.json), "
+        "BTOR2 (*.btor2) or VMT (*.vmt) format",
     )
     kind_group = parser.add_argument_group("options for BMC/k-induction")
     kind_group.add_argument(
@@ -64,40 +102,277 @@ def _get_args(argv: Optional[list]) -> argparse.Namespace:
         help="disable simple-path constraint for k-induction",
         required=False,
     )
+    kind_group.add_argument(
+        "--lazy-simple-path",
+        action="store_true",
+        help="add simple-path constraints on demand for repeated states only",
+        required=False,
+    )
     kind_group.add_argument(
         "--incr-solving",
         action="store_true",
         help="enable incremental SMT solving",
         required=False,
     )
-    return parser.parse_args(argv)
+    kind_group.add_argument(
+        "--max-bound",
+        metavar="N",
+        type=int,
+        help="stop at bound N, the undecided queries are reported as unknown",
+        required=False,
+    )
+    kind_group.add_argument(
+        "--aux-invariants",
+        action="store_true",
+        help="assume auxiliary invariants in the k-induction checks, which are "
+        "mined from simulated traces (bounds, equalities and parities of "
+        "variables) and proven inductive",
+        required=False,
+    )
+    kind_group.add_argument(
+        "--bmc-step",
+        metavar="N",
+        type=int,
+        default=1,
+        help="BMC only: check windows of N bounds with one (non-incremental) "
+        "solver call each, and search the shortest counterexample in a window "
+        "with a violation by bisection (default: 1)",
+        required=False,
+    )
+    kind_group.add_argument(
+        "--bmc-geometric",
+        action="store_true",
+        help="BMC only: double the window after every window without violation",
+        required=False,
+    )
+    kind_group.add_argument(
+        "--parallel-kind",
+        action="store_true",
+        help="run the BMC and the k-induction checks in two separate processes",
+        required=False,
+    )
+    pdr_group = parser.add_argument_group("options for PDR")
+    pdr_group.add_argument(
+        "--no-lifting",
+        action="store_false",
+        dest="use_lifting",
+        help="disable lifting of predecessor cubes with unsat cores",
+        required=False,
+    )
+    pdr_group.add_argument(
+        "--max-frames",
+        metavar="N",
+        type=int,
+        help="stop after N frames, the query is reported as unknown",
+        required=False,
+    )
+    sim_group = parser.add_argument_group("options for random simulation")
+    sim_group.add_argument(
+        "--sim-prepass",
+        action="store_true",
+        help="simulate random traces before running the model checker, which "
+        "then only checks the queries that no trace violates",
+        required=False,
+    )
+    sim_group.add_argument(
+        "--sim-traces",
+        metavar="N",
+        type=int,
+        default=1000,
+        help="number of traces that are simulated at once (default: 1000)",
+        required=False,
+    )
+    sim_group.add_argument(
+        "--sim-steps",
+        metavar="N",
+        type=int,
+        default=100,
+        help="length of the simulated traces (default: 100)",
+        required=False,
+    )
+    sim_group.add_argument(
+        "--sim-seed",
+        metavar="N",
+        type=int,
+        default=0,
+        help="seed of the random values (default: 0)",
+        required=False,
+    )
+    cache_group = parser.add_argument_group("options for the verdict cache")
+    cache_group.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        default=os.environ.get("MOXICHECKER_CACHE_DIR"),
+        help="reuse the verdicts (and traces) of earlier runs on the same system "
+        "with the same options, which are stored in DIR "
+        "(default: $MOXICHECKER_CACHE_DIR, no cache if unset)",
+        required=False,
+    )
+    cache_group.add_argument(
+        "--cache-size",
+        metavar="MB",
+        type=float,
+        default=DEFAULT_CACHE_SIZE,
+        help="remove the least recently used entries when the cache exceeds MB "
+        f"megabytes (default: {DEFAULT_CACHE_SIZE})",
+        required=False,
+    )
+    cache_group.add_argument(
+        "--no-cache",
+        action="store_false",
+        dest="use_cache",
+        help="neither read nor update the cache",
+        required=False,
+    )
+    cache_group.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="remove all entries of the cache before checking FILE, if given",
+        required=False,
+    )
+    portfolio_group = parser.add_argument_group("options for the portfolio")
+    portfolio_group.add_argument(
+        "--portfolio-config",
+        metavar="ARGS",
+        action="append",
+        dest="portfolio",
+        help=(
+            "options of a portfolio member, e.g. --portfolio-config='-m pdr -s z3'; "
+            "can be given several times, the solver defaults to --solver "
+            f"(default: {', '.join(repr(c) for c in DEFAULT_PORTFOLIO)})"
+        ),
+        required=False,
+    )
+    portfolio_group.add_argument(
+        "--portfolio-log",
+        metavar="FILE",
+        help="append the winning configuration of each run as a JSON line to FILE",
+        required=False,
+    )
+    args = parser.parse_args(argv)
+    if args.bmc_step < 1:
+        parser.error("--bmc-step must be positive")
+    if args.clear_cache and args.cache_dir is None:
+        parser.error("--clear-cache requires --cache-dir")
+    if args.moxi_json is None and not args.clear_cache:
+        parser.error("the following arguments are required: FILE")
+    if args.mc_alg == "portfolio":
+        args.portfolio = [
+            (config, _get_member_args(parser, args, config))
+            for config in args.portfolio or DEFAULT_PORTFOLIO
+        ]
+    return args
+
+
+def _get_member_args(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, config: str
+) -> argparse.Namespace:
+    member_args = parser.parse_args(
+        ["-s", args.solver, *shlex.split(config), args.moxi_json]
+    )
+    if member_args.mc_alg == "portfolio":
+        parser.error(f"portfolio member '{config}' must not be a portfolio")
+    # the limits of the portfolio apply to members without their own limits
+    for limit in ("max_bound", "max_frames"):
+        if getattr(member_args, limit) is None:
+            setattr(member_args, limit, getattr(args, limit))
+    return member_args
+
+
+def check_task(args: argparse.Namespace) -> Optional[dict]:
+    """Checks the task given by the command-line arguments and returns the
+    verdict of each query by name, or None if there is no task (--clear-cache).
+
+    The verdicts are logged, and the traces are logged and written to the
+    witness file.
+    """
+    start = time.perf_counter()
+    # pySMT is only loaded once the arguments are valid, as importing it (and
+    # the solver bindings) dominates the run time of small tasks
+    from pysmt.shortcuts import Not
+    from moxichecker.cache import VerdictCache, get_key
+    from moxichecker.model_checking import check_properties
+    from moxichecker.preprocessing import preprocess
+    from moxichecker.tasks import load_task
+    from moxichecker.witness import log_trace, write_trace
+
+    cache = None
+    if args.cache_dir is not None and (args.use_cache or args.clear_cache):
+        cache = VerdictCache(args.cache_dir, args.cache_size)
+        if args.clear_cache:
+            logging.info("Removed %d cache entries", cache.clear())
+        if args.moxi_json is None:
+            return None
+        if not args.use_cache:
+            cache = None
+
+    system, queries = load_task(args.moxi_json)
+    query_names = [name for name, _ in queries]
+    query_formulas = [query for _, query in queries]
+    if args.preprocess:
+        preprocessing_start = time.perf_counter()
+        query_formulas = preprocess(system, query_formulas)
+        STATS.set("preprocessing_time", time.perf_counter() - preprocessing_start)
+
+    logging.info(
+        "Checking reachability of %s '%s' of system '%s'",
+        "query" if len(queries) == 1 else "queries",
+        "', '".join(query_names),
+        system.name,
+    )
+    logging.info("Used theory: %s", system.logic)
+    time_limit = None
+    if args.timeout is not None:
+        # the time limit includes the loading of the task
+        time_limit = max(0.0, args.timeout - (time.perf_counter() - start))
+    props = [Not(query) for query in query_formulas]
+    key = cached = None
+    if cache is not None:
+        key = get_key(system, props, args)
+        cached = cache.get(key)
+        STATS.set("cache_hit", cached is not None)
+    if cached is not None:
+        logging.info("Using the cached result %s", key[:12])
+        verdicts, traces = cached
+    else:
+        verdicts, traces = check_properties(args, system, props, time_limit)
+        if cache is not None and None not in verdicts:
+            cache.put(key, verdicts, traces)
+    if len(queries) > 1:
+        for name, verdict in zip(query_names, verdicts):
+            logging.info(
+                "Model-checking result of query '%s': %s",
+                name,
+                format_verdict(verdict),
+            )
+    logging.info(
+        "Model-checking result: %s", format_verdict(combine_verdicts(verdicts))
+    )
+    for name, trace in zip(query_names, traces):
+        if trace is not None:
+            log_trace(system, name, trace)
+    if args.witness:
+        with open(args.witness, "w") as f:
+            for name, trace in zip(query_names, traces):
+                if trace is not None:
+                    write_trace(f, system, name, trace)
+    return dict(zip(query_names, verdicts))
 
 
 def main(argv: Optional[list] = None):
-    args = _get_args(argv)
+    args = get_args(argv)
     logging.basicConfig(
         format="[%(levelname)s] %(message)s",
         level=logging.DEBUG if args.debug else logging.INFO,
     )
     logging.debug("MoXIchecker version: %s", __version__)
     logging.debug("Used configuration: %s", args)
-
-    with open(args.moxi_json) as f:
-        moxi_json = json.load(f)
-    logic = get_logic(moxi_json)
-    check_sys_cmd = get_check_system(moxi_json)
-    def_sys_cmd = get_define_system(moxi_json, check_sys_cmd["symbol"])
-
-    system = TransitionSystem(def_sys_cmd, logic)
-    query_name, query = get_query(check_sys_cmd, logic)
-
-    logging.info(
-        "Checking reachability of query '%s' of system '%s'", query_name, system.name
-    )
-    logging.info("Used theory: %s", logic)
-    prover = get_prover(args, system)
-    verdict = prover.check_property(Not(query))
-    logging.info("Model-checking result: %s", "safe" if verdict else "unsafe")
+    if args.stats:
+        STATS.enable(sys.stdout if args.stats == "jsonl" else None)
+    verdicts = check_task(args)
+    if args.stats and verdicts is not None:
+        STATS.set("verdicts", verdicts)
+        STATS.report()
 
 
 if __name__ == "__main__":
@@ -1,296 +1,1581 @@
+import heapq
+import json
 import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import threading
+import time
 from argparse import Namespace
+from queue import Empty
 from typing import Optional
 from pysmt.shortcuts import (
     TRUE,
     Not,
     And,
     Or,
+    Implies,
     EqualsOrIff,
+    FreshSymbol,
+    LE,
+    BVULE,
+    Interpolator,
     Solver,
+    UnsatCoreSolver,
+    to_smtlib,
+)
+from pysmt.exceptions import (
+    NoSolverAvailableError,
+    PysmtException,
+    SolverReturnedUnknownResultError,
 )
 from pysmt.fnode import FNode
-from moxichecker.moxi2smt import next_var, at_time, TransitionSystem
+from pysmt.oracles import SizeOracle
+from pysmt.typing import BOOL
+from moxichecker.moxi2smt import TransitionSystem
+from moxichecker.stats import STATS
+
+
+def _add_query_literal(solver: Solver, formula: FNode) -> FNode:
+    """Asserts act -> formula for a fresh activation literal act and returns act"""
+    act = FreshSymbol(BOOL)
+    solver.add_assertion(Implies(act, formula))
+    return act
+
+
+def _get_size(formula: FNode) -> int:
+    return formula.size(SizeOracle.MEASURE_DAG_NODES)
+
+
+def _get_trace(system: TransitionSystem, solver: Solver, k: int) -> list[list[str]]:
+    """Returns the values of the variables at time 0 to k in the model of the
+    solver, with one get_values call per step.
+
+    Each step is the list of the values, in SMT-LIB syntax and in the order of
+    `system.variables`.
+    """
+    trace = []
+    for i in range(k + 1):
+        state = system.get_state(i)
+        values = solver.get_values(state)
+        trace.append([to_smtlib(values[v], daggify=False) for v in state])
+    return trace
+
+
+def _in_destructor(frame) -> bool:
+    while frame is not None:
+        if frame.f_code.co_name == "__del__":
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _raise_system_exit(signum, frame):
+    """Signal handler that exits through the interpreter, i.e., runs destructors.
+
+    Exceptions raised inside a destructor are ignored by Python,
+    so the exit is retried shortly afterwards in that case.
+    """
+    if _in_destructor(frame):
+        signal.setitimer(signal.ITIMER_REAL, 0.01)
+        return
+    raise SystemExit(128 + signum)
+
+
+class LimitReachedError(Exception):
+    """Raised in the model checker when the time limit expires"""
+
 
+# monotonic time at which the time limit expires
+_deadline = None
+# set once the model checker has stopped because of the time limit
+_stopped = False
 
-MC_ALGORITHMS = {"bmc", "kind", "pdr"}
 
+def _raise_limit_reached(signum, frame):
+    global _stopped
+    if _stopped or _in_destructor(frame):
+        # exceptions in destructors are ignored, the signal is repeated
+        return
+    _stopped = True
+    raise LimitReachedError()
 
-def _push_assertion(solver: Solver, formula: FNode) -> None:
-    solver.add_assertion(formula)
-    solver.push()
+
+def _interrupt() -> None:
+    """Sends SIGINT until the model checker has stopped, as z3 drops a signal
+    that arrives while it finishes a call."""
+    while not _stopped:
+        os.kill(os.getpid(), signal.SIGINT)
+        time.sleep(0.1)
+
+
+def set_time_limit(seconds: float) -> None:
+    """Interrupts the model checking after the given wall-clock time.
+
+    The interrupt is delivered as SIGINT: z3 aborts a running call on SIGINT,
+    which pySMT reports as an unknown result, and in Python code the signal
+    handler raises `LimitReachedError`. Calls of other backends finish first,
+    and some z3 calls (e.g. nonlinear arithmetic) ignore the interrupt, so the
+    limit is only enforced by `check_properties`, which kills the model checker.
+    """
+    global _deadline
+    _deadline = time.monotonic() + seconds
+    signal.signal(signal.SIGINT, _raise_limit_reached)
+    timer = threading.Timer(seconds, _interrupt)
+    timer.daemon = True
+    timer.start()
+
+
+def _time_limit_expired() -> bool:
+    return _deadline is not None and time.monotonic() >= _deadline
+
+
+# exceptions that end a check with an unknown verdict
+_INTERRUPTS = (LimitReachedError, SolverReturnedUnknownResultError)
+# exceptions of the solvers and of invalid configurations, which are reported
+# as the failure of a check; all other exceptions are programming errors
+_ERRORS = (PysmtException, ValueError, RuntimeError)
+
+
+def _log_interrupt(e: Exception) -> None:
+    global _stopped
+    if isinstance(e, LimitReachedError) or _time_limit_expired():
+        _stopped = True
+        logging.warning("Time limit reached")
+    else:
+        logging.warning("Solver returned unknown")
+
+
+def _report_unknown(safe_bound: int) -> None:
+    """Logs the deepest bound up to which no violation is reachable"""
+    logging.info("No violation is reachable in up to %d steps", safe_bound)
+    STATS.set("safe_bound", safe_bound)
 
 
 class MCAlgorithm:
+    """Model-checking algorithm.
+
+    The counterexample trace of every violated property, as returned by
+    `_get_trace`, is stored in the dict `traces`.
+    """
+
+    traces: dict[FNode, list]
+
     def __init__(self, system: TransitionSystem, solver: str):
         raise NotImplementedError()
 
-    def check_property(self, prop: FNode) -> bool:
-        """Builds True is the property is satisfied, False otherwise."""
+    def check_property(self, prop: FNode) -> Optional[bool]:
+        """Builds True is the property is satisfied, False otherwise,
+        and None if a limit is reached before."""
         raise NotImplementedError()
 
 
-class BMCInductionBase(MCAlgorithm):
+class MultiPropertyMCAlgorithm(MCAlgorithm):
+    def check_properties(self, props: list[FNode]) -> list[Optional[bool]]:
+        """Returns the verdict of check_property for each property."""
+        raise NotImplementedError()
+
+
+class BMCInductionBase(MultiPropertyMCAlgorithm):
     def __init__(
         self,
         system: TransitionSystem,
         solver: str,
         check_ind: bool = True,
         use_simple_path: bool = True,
+        lazy_simple_path: bool = False,
+        max_bound: Optional[int] = None,
+        aux_invariants: bool = False,
     ):
         self.system = system
+        self.solver_name = solver
         self.check_ind = check_ind
+        self.max_bound = max_bound
         self.use_simple_path = use_simple_path
-        self.prime_map = {v: next_var(v) for v in self.system.variables}
+        self.lazy_simple_path = use_simple_path and lazy_simple_path
+        self.prime_map = system.prime_map
+        self.aux_invariants = aux_invariants
+        # the conjunction of the auxiliary invariants, once generated
+        self._aux_invariant = None
         self.bmc_solver = Solver(name=solver, logic=system.logic)
         self.ind_solver = Solver(name=solver, logic=system.logic)
+        self._timed_formulas = {}
+        self._simple_path_rows = []
+        # time spent in solver calls
+        self.solve_time = 0.0
+        # no violation of the undecided properties is reachable in up to
+        # safe_bound steps
+        self.safe_bound = -1
+        self.traces = {}
 
     def __del__(self):
-        self.bmc_solver.exit()
-        self.ind_solver.exit()
-
-    def _get_subs(self, i: int) -> dict:
-        """Builds a map from x to x@i and from x' to x@(i+1), for all x in system."""
-        subs_i = {}
-        for v in self.system.variables:
-            subs_i[v] = at_time(v, i)
-            subs_i[next_var(v)] = at_time(v, i + 1)
-        return subs_i
+        # the solvers are missing if the constructor failed
+        for name in ("bmc_solver", "ind_solver"):
+            if hasattr(self, name):
+                getattr(self, name).exit()
 
+    def _at_time(self, formula: FNode, i: int) -> FNode:
+        """Returns the formula over the state variables at time i (cached)."""
+        key = (formula, i)
+        if key not in self._timed_formulas:
+            self._timed_formulas[key] = formula.substitute(self.system.get_subs(i))
+        return self._timed_formulas[key]
 
-class BMCInduction(BMCInductionBase):
-    def check_property(self, prop: FNode) -> bool:
+    def check_property(self, prop: FNode) -> Optional[bool]:
         """Interleaves BMC and K-Ind to verify the property."""
-        logging.debug("Checking property %s...", prop)
+        return self.check_properties([prop])[0]
+
+    def check_properties(self, props: list[FNode]) -> list[Optional[bool]]:
+        """Interleaves BMC and K-Ind to verify all properties at once.
+
+        The unrolling of every bound is shared by all properties that are not
+        decided yet. Properties proven so far are assumed in the k-induction
+        queries of the remaining ones. Properties that are still undecided when
+        the maximal bound or the time limit is reached are unknown (None).
+        """
+        logging.debug("Checking properties %s...", props)
+        verdicts = [None] * len(props)
+        tags = [f"Property {i}: " if len(props) > 1 else "" for i in range(len(props))]
         b = 0
-        while True:
-            f = self._get_bmc_query(prop, b)
-            logging.debug("BMC: Checking bound %d...", b)
-            if self.bmc_solver.is_sat(f):
-                logging.info("Query reached at step %d", b)
+        try:
+            while None in verdicts:
+                if self.max_bound is not None and b > self.max_bound:
+                    logging.info("Maximal bound %d reached", self.max_bound)
+                    break
+                self._check_bound(props, verdicts, tags, b)
+                b += 1
+        except _INTERRUPTS as e:
+            _log_interrupt(e)
+        if None in verdicts:
+            _report_unknown(self.safe_bound)
+        STATS.set("bound", b - 1)
+        STATS.set("solve_time", self.solve_time)
+        return verdicts
+
+    def _check_bound(
+        self, props: list[FNode], verdicts: list, tags: list[str], b: int
+    ) -> None:
+        """Runs the BMC and k-induction checks of bound b for the undecided
+        properties and updates their verdicts."""
+        logging.debug("BMC: Checking bound %d...", b)
+        for i, prop in enumerate(props):
+            if verdicts[i] is None and self._record(
+                "bmc", i, b, self._check_bmc, prop, b
+            ):
+                logging.info("%sQuery reached at step %d", tags[i], b)
+                verdicts[i] = False
+                self.traces[prop] = _get_trace(self.system, self.bmc_solver, b)
+        self.safe_bound = b
+        if self.check_ind and None in verdicts:
+            logging.debug("IND: Checking bound %d...", b)
+            proven = [
+                *self._get_aux_invariants(),
+                *(p for p, verdict in zip(props, verdicts) if verdict),
+            ]
+            for i, prop in enumerate(props):
+                if verdicts[i] is None and self._record(
+                    "ind", i, b, self._check_kind, prop, b, tuple(proven)
+                ):
+                    logging.info("%sInduction check passed at step %d", tags[i], b)
+                    verdicts[i] = True
+                    proven.append(prop)
+        if STATS.enabled and b > 0:
+            STATS.event(
+                "unrolling",
+                bound=b,
+                step_dag_size=_get_size(self.system.get_step(b - 1)),
+            )
+
+    def _get_aux_invariants(self) -> list[FNode]:
+        """Returns the auxiliary invariants as one conjunction, which are
+        generated on the first call"""
+        if not self.aux_invariants:
+            return []
+        if self._aux_invariant is None:
+            self._aux_invariant = And(_find_invariants(self.system, self.solver_name))
+        return [self._aux_invariant]
+
+    def _record(self, engine: str, prop_index: int, k: int, check, *args) -> bool:
+        """Runs a BMC or k-induction check and records its statistics"""
+        start, solve_time = time.perf_counter(), self.solve_time
+        res = check(*args)
+        if STATS.enabled:
+            duration = time.perf_counter() - start
+            STATS.event(
+                engine,
+                property=prop_index,
+                bound=k,
+                result=res,
+                duration=duration,
+                solve_time=self.solve_time - solve_time,
+                encode_time=duration - (self.solve_time - solve_time),
+            )
+        return res
+
+    def _timed_solve(self, check, *args) -> bool:
+        """Runs a solver call and accounts its time"""
+        start = time.perf_counter()
+        try:
+            return check(*args)
+        finally:
+            self.solve_time += time.perf_counter() - start
+
+    def _check_bmc(self, prop: FNode, k: int) -> bool:
+        """Returns True if a violation of the property is reachable in k steps.
+
+        Must be called for k = 0, 1, 2, ... in order, for each property.
+        """
+        raise NotImplementedError()
+
+    def _check_kind(self, prop: FNode, k: int, invariants: tuple = ()) -> bool:
+        """Returns True if the k-induction query at step k is unsatisfiable.
+
+        The invariants are assumed to hold in the states 0 to k-1.
+        Must be called for k = 0, 1, 2, ... in order, for each property.
+        """
+        raise NotImplementedError()
+
+    def _get_state_diff(self, i: int, j: int) -> FNode:
+        """The states at time i and time j are different"""
+        return Or(
+            [
+                Not(EqualsOrIff(v_i, v_j))
+                for v_i, v_j in zip(self.system.get_state(i), self.system.get_state(j))
+            ]
+        )
+
+    def _get_simple_path_row(self, j: int) -> FNode:
+        """The state at time j differs from all states at time 0 to j-1 (cached)."""
+        while len(self._simple_path_rows) <= j:
+            k = len(self._simple_path_rows)
+            self._simple_path_rows.append(
+                And([self._get_state_diff(i, k) for i in range(k)])
+            )
+        return self._simple_path_rows[j]
+
+    def _refine_simple_path(self, solver: Solver, k: int) -> list:
+        """Lazy simple-path refinement after a satisfiable k-induction query.
+
+        Returns the disequalities of the states at time 0 to k-1 that coincide in
+        the model of the solver, or an empty list if the counterexample to
+        induction is a simple path.
+        """
+        if not self.lazy_simple_path or k < 2:
+            return []
+        values = solver.get_values(
+            [v for i in range(k) for v in self.system.get_state(i)]
+        )
+        seen = {}
+        constrs = []
+        for j in range(k):
+            state = tuple(values[v] for v in self.system.get_state(j))
+            if state in seen:
+                constrs.append(self._get_state_diff(seen[state], j))
+            else:
+                seen[state] = j
+        if constrs:
+            logging.debug("IND: Adding %d simple-path constraint(s)", len(constrs))
+        return constrs
+
+
+class BMCInduction(BMCInductionBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # simple-path constraints added on demand in lazy mode
+        self._simple_path_lemmas = []
+
+    def _check_bmc(self, prop: FNode, k: int) -> bool:
+        return self._timed_solve(self.bmc_solver.is_sat, self._get_bmc_query(prop, k))
+
+    def _check_kind(self, prop: FNode, k: int, invariants: tuple = ()) -> bool:
+        f = self._get_kind_query(prop, k, invariants)
+        while self._timed_solve(
+            self.ind_solver.is_sat, And(f, And(self._simple_path_lemmas))
+        ):
+            constrs = self._refine_simple_path(self.ind_solver, k)
+            if not constrs:
                 return False
-            if self.check_ind:
-                f = self._get_kind_query(prop, b)
-                logging.debug("IND: Checking bound %d...", b)
-                if self.ind_solver.is_unsat(f):
-                    logging.info("Induction check passed at step %d", b)
-                    return True
-            b += 1
+            self._simple_path_lemmas.extend(constrs)
+        return True
 
     def _get_unrolling(self, k: int) -> FNode:
         """Unrolling of the transition relation from 0 to k:
 
         E.g. T(0,1) & Inv(1) & T(1,2) & Inv(2) & ... & T(k-1,k) & Inv(k)
         """
-        inv_next = self.system.inv.substitute(self.prime_map)
-        res = []
-        for i in range(k):
-            subs_i = self._get_subs(i)
-            res.append(self.system.trans.substitute(subs_i))
-            res.append(inv_next.substitute(subs_i))
-        return And(res)
+        return And([self.system.get_step(i) for i in range(k)])
 
     def _get_simple_path(self, k: int) -> FNode:
         """Simple path constraint for k-induction:
         each time encodes a different state
         """
-        res = []
-        for i in range(k):
-            subs_i = self._get_subs(i)
-            for j in range(i + 1, k):
-                state = []
-                subs_j = self._get_subs(j)
-                for v in self.system.variables:
-                    v_i = v.substitute(subs_i)
-                    v_j = v.substitute(subs_j)
-                    state.append(Not(EqualsOrIff(v_i, v_j)))
-                res.append(Or(state))
-        return And(res)
-
-    def _get_k_hypothesis(self, prop: FNode, k: int) -> FNode:
-        """Hypothesis for k-induction: each state up to k-1 fulfills the property"""
-        res = []
-        for i in range(k):
-            subs_i = self._get_subs(i)
-            res.append(prop.substitute(subs_i))
-        return And(res)
+        return And([self._get_simple_path_row(j) for j in range(k)])
+
+    def _get_k_hypothesis(self, props: list, k: int) -> FNode:
+        """Hypothesis for k-induction: each state up to k-1 fulfills the properties"""
+        return And([self._at_time(prop, i) for prop in props for i in range(k)])
 
     def _get_bmc_query(self, prop: FNode, k: int) -> FNode:
         """Returns the BMC encoding at step k"""
-        subs_0 = self._get_subs(0)
-        init_0 = self.system.init.substitute(subs_0)
-        inv_0 = self.system.inv.substitute(subs_0)
-        prop_k = prop.substitute(self._get_subs(k))
+        init_0 = self._at_time(self.system.init, 0)
+        inv_0 = self._at_time(self.system.inv, 0)
+        prop_k = self._at_time(prop, k)
         return And(self._get_unrolling(k), init_0, inv_0, Not(prop_k))
 
-    def _get_kind_query(self, prop: FNode, k: int) -> FNode:
+    def _get_kind_query(self, prop: FNode, k: int, invariants: tuple = ()) -> FNode:
         """Returns the K-Induction encoding at step K"""
-        inv_0 = self.system.inv.substitute(self._get_subs(0))
-        prop_k = prop.substitute(self._get_subs(k))
+        inv_0 = self._at_time(self.system.inv, 0)
+        prop_k = self._at_time(prop, k)
         return And(
             inv_0,
             self._get_unrolling(k),
-            self._get_k_hypothesis(prop, k),
-            self._get_simple_path(k) if self.use_simple_path else TRUE(),
+            self._get_k_hypothesis([prop, *invariants], k),
+            (
+                self._get_simple_path(k)
+                if self.use_simple_path and not self.lazy_simple_path
+                else TRUE()
+            ),
             Not(prop_k),
         )
 
 
 class BMCInductionIncr(BMCInductionBase):
-    def check_property(self, prop: FNode) -> bool:
-        logging.debug("Checking property %s...", prop)
-        b = 0
-        while True:
-            not_prop_b = Not(prop.substitute(self._get_subs(b)))
-            self._push_bmc_constr(b)
-            logging.debug("BMC: Checking bound %d...", b)
-            if self.bmc_solver.is_sat(not_prop_b):
-                logging.info("Query reached at step %d", b)
+    """BMC and k-induction with one incremental solver each.
+
+    The assertion stack of each solver is flat: every bound adds one step of
+    the unrolling, which is shared by all properties, and never removes it.
+    The query of each check and the k-induction hypothesis of each property are
+    guarded by activation literals that are passed to the solver as
+    assumptions. The literal of a query is disabled once the query is unsat.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._bmc_bound = -1
+        self._kind_bound = -1
+        # property -> (activation literal, number of asserted hypotheses)
+        self._hypotheses = {}
+
+    def _check_bmc(self, prop: FNode, k: int) -> bool:
+        while self._bmc_bound < k:
+            self._bmc_bound += 1
+            self._push_bmc_constr(self._bmc_bound)
+        act = _add_query_literal(self.bmc_solver, Not(self._at_time(prop, k)))
+        if self._timed_solve(self.bmc_solver.solve, [act]):
+            return True
+        self.bmc_solver.add_assertion(Not(act))
+        return False
+
+    def _check_kind(self, prop: FNode, k: int, invariants: tuple = ()) -> bool:
+        while self._kind_bound < k:
+            self._kind_bound += 1
+            self._push_kind_constr(self._kind_bound)
+        act = _add_query_literal(self.ind_solver, Not(self._at_time(prop, k)))
+        assumptions = [act, *(self._add_hypotheses(p, k) for p in [prop, *invariants])]
+        while self._timed_solve(self.ind_solver.solve, assumptions):
+            constrs = self._refine_simple_path(self.ind_solver, k)
+            if not constrs:
                 return False
-            if self.check_ind:
-                self._push_kind_constr(b, prop)
-                logging.debug("IND: Checking bound %d...", b)
-                if self.ind_solver.is_unsat(not_prop_b):
-                    logging.info("Induction check passed at step %d", b)
-                    return True
-            b += 1
+            self.ind_solver.add_assertion(And(constrs))
+        self.ind_solver.add_assertion(Not(act))
+        return True
 
     def _push_bmc_constr(self, k: int) -> None:
         if k == 0:
-            subs_0 = self._get_subs(0)
-            init_0 = self.system.init.substitute(subs_0)
-            inv_0 = self.system.inv.substitute(subs_0)
-            _push_assertion(self.bmc_solver, And(init_0, inv_0))
+            init_0 = self._at_time(self.system.init, 0)
+            inv_0 = self._at_time(self.system.inv, 0)
+            self.bmc_solver.add_assertion(And(init_0, inv_0))
         else:
-            subs_map = self._get_subs(k - 1)
-            _push_assertion(self.bmc_solver, self._get_trans_step(subs_map))
+            self.bmc_solver.add_assertion(self.system.get_step(k - 1))
 
-    def _push_kind_constr(self, k: int, prop: FNode) -> None:
+    def _push_kind_constr(self, k: int) -> None:
         if k == 0:
-            _push_assertion(
-                self.ind_solver, self.system.inv.substitute(self._get_subs(0))
-            )
+            self.ind_solver.add_assertion(self._at_time(self.system.inv, 0))
             return
-        subs_map = self._get_subs(k - 1)
-        trans = self._get_trans_step(subs_map)
-        # build hypothesis
-        hypo = prop.substitute(subs_map)
+        trans = self.system.get_step(k - 1)
         # simple-path constraints
-        sp_constrs = []
-        if self.use_simple_path:
-            for i in range(k - 1):
-                state = []
-                subs_i = self._get_subs(i)
-                for v in self.system.variables:
-                    v_i = v.substitute(subs_i)
-                    v_j = v.substitute(subs_map)
-                    state.append(Not(EqualsOrIff(v_i, v_j)))
-                sp_constrs.append(Or(state))
-        sp_constrs = And(sp_constrs)
-        _push_assertion(self.ind_solver, And(trans, hypo, sp_constrs))
-
-    def _get_trans_step(self, subs_map: dict) -> FNode:
-        trans = And(
-            self.system.trans,
-            self.system.inv.substitute(self.prime_map),
+        sp_constrs = (
+            self._get_simple_path_row(k - 1)
+            if self.use_simple_path and not self.lazy_simple_path
+            else TRUE()
         )
-        return trans.substitute(subs_map)
+        self.ind_solver.add_assertion(And(trans, sp_constrs))
+
+    def _add_hypotheses(self, prop: FNode, k: int) -> FNode:
+        """Asserts act -> prop@i for i < k and returns the activation literal act"""
+        act, count = self._hypotheses.get(prop, (None, 0))
+        if act is None:
+            act = FreshSymbol(BOOL)
+        if count < k:
+            hypo = And([self._at_time(prop, i) for i in range(count, k)])
+            self.ind_solver.add_assertion(Implies(act, hypo))
+        self._hypotheses[prop] = (act, max(count, k))
+        return act
+
+
+class BoundJumpingBMC(BMCInduction):
+    """BMC that checks a window of bounds with one solver call.
+
+    The query of the window lo..hi is satisfiable if a violation is reachable
+    in j steps for some j from lo to hi; the steps after j are not required,
+    so that violations in states without successors are found, too. After a
+    satisfiable window, the shortest counterexample is searched by bisection.
+
+    The windows have `step` bounds, or start with `step` bounds and double
+    after every window without a violation if `geometric` is set.
+    """
+
+    def __init__(
+        self,
+        system: TransitionSystem,
+        solver: str,
+        step: int = 1,
+        geometric: bool = False,
+        max_bound: Optional[int] = None,
+    ):
+        if step < 1:
+            raise ValueError(f"Invalid BMC step {step}, must be positive")
+        super().__init__(system, solver, check_ind=False, max_bound=max_bound)
+        self.step = step
+        self.geometric = geometric
+
+    def check_properties(self, props: list[FNode]) -> list[Optional[bool]]:
+        logging.debug("Checking properties %s...", props)
+        verdicts = [None] * len(props)
+        tags = [f"Property {i}: " if len(props) > 1 else "" for i in range(len(props))]
+        lo, width = 0, self.step
+        try:
+            while None in verdicts:
+                if self.max_bound is not None and lo > self.max_bound:
+                    logging.info("Maximal bound %d reached", self.max_bound)
+                    break
+                hi = lo + width - 1
+                if self.max_bound is not None:
+                    hi = min(hi, self.max_bound)
+                logging.debug("BMC: Checking bounds %d to %d...", lo, hi)
+                for i, prop in enumerate(props):
+                    if verdicts[i] is None and self._record(
+                        "bmc", i, hi, self._check_window, prop, lo, hi
+                    ):
+                        k = self._find_shortest(i, prop, lo, hi)
+                        logging.info("%sQuery reached at step %d", tags[i], k)
+                        verdicts[i] = False
+                        self.traces[prop] = _get_trace(self.system, self.bmc_solver, k)
+                self.safe_bound = hi
+                lo = hi + 1
+                if self.geometric:
+                    width *= 2
+        except _INTERRUPTS as e:
+            _log_interrupt(e)
+        if None in verdicts:
+            _report_unknown(self.safe_bound)
+        STATS.set("bound", lo - 1)
+        STATS.set("solve_time", self.solve_time)
+        return verdicts
+
+    def _find_shortest(self, prop_index: int, prop: FNode, lo: int, hi: int) -> int:
+        """Returns the smallest bound at which a violation is reachable, if the
+        last call found a violation in the window lo..hi and none is reachable
+        below lo. The model of the BMC solver is left at a violation of this
+        bound."""
+        hi = self._get_violation_bound(prop, lo, hi)
+        model_bound = hi
+        while lo < hi:
+            mid = (lo + hi - 1) // 2
+            if self._record("bmc", prop_index, mid, self._check_window, prop, lo, mid):
+                hi = model_bound = self._get_violation_bound(prop, lo, mid)
+            else:
+                lo = mid + 1
+                model_bound = None
+        if model_bound != lo:
+            self._record("bmc", prop_index, lo, self._check_window, prop, lo, lo)
+        return lo
+
+    def _get_violation_bound(self, prop: FNode, lo: int, hi: int) -> int:
+        """Returns the smallest bound in lo..hi at which the model of the BMC
+        solver violates the property"""
+        for j in range(lo, hi):
+            if self.bmc_solver.get_py_value(Not(self._at_time(prop, j))):
+                return j
+        return hi
+
+    def _check_window(self, prop: FNode, lo: int, hi: int) -> bool:
+        query = self._get_window_query(prop, lo, hi)
+        return self._timed_solve(self.bmc_solver.is_sat, query)
+
+    def _get_window_query(self, prop: FNode, lo: int, hi: int) -> FNode:
+        """Returns the BMC encoding of the bounds lo to hi:
+
+        E.g. Init(0) & Inv(0) & T(0,1) & Inv(1) & ... & T(lo-1,lo) & Inv(lo) &
+        (!P(lo) | (T(lo,lo+1) & Inv(lo+1) & (!P(lo+1) | ... !P(hi))))
+        """
+        window = Not(self._at_time(prop, hi))
+        for j in range(hi - 1, lo - 1, -1):
+            window = Or(
+                Not(self._at_time(prop, j)), And(self.system.get_step(j), window)
+            )
+        init_0 = self._at_time(self.system.init, 0)
+        inv_0 = self._at_time(self.system.inv, 0)
+        return And(self._get_unrolling(lo), init_0, inv_0, window)
+
+
+# seconds between the checks whether the workers of a parallel algorithm are alive
+WORKER_POLL_INTERVAL = 0.5
+
+
+def _get_result(queue: multiprocessing.Queue, running: list) -> Optional[tuple]:
+    """Returns the next result of the workers from the queue.
+
+    The workers that have not reported their final result are `running`. If one
+    of them exits without it, e.g. because it was killed, it is removed from
+    `running` and None is returned.
+    """
+    while True:
+        try:
+            return queue.get(timeout=WORKER_POLL_INTERVAL)
+        except Empty:
+            pass
+        for worker in running:
+            if not worker.is_alive():
+                try:
+                    # the results sent before the exit are in the queue by now
+                    return queue.get(timeout=WORKER_POLL_INTERVAL)
+                except Empty:
+                    running.remove(worker)
+                    logging.warning(
+                        "%s exited without a result (exit code %s)",
+                        worker.name,
+                        worker.exitcode,
+                    )
+                    return None
+
+
+class ParallelBMCInduction(MCAlgorithm):
+    """Runs the BMC and the k-induction checks in two separate processes.
+
+    Each process advances its own bound. An induction proof at step k is only
+    reported once BMC has shown that no violation is reachable in k-1 steps.
+    """
+
+    def __init__(
+        self,
+        system: TransitionSystem,
+        solver: str,
+        prover_class: type = BMCInduction,
+        max_bound: Optional[int] = None,
+        **prover_args,
+    ):
+        self.system = system
+        self.solver = solver
+        self.prover_class = prover_class
+        self.max_bound = max_bound
+        self.prover_args = prover_args
+        self.traces = {}
+
+    def check_property(self, prop: FNode) -> Optional[bool]:
+        logging.debug("Checking property %s...", prop)
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        workers = {
+            stream: ctx.Process(
+                target=self._run_stream,
+                args=(stream, prop, queue),
+                name=f"{stream.upper()} worker",
+                daemon=True,
+            )
+            for stream in ("bmc", "ind")
+        }
+        for worker in workers.values():
+            worker.start()
+        running = list(workers.values())
+        safe_bound = -1  # no violation is reachable in up to safe_bound steps
+        ind_bound = None
+        try:
+            while running:
+                result = _get_result(queue, running)
+                if result is None:
+                    break
+                stream, b, res, trace = result
+                if stream == "error":
+                    raise RuntimeError(f"Parallel k-induction worker failed: {res}")
+                if stream == "unknown":
+                    break
+                if b is None or res:
+                    # the stream has reached the maximal bound or has finished
+                    running.remove(workers[stream])
+                if b is None:
+                    continue
+                if stream == "bmc":
+                    if res:
+                        logging.info("Query reached at step %d", b)
+                        self.traces[prop] = trace
+                        return False
+                    safe_bound = b
+                elif res:
+                    ind_bound = b
+                if ind_bound is not None and safe_bound >= ind_bound - 1:
+                    logging.info("Induction check passed at step %d", ind_bound)
+                    return True
+            else:
+                logging.info("Maximal bound %d reached", self.max_bound)
+        except LimitReachedError as e:
+            _log_interrupt(e)
+        finally:
+            for worker in workers.values():
+                worker.terminate()
+                worker.join()
+        _report_unknown(safe_bound)
+        return None
+
+    def _run_stream(
+        self, stream: str, prop: FNode, queue: multiprocessing.Queue
+    ) -> None:
+        """Checks bounds 0, 1, 2, ... with either BMC or k-induction
+        and reports the result of every bound to the queue, with the
+        counterexample trace of a violation.
+
+        The bound None is reported when the maximal bound is exceeded, and the
+        stream "unknown" when a check is interrupted.
+        """
+        try:
+            prover = self.prover_class(self.system, self.solver, **self.prover_args)
+            # generated while the BMC stream runs
+            invariants = tuple(prover._get_aux_invariants()) if stream == "ind" else ()
+            b = 0
+            while self.max_bound is None or b <= self.max_bound:
+                logging.debug("%s: Checking bound %d...", stream.upper(), b)
+                if stream == "bmc":
+                    res = prover._check_bmc(prop, b)
+                else:
+                    res = prover._check_kind(prop, b, invariants)
+                trace = None
+                if res and stream == "bmc":
+                    trace = _get_trace(self.system, prover.bmc_solver, b)
+                queue.put((stream, b, res, trace))
+                if res:
+                    return
+                b += 1
+            queue.put((stream, None, None, None))
+        except _INTERRUPTS as e:
+            _log_interrupt(e)
+            queue.put(("unknown", None, None, None))
+        except _ERRORS as e:
+            queue.put(("error", None, repr(e), None))
 
 
 class PDR(MCAlgorithm):
-    def __init__(self, system: TransitionSystem, solver: str):
+    """IC3/PDR with clause-based frames.
+
+    Frames are delta-encoded: a cube blocked at level i is excluded from the frames
+    F_1, ..., F_i, and `frames[i]` only holds the cubes whose level is exactly i.
+    Every frame has its own incremental solver; the transition relation and the
+    query of each check are guarded by activation literals.
+
+    Predecessor cubes are lifted to partial assignments with unsat cores, if the
+    solver supports them. As the transition relation need not be total, a
+    counterexample found with lifted cubes is confirmed by BMC.
+    """
+
+    def __init__(
+        self,
+        system: TransitionSystem,
+        solver: str,
+        lifting: bool = True,
+        max_frames: Optional[int] = None,
+    ):
         self.system = system
-        self.frames = [And(system.init, system.inv)]
-        self.solver = Solver(name=solver, logic=system.logic)
-        self.prime_map = {v: next_var(v) for v in self.system.variables}
+        self.solver_name = solver
+        self.max_frames = max_frames
+        self.prime_map = system.prime_map
+        # the property being checked, whose counterexample is confirmed by BMC
+        self._prop = None
+        self.frames = []
+        self.solvers = []
+        self._trans_acts = []
+        self._new_frame()
+        self.lifting = lifting
+        self._lift_solver = None
+        if lifting:
+            self._init_lifting()
+        # cube sizes before and after lifting
+        self.lifted_cubes = 0
+        self.lifted_literals_before = 0
+        self.lifted_literals_after = 0
+        # frame solver calls and the time spent in them
+        self.solver_calls = 0
+        self.solve_time = 0.0
+        self.traces = {}
+
+    def __del__(self):
+        for solver in getattr(self, "solvers", []):
+            solver.exit()
+        if getattr(self, "_lift_solver", None) is not None:
+            self._lift_solver.exit()
 
-    def check_property(self, prop: FNode) -> bool:
-        """Property Directed Reachability approach without optimizations."""
+    def check_property(self, prop: FNode) -> Optional[bool]:
         logging.debug("Checking property %s...", prop)
+        self._prop = prop
+        try:
+            return self._check_property(prop)
+        except _INTERRUPTS as e:
+            _log_interrupt(e)
+            # the last frame whose check for bad states has finished
+            _report_unknown(len(self.frames) - 2)
+            return None
+        finally:
+            if STATS.enabled:
+                STATS.set("pdr_frames", len(self.frames) - 1)
+                STATS.set("pdr_cubes", sum(len(frame) for frame in self.frames))
+                STATS.set("pdr_solver_calls", self.solver_calls)
+                STATS.set("solve_time", self.solve_time)
+                STATS.set("pdr_lifted_cubes", self.lifted_cubes)
+                STATS.set("pdr_lifted_literals_before", self.lifted_literals_before)
+                STATS.set("pdr_lifted_literals_after", self.lifted_literals_after)
+            if self.lifted_cubes > 0:
+                logging.debug(
+                    "PDR: Lifted %d cubes from %.1f to %.1f literals on average",
+                    self.lifted_cubes,
+                    self.lifted_literals_before / self.lifted_cubes,
+                    self.lifted_literals_after / self.lifted_cubes,
+                )
+
+    def _check_property(self, prop: FNode) -> Optional[bool]:
+        values = self._solve(0, Not(prop))
+        if values is not None:
+            logging.info("Query reached at frame 0")
+            self.traces[prop] = [self._get_trace_step(values)]
+            return False
+        self._new_frame()
 
         while True:
-            cube = self._get_bad_state(prop)
-            if cube is not None:
+            k = len(self.frames) - 1
+            values = self._solve(k, Not(prop))
+            if values is not None:
                 # Blocking phase of a bad state
-                if self._recursive_block(cube):
-                    logging.info("Query reached at frame %d", len(self.frames) - 1)
+                if not self._recursive_block(self._get_cube(values), k, (values, None)):
+                    logging.info("Query reached at frame %d", k)
                     return False
-                else:
-                    logging.debug("PDR: Cube blocked '%s'", str(cube))
-            else:
-                # Checking if the last two frames are equivalent i.e., are inductive
-                if self._is_inductive():
-                    logging.info(
-                        "Fixed-point reached at frame %d", len(self.frames) - 1
-                    )
-                    return True
-                else:
-                    logging.debug("PDR: Adding frame %d...", (len(self.frames)))
-                    self.frames.append(self.system.inv)
-
-    def _get_bad_state(self, prop: FNode) -> Optional[FNode]:
-        """Extracts a reachable state that intersects the negation
-        of the property and the last current frame"""
-        return self._solve(And(self.frames[-1], Not(prop)))
-
-    def _solve(self, formula: FNode) -> Optional[FNode]:
-        """Provides a satisfiable assignment to the state variables that are consistent with the input formula"""
-        if self.solver.solve([formula]):
-            return And(
-                [
-                    EqualsOrIff(v, self.solver.get_value(v))
-                    for v in self.system.variables
-                ]
+                continue
+            logging.debug("PDR: Adding frame %d...", k + 1)
+            if STATS.enabled:
+                STATS.event(
+                    "pdr_frame",
+                    frame=k + 1,
+                    cubes=[len(frame) for frame in self.frames[1:]],
+                    solver_calls=self.solver_calls,
+                    solve_time=self.solve_time,
+                )
+            self._new_frame()
+            if self._propagate():
+                logging.info("Fixed-point reached at frame %d", k)
+                return True
+            if self.max_frames is not None and k >= self.max_frames:
+                logging.info("Maximal number of frames %d reached", self.max_frames)
+                _report_unknown(k)
+                return None
+
+    def _new_frame(self) -> None:
+        """Appends an empty frame, the first frame is the initial condition."""
+        solver = Solver(name=self.solver_name, logic=self.system.logic)
+        solver.add_assertion(self.system.inv)
+        if not self.frames:
+            solver.add_assertion(self.system.init)
+        trans_act = FreshSymbol(BOOL)
+        solver.add_assertion(
+            Implies(
+                trans_act,
+                And(self.system.trans, self.system.inv.substitute(self.prime_map)),
             )
-        return None
+        )
+        self.frames.append(set())
+        self.solvers.append(solver)
+        self._trans_acts.append(trans_act)
 
-    def _recursive_block(self, cube: FNode) -> bool:
-        """Blocks the cube at each frame, if possible.
+    def _init_lifting(self) -> None:
+        try:
+            self._lift_solver = UnsatCoreSolver(
+                name=self.solver_name,
+                logic=self.system.logic,
+                unsat_cores_mode="all",
+            )
+        except NoSolverAvailableError:
+            logging.debug(
+                "PDR: '%s' provides no unsat cores, cube lifting is disabled",
+                self.solver_name,
+            )
+            self.lifting = False
+            return
+        self._lift_solver.add_assertion(
+            And(
+                self.system.inv,
+                self.system.trans,
+                self.system.inv.substitute(self.prime_map),
+            )
+        )
 
-        Returns True if the cube cannot be blocked.
+    def _solve(
+        self, i: int, formula: FNode, with_trans: bool = False
+    ) -> Optional[dict]:
+        """Checks F_i & formula (& T, if requested) and returns the values of the
+        variables (and of the next inputs, with T) if it is satisfiable."""
+        solver = self.solvers[i]
+        act = FreshSymbol(BOOL)
+        solver.add_assertion(Implies(act, formula))
+        assumptions = [act, self._trans_acts[i]] if with_trans else [act]
+        values = None
+        self.solver_calls += 1
+        start = time.perf_counter()
+        sat = solver.solve(assumptions)
+        self.solve_time += time.perf_counter() - start
+        if sat:
+            model_vars = list(self.system.variables)
+            if with_trans:
+                model_vars.extend(
+                    self.prime_map[v] for v in self.system.input_variables
+                )
+            values = solver.get_values(model_vars)
+        # retire the activation literal
+        solver.add_assertion(Not(act))
+        return values
+
+    def _get_cube(self, values: dict) -> frozenset:
+        """Builds the cube of an assignment.
+
+        Numeric and bit-vector values are encoded as the two bounds x <= c and
+        x >= c, so that generalization can drop either side.
+        """
+        cube = []
+        for v in self.system.variables:
+            value = values[v]
+            v_type = v.symbol_type()
+            if v_type.is_int_type() or v_type.is_real_type():
+                cube.extend([LE(v, value), LE(value, v)])
+            elif v_type.is_bv_type():
+                cube.extend([BVULE(v, value), BVULE(value, v)])
+            else:
+                cube.append(EqualsOrIff(v, value))
+        return frozenset(cube)
+
+    def _is_blocked(self, cube: frozenset, i: int) -> bool:
+        """Syntactic check whether a clause of F_i already excludes the cube"""
+        return any(blocked <= cube for frame in self.frames[i:] for blocked in frame)
+
+    def _get_predecessor(self, cube: frozenset, i: int) -> Optional[dict]:
+        """Returns a state in F_i & !cube that has a successor in the cube, if any."""
+        cube_f = And(cube)
+        return self._solve(
+            i, And(Not(cube_f), cube_f.substitute(self.prime_map)), with_trans=True
+        )
+
+    def _lift(self, pred: frozenset, cube: frozenset, values: dict) -> frozenset:
+        """Reduces the predecessor to the literals that force a successor in the cube,
+        with the next inputs fixed to their values in the model."""
+        next_inputs = [
+            EqualsOrIff(self.prime_map[v], values[self.prime_map[v]])
+            for v in self.system.input_variables
+        ]
+        self._lift_solver.push()
+        for lit in pred:
+            self._lift_solver.add_assertion(lit)
+        self._lift_solver.add_assertion(
+            And(*next_inputs, Not(And(cube).substitute(self.prime_map)))
+        )
+        lifted = pred
+        if not self._lift_solver.solve():
+            core = set(self._lift_solver.get_unsat_core())
+            lifted = frozenset(lit for lit in pred if lit in core)
+        self._lift_solver.pop()
+        # lifted cubes must not contain initial states
+        if lifted != pred and self._solve(0, And(lifted)) is not None:
+            lifted = pred
+        self.lifted_cubes += 1
+        self.lifted_literals_before += len(pred)
+        self.lifted_literals_after += len(lifted)
+        return lifted
+
+    def _recursive_block(self, cube: frozenset, k: int, path: tuple) -> bool:
+        """Blocks the cube at frame k, if possible.
+
+        The path is the chain of the models of the cube and of its successors up
+        to the bad state, as nested pairs (values, path of the successor).
+        Returns False if the cube is reachable from the initial states.
         """
-        for i in range(len(self.frames) - 1, 0, -1):
-            cubeprime = cube.substitute(self.prime_map)
-            cubepre = self._solve(
-                And(
-                    self.frames[i - 1],
-                    self.system.trans,
-                    self.system.inv.substitute(self.prime_map),
-                    Not(cube),
-                    cubeprime,
+        bad_cube, bad_path = cube, path
+        # obligations: frame, insertion order, cube, steps from the cube to a bad
+        # state, path
+        obligations = [(k, 0, cube, 0, path)]
+        count = 1
+        while obligations:
+            i, _, cube, depth, path = heapq.heappop(obligations)
+            if self._is_blocked(cube, i):
+                continue
+            values = self._get_predecessor(cube, i - 1)
+            if values is not None:
+                pred = self._get_cube(values)
+                if i - 1 == 0 or self._solve(0, And(pred)) is not None:
+                    # the predecessor is an initial state
+                    if self._confirm_counterexample(depth + 1, (values, path)):
+                        return False
+                    if not self.lifting:
+                        raise RuntimeError(
+                            f"PDR: Counterexample of length {depth + 1} is spurious"
+                        )
+                    logging.debug("PDR: Spurious counterexample, disable lifting")
+                    self.lifting = False
+                    # the obligations may contain lifted cubes, start over from
+                    # the bad state
+                    return self._recursive_block(bad_cube, k, bad_path)
+                if self.lifting:
+                    pred = self._lift(pred, cube, values)
+                heapq.heappush(
+                    obligations, (i - 1, count, pred, depth + 1, (values, path))
                 )
-            )
-            if cubepre is None:
-                for j in range(1, i + 1):
-                    self.frames[j] = And(self.frames[j], Not(cube))
-                return False
-            cube = cubepre
+                heapq.heappush(obligations, (i, count + 1, cube, depth, path))
+                count += 2
+                continue
+            blocked = self._generalize(cube, i)
+            logging.debug("PDR: Cube blocked at frame %d '%s'", i, And(blocked))
+            self._add_blocked_cube(blocked, i)
+            if i < k:
+                # the state still leads to a bad state, try a longer path
+                heapq.heappush(obligations, (i + 1, count, cube, depth, path))
+                count += 1
         return True
 
-    def _is_inductive(self) -> bool:
-        """Checks if last two frames are equivalent"""
-        if (
-            len(self.frames) > 1
-            and self._solve(Not(EqualsOrIff(self.frames[-1], self.frames[-2]))) is None
-        ):
+    def _get_trace_step(self, values: dict) -> list[str]:
+        return [to_smtlib(values[v], daggify=False) for v in self.system.variables]
+
+    def _confirm_counterexample(self, depth: int, path: tuple) -> bool:
+        """Checks by BMC that a violation is reachable in `depth` steps and
+        stores the counterexample trace.
+
+        Without lifting, the path consists of concrete states and the BMC query
+        is restricted to them, so that the trace is the path.
+        """
+        query = [
+            self.system.init.substitute(self.system.get_subs(0)),
+            self.system.inv.substitute(self.system.get_subs(0)),
+            Not(self._prop.substitute(self.system.get_subs(depth))),
+        ]
+        step = And(self.system.trans, self.system.inv.substitute(self.prime_map))
+        query.extend(step.substitute(self.system.get_subs(i)) for i in range(depth))
+        if not self.lifting:
+            for i in range(depth + 1):
+                values, path = path
+                query.extend(
+                    EqualsOrIff(v_i, values[v])
+                    for v, v_i in zip(self.system.variables, self.system.get_state(i))
+                )
+        with Solver(name=self.solver_name, logic=self.system.logic) as solver:
+            if not solver.is_sat(And(query)):
+                return False
+            self.traces[self._prop] = _get_trace(self.system, solver, depth)
             return True
+
+    def _generalize(self, cube: frozenset, i: int) -> frozenset:
+        """Drops literals of the cube as long as it is disjoint from the initial
+        states and inductive relative to F_(i-1)."""
+        for lit in sorted(cube, key=lambda lit: lit.node_id()):
+            if lit not in cube or len(cube) == 1:
+                continue
+            smaller = cube - {lit}
+            if (
+                self._solve(0, And(smaller)) is None
+                and self._get_predecessor(smaller, i - 1) is None
+            ):
+                cube = smaller
+        return cube
+
+    def _add_blocked_cube(self, cube: frozenset, i: int) -> None:
+        """Adds the clause !cube to the frames F_1, ..., F_i"""
+        # remove the cubes subsumed by the new one
+        for frame in self.frames[1 : i + 1]:
+            frame.difference_update([c for c in frame if cube <= c])
+        self.frames[i].add(cube)
+        clause = Not(And(cube))
+        for solver in self.solvers[1 : i + 1]:
+            solver.add_assertion(clause)
+
+    def _propagate(self) -> bool:
+        """Pushes clauses to the next frame whenever they are inductive relative to
+        their frame.
+
+        Returns True if two consecutive frames are equal, i.e.,
+        a frame is an inductive invariant.
+        """
+        for i in range(1, len(self.frames) - 1):
+            for cube in list(self.frames[i]):
+                if self._get_predecessor(cube, i) is None:
+                    self.frames[i].remove(cube)
+                    self.frames[i + 1].add(cube)
+                    self.solvers[i + 1].add_assertion(Not(And(cube)))
+            if not self.frames[i]:
+                return True
         return False
 
+
+class InterpolationMC(MCAlgorithm):
+    """Interpolation-based model checking (McMillan, CAV 2003).
+
+    For a bound k, the reachable states R, initially Init, are
+    over-approximated by interpolants of
+
+        A = R(0) & Inv(0) & T(0,1) & Inv(1)
+        B = T(1,2) & Inv(2) & ... & T(k-1,k) & Inv(k) & (Bad(1) | ... | Bad(k))
+
+    The interpolant, shifted from time 1 to time 0, is added to R until it adds
+    no new states, i.e., R is an inductive invariant that excludes the bad
+    states. If A & B is satisfiable, a violation is reachable in up to k steps
+    if R is still Init; otherwise R may be too coarse, and the procedure starts
+    over with bound k+1.
+    """
+
+    def __init__(
+        self, system: TransitionSystem, solver: str, max_bound: Optional[int] = None
+    ):
+        self.system = system
+        self.max_bound = max_bound
+        try:
+            self.interpolator = Interpolator(name=solver, logic=system.logic)
+        except NoSolverAvailableError:
+            raise ValueError(
+                f"Solver '{solver}' provides no interpolation for {system.logic}"
+            )
+        self.solver = Solver(name=solver, logic=system.logic)
+        # the variables at time 1 are renamed to time 0 in the interpolants
+        self._shift_back = dict(zip(system.get_state(1), system.variables))
+        self.interpolants = 0
+        self.solve_time = 0.0
+        self.traces = {}
+
     def __del__(self):
-        self.solver.exit()
+        for name in ("interpolator", "solver"):
+            if hasattr(self, name):
+                getattr(self, name).exit()
+
+    def _at_time(self, formula: FNode, i: int) -> FNode:
+        return formula.substitute(self.system.get_subs(i))
+
+    def check_property(self, prop: FNode) -> Optional[bool]:
+        logging.debug("Checking property %s...", prop)
+        # no violation is reachable in up to safe_bound steps
+        self.safe_bound = -1
+        k = 0
+        try:
+            if self._find_counterexample(prop, 0):
+                return False
+            self.safe_bound = 0
+            k = 1
+            while self.max_bound is None or k <= self.max_bound:
+                logging.debug("ITP: Checking bound %d...", k)
+                verdict = self._check_bound(prop, k)
+                if verdict is not None:
+                    return verdict
+                k += 1
+            logging.info("Maximal bound %d reached", self.max_bound)
+        except _INTERRUPTS as e:
+            _log_interrupt(e)
+        finally:
+            STATS.set("bound", k)
+            STATS.set("itp_interpolants", self.interpolants)
+            STATS.set("solve_time", self.solve_time)
+        _report_unknown(self.safe_bound)
+        return None
+
+    def _check_bound(self, prop: FNode, k: int) -> Optional[bool]:
+        """Computes interpolants with bound k until a fixed point is reached
+        (True), a violation is found (False), or the bound is too small (None)"""
+        bad = Or([Not(self._at_time(prop, i)) for i in range(1, k + 1)])
+        suffix = And([self.system.get_step(i) for i in range(1, k)] + [bad])
+        reached = self.system.init
+        iteration = 0
+        while True:
+            prefix = And(
+                self._at_time(reached, 0),
+                self._at_time(self.system.inv, 0),
+                self.system.get_step(0),
+            )
+            start = time.perf_counter()
+            itp = self.interpolator.binary_interpolant(prefix, suffix)
+            self.solve_time += time.perf_counter() - start
+            if STATS.enabled:
+                STATS.event(
+                    "itp",
+                    bound=k,
+                    iteration=iteration,
+                    result=itp is None,
+                    duration=time.perf_counter() - start,
+                )
+            if itp is None:
+                if iteration == 0:
+                    if self._find_counterexample(prop, k):
+                        return False
+                    raise RuntimeError(f"ITP: No counterexample up to bound {k}")
+                # the over-approximation reaches a bad state, refine with a
+                # larger bound
+                return None
+            if iteration == 0:
+                self.safe_bound = k
+            self.interpolants += 1
+            image = itp.substitute(self._shift_back)
+            if not self._timed_is_sat(And(image, Not(reached))):
+                logging.info("Fixed-point reached at bound %d", k)
+                return True
+            reached = Or(reached, image)
+            iteration += 1
+
+    def _timed_is_sat(self, formula: FNode) -> bool:
+        start = time.perf_counter()
+        try:
+            return self.solver.is_sat(formula)
+        finally:
+            self.solve_time += time.perf_counter() - start
+
+    def _find_counterexample(self, prop: FNode, k: int) -> bool:
+        """Searches the shortest violation in up to k steps by BMC, and stores
+        its trace"""
+        init = And(
+            self._at_time(self.system.init, 0), self._at_time(self.system.inv, 0)
+        )
+        for i in range(self.safe_bound + 1, k + 1):
+            query = And(
+                init,
+                *(self.system.get_step(j) for j in range(i)),
+                Not(self._at_time(prop, i)),
+            )
+            if self._timed_is_sat(query):
+                logging.info("Query reached at step %d", i)
+                self.traces[prop] = _get_trace(self.system, self.solver, i)
+                return True
+        return False
+
+
+class Portfolio(MCAlgorithm):
+    """Runs several configurations in separate processes, the first verdict wins.
+
+    Each member is a namespace of command-line arguments as accepted by `get_prover`.
+    """
+
+    # seconds a terminated member may take to exit its solvers before it is killed
+    EXIT_GRACE_PERIOD = 2.0
+
+    def __init__(
+        self,
+        system: TransitionSystem,
+        members: list[tuple[str, Namespace]],
+        task: str = "",
+        log_file: Optional[str] = None,
+    ):
+        if not members:
+            raise ValueError("Portfolio has no configurations")
+        self.system = system
+        self.members = members
+        self.task = task
+        self.log_file = log_file
+        self.winner = None
+        self.traces = {}
+
+    def check_property(self, prop: FNode) -> Optional[bool]:
+        logging.debug("Checking property %s...", prop)
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        workers = [
+            ctx.Process(
+                target=self._run_member,
+                args=(i, prop, queue),
+                name=f"Portfolio: '{name}'",
+            )
+            for i, (name, _) in enumerate(self.members)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        running = list(workers)
+        try:
+            failed = 0
+            while running:
+                result = _get_result(queue, running)
+                if result is None:
+                    # the member that has exited has no verdict
+                    continue
+                i, verdict, error, trace = result
+                running.remove(workers[i])
+                name = self.members[i][0]
+                if verdict is None:
+                    if error is not None:
+                        logging.warning("Portfolio: '%s' failed: %s", name, error)
+                        failed += 1
+                    else:
+                        logging.info("Portfolio: '%s' returned unknown", name)
+                    continue
+                elapsed = time.perf_counter() - start
+                logging.info("Portfolio: '%s' finished first (%.3fs)", name, elapsed)
+                self.winner = name
+                if trace is not None:
+                    self.traces[prop] = trace
+                self._record_winner(verdict, elapsed)
+                return verdict
+            if failed == len(self.members):
+                raise RuntimeError("All portfolio configurations failed")
+            return None
+        except LimitReachedError as e:
+            _log_interrupt(e)
+            return None
+        finally:
+            self._stop(workers)
+
+    def _run_member(self, i: int, prop: FNode, queue: multiprocessing.Queue) -> None:
+        # exit through the interpreter on termination, so that the solvers are
+        # released by the destructors of the provers
+        signal.signal(signal.SIGTERM, _raise_system_exit)
+        signal.signal(signal.SIGALRM, _raise_system_exit)
+        try:
+            prover = get_prover(self.members[i][1], self.system)
+            verdict = prover.check_property(prop)
+            queue.put((i, verdict, None, prover.traces.get(prop)))
+        except _INTERRUPTS:
+            queue.put((i, None, None, None))
+        except _ERRORS as e:
+            queue.put((i, None, repr(e), None))
+
+    def _stop(self, workers: list) -> None:
+        for worker in workers:
+            worker.terminate()
+        deadline = time.monotonic() + self.EXIT_GRACE_PERIOD
+        for worker in workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+            if worker.is_alive():
+                # stuck in a solver call that cannot be interrupted
+                worker.kill()
+                worker.join()
+
+    def _record_winner(self, verdict: bool, elapsed: float) -> None:
+        if self.log_file is None:
+            return
+        record = {
+            "task": self.task,
+            "system": self.system.name,
+            "winner": self.winner,
+            "verdict": "safe" if verdict else "unsafe",
+            "time": round(elapsed, 3),
+            "configurations": [name for name, _ in self.members],
+        }
+        with open(self.log_file, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+# the verdicts of the properties (None if unknown) and their counterexample traces
+Results = tuple[list[Optional[bool]], list[Optional[list]]]
+
+
+def check_properties(
+    args: Namespace,
+    system: TransitionSystem,
+    props: list[FNode],
+    time_limit: Optional[float] = None,
+) -> Results:
+    """Checks all properties, with one shared prover if the algorithm supports
+    it, and with a new prover per property otherwise.
+
+    With a time limit, the model checker runs in a child process, see
+    `_check_in_process`.
+
+    Returns the verdicts and the counterexample traces of the properties.
+    """
+    if time_limit is not None:
+        return _check_in_process(args, system, props, time_limit)
+    if getattr(args, "sim_prepass", False) and args.mc_alg != "sim":
+        return _check_after_simulation(args, system, props)
+    return _check_with_prover(args, system, props)
+
+
+def _check_after_simulation(
+    args: Namespace, system: TransitionSystem, props: list[FNode]
+) -> Results:
+    """Simulates random traces first, and checks the properties that no trace
+    violates with the model checker"""
+    simulation = _get_simulation(args, system)
+    verdicts = simulation.check_properties(props)
+    traces = [simulation.traces.get(prop) for prop in props]
+    open_props = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    logging.info(
+        "Simulation: %d of %d queries violated",
+        len(props) - len(open_props),
+        len(props),
+    )
+    if open_props and not _time_limit_expired():
+        open_verdicts, open_traces = _check_with_prover(
+            args, system, [props[i] for i in open_props]
+        )
+        for i, verdict, trace in zip(open_props, open_verdicts, open_traces):
+            verdicts[i] = verdict
+            traces[i] = trace
+    return verdicts, traces
+
+
+def _check_with_prover(
+    args: Namespace, system: TransitionSystem, props: list[FNode]
+) -> Results:
+    prover = get_prover(args, system)
+    if len(props) == 1:
+        verdicts = [prover.check_property(props[0])]
+    elif isinstance(prover, MultiPropertyMCAlgorithm):
+        verdicts = prover.check_properties(props)
+    else:
+        verdicts = [prover.check_property(props[0])]
+        for prop in props[1:]:
+            if _time_limit_expired():
+                verdicts.append(None)
+                continue
+            prop_prover = get_prover(args, system)
+            verdicts.append(prop_prover.check_property(prop))
+            prover.traces.update(prop_prover.traces)
+    return verdicts, [prover.traces.get(prop) for prop in props]
+
+
+# seconds the model checker may take to report its results after the time limit
+# has expired, before it is killed
+TIME_LIMIT_GRACE_PERIOD = 1.0
+
+
+def _check_in_process(
+    args: Namespace, system: TransitionSystem, props: list[FNode], time_limit: float
+) -> Results:
+    """Runs `check_properties` with the time limit (see `set_time_limit`) in a
+    child process. If the child has not reported its results shortly after the
+    limit, e.g. because a solver call ignores the interrupt, it is killed with
+    all its workers and the properties are unknown."""
+    if time_limit <= 0:
+        logging.warning("Time limit reached")
+        return [None] * len(props), [None] * len(props)
+    ctx = multiprocessing.get_context("fork")
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=_run_checker, args=(args, system, props, time_limit, sender)
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(time_limit + TIME_LIMIT_GRACE_PERIOD):
+            logging.warning("Time limit reached, the model checker is killed")
+            return [None] * len(props), [None] * len(props)
+        try:
+            result = receiver.recv()
+        except EOFError:
+            raise RuntimeError(
+                f"Model checker exited unexpectedly (exit code {process.exitcode})"
+            )
+        process.join(TIME_LIMIT_GRACE_PERIOD)
+    finally:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # the process group has already exited or was not created yet
+            process.kill()
+        process.join()
+    if isinstance(result, Exception):
+        raise result
+    verdicts, traces, values, events = result
+    STATS.restore(values, events)
+    return verdicts, traces
+
+
+def _run_checker(
+    args: Namespace,
+    system: TransitionSystem,
+    props: list[FNode],
+    time_limit: float,
+    sender,
+) -> None:
+    # a process group of its own, so that the workers of parallel algorithms are
+    # killed with the process
+    os.setsid()
+    try:
+        set_time_limit(time_limit)
+        verdicts, traces = check_properties(args, system, props)
+    except _INTERRUPTS as e:
+        # raised outside the checks, e.g. while the solvers are created
+        _log_interrupt(e)
+        verdicts, traces = [None] * len(props), [None] * len(props)
+    except _ERRORS as e:
+        try:
+            sender.send(e)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # the exception cannot be pickled
+            sender.send(RuntimeError(repr(e)))
+        return
+    # the results are sent even if the time limit expires now
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sender.send((verdicts, traces, STATS.values, STATS.events))
 
 
 def get_prover(args: Namespace, system: TransitionSystem) -> MCAlgorithm:
     if args.mc_alg in {"bmc", "kind"}:
         check_ind = args.mc_alg == "kind"
+        if not check_ind and (args.bmc_step > 1 or args.bmc_geometric):
+            return BoundJumpingBMC(
+                system,
+                args.solver,
+                step=args.bmc_step,
+                geometric=args.bmc_geometric,
+                max_bound=args.max_bound,
+            )
         mcer = BMCInductionIncr if args.incr_solving else BMCInduction
+        if check_ind and args.parallel_kind:
+            return ParallelBMCInduction(
+                system,
+                args.solver,
+                prover_class=mcer,
+                max_bound=args.max_bound,
+                use_simple_path=args.use_simple_path,
+                lazy_simple_path=args.lazy_simple_path,
+                aux_invariants=args.aux_invariants,
+            )
         return mcer(
             system,
             args.solver,
             check_ind=check_ind,
             use_simple_path=args.use_simple_path,
+            lazy_simple_path=args.lazy_simple_path,
+            max_bound=args.max_bound,
+            aux_invariants=args.aux_invariants,
         )
     elif args.mc_alg == "pdr":
-        return PDR(system, args.solver)
+        return PDR(
+            system, args.solver, lifting=args.use_lifting, max_frames=args.max_frames
+        )
+    elif args.mc_alg == "itp":
+        return InterpolationMC(system, args.solver, max_bound=args.max_bound)
+    elif args.mc_alg == "sim":
+        return _get_simulation(args, system)
+    elif args.mc_alg == "portfolio":
+        return Portfolio(
+            system,
+            args.portfolio,
+            task=args.moxi_json,
+            log_file=args.portfolio_log,
+        )
     else:
         raise ValueError(f"Unsupported model-checking algorithm '{args.mc_alg}'")
+
+
+def _get_simulation(
+    args: Namespace, system: TransitionSystem
+) -> MultiPropertyMCAlgorithm:
+    # NumPy is only required for random simulation
+    try:
+        from moxichecker.simulation import get_simulation
+    except ImportError as e:
+        raise ValueError(f"Random simulation requires NumPy: {e}")
+    return get_simulation(args, system)
+
+
+def _find_invariants(system: TransitionSystem, solver: str) -> list[FNode]:
+    # the candidates are filtered by simulation, which requires NumPy
+    try:
+        from moxichecker.invariants import find_invariants
+    except ImportError as e:
+        logging.warning("Auxiliary invariants require NumPy: %s", e)
+        return []
+    return find_invariants(system, solver)
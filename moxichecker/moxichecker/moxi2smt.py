@@ -1,4 +1,6 @@
 import logging
+import time
+from typing import Optional
 from pysmt.shortcuts import (
     TRUE,
     FALSE,
@@ -55,6 +57,18 @@ from pysmt.shortcuts import (
 )
 from pysmt.typing import BVType, ArrayType, PySMTType, BOOL, REAL, INT
 from pysmt.fnode import FNode
+from pysmt.oracles import get_logic as get_pysmt_logic
+from moxichecker.loader import CommandIndex
+
+
+def _bv_smod(a: FNode, b: FNode) -> FNode:
+    """Signed modulo: the remainder of a / b whose sign follows b"""
+    zero = BV(0, a.bv_width())
+    rem = BVSRem(a, b)
+    # the remainder of BVSRem follows the sign of a
+    fix = And(Not(EqualsOrIff(rem, zero)), Xor(BVSLT(rem, zero), BVSLT(b, zero)))
+    return Ite(fix, BVAdd(rem, b), rem)
+
 
 BOOL_OPERATIONS = {
     "true": lambda _: TRUE(),
@@ -92,7 +106,7 @@ BITVEC_OPERATIONS = {
     "bvsdiv": lambda A: BVSDiv(A[0], A[1]),
     "bvurem": lambda A: BVURem(A[0], A[1]),
     "bvsrem": lambda A: BVSRem(A[0], A[1]),
-    "bvsmod": lambda A: BVSub(A[0], BVMul(A[1], BVUDiv(A[0], A[1]))),
+    "bvsmod": lambda A: _bv_smod(A[0], A[1]),
     "bvand": lambda A: BVAnd(A[0], A[1]),
     "bvnand": lambda A: BVNot(BVAnd(A[0], A[1])),
     "bvor": lambda A: BVOr(A[0], A[1]),
@@ -131,11 +145,24 @@ CONVERSION_OPERATIONS = {
     "is_int": lambda A: A[0].is_int(),
 }
 
+# all operations in one table; the tables are disjoint, on a clash the later
+# ones would take precedence
+OPERATIONS = {
+    **CONVERSION_OPERATIONS,
+    **ARRAY_OPERATIONS,
+    **BITVEC_OPERATIONS,
+    **INT_REAL_OPERATIONS,
+    **BOOL_OPERATIONS,
+}
+
 BV_LOGIC = {"QF_BV", "QF_ABV"}
 INT_LOGIC = {"QF_LIA", "QF_NIA"}
 REAL_LOGIC = {"QF_LRA", "QF_NRA"}
 SUPPORTED_LOGIC = BV_LOGIC | INT_LOGIC | REAL_LOGIC
 
+# a reachability query as (name, formula)
+Query = tuple[str, FNode]
+
 
 def next_var(var: FNode) -> FNode:
     return Symbol(f"next({var.symbol_name()})", var.symbol_type())
@@ -145,31 +172,50 @@ def at_time(var: FNode, t: int) -> FNode:
     return Symbol(f"{var.symbol_name()}@{t}", var.symbol_type())
 
 
-def get_logic(commands: list) -> str:
-    for cmd in commands:
-        if cmd["command"] == "set-logic":
-            # return the 1st command found
-            logic = cmd["logic"]
-            if logic not in SUPPORTED_LOGIC:
-                raise ValueError(f"set-logic '{logic}' is not supported")
-            return logic
-    raise ValueError("No set-logic defined")
+def infer_logic(formulas: list) -> str:
+    """Returns the smallest supported logic of the formulas"""
+    theory = get_pysmt_logic(And(formulas)).theory
+    if theory.arrays or theory.bit_vectors:
+        return "QF_ABV" if theory.arrays else "QF_BV"
+    if theory.real_arithmetic:
+        return "QF_LRA" if theory.linear else "QF_NRA"
+    return "QF_LIA" if theory.linear else "QF_NIA"
 
 
-def get_define_system(commands: list, symbol: str) -> dict:
+def _find_command(commands, kind: str, symbol: Optional[str] = None):
+    if isinstance(commands, CommandIndex):
+        return commands.find(kind, symbol)
     for cmd in commands:
-        if cmd["command"] == "define-system" and cmd["symbol"] == symbol:
-            # return the 1st command found
+        if cmd["command"] == kind and (symbol is None or cmd["symbol"] == symbol):
             return cmd
-    raise ValueError("System to be checked is not defined")
+    return None
 
 
-def get_check_system(commands: list) -> dict:
-    for cmd in commands:
-        if cmd["command"] == "check-system":
-            # return the 1st command found
-            return cmd
-    raise ValueError("No system check specified")
+def get_logic(commands) -> str:
+    # return the 1st command found
+    cmd = _find_command(commands, "set-logic")
+    if cmd is None:
+        raise ValueError("No set-logic defined")
+    logic = cmd["logic"]
+    if logic not in SUPPORTED_LOGIC:
+        raise ValueError(f"set-logic '{logic}' is not supported")
+    return logic
+
+
+def get_define_system(commands, symbol: str) -> dict:
+    # return the 1st command found
+    cmd = _find_command(commands, "define-system", symbol)
+    if cmd is None:
+        raise ValueError("System to be checked is not defined")
+    return cmd
+
+
+def get_check_system(commands) -> dict:
+    # return the 1st command found
+    cmd = _find_command(commands, "check-system")
+    if cmd is None:
+        raise ValueError("No system check specified")
+    return cmd
 
 
 class TransitionSystem:
@@ -179,27 +225,128 @@ class TransitionSystem:
         self.name = def_sys_cmd["symbol"]
         self.logic = logic
         var_map = _get_variables(def_sys_cmd)
-        self.variables = list(var_map.values())
+        self._set_variables(
+            list(var_map.values()),
+            [var_map[var["symbol"]] for var in def_sys_cmd.get("input", [])],
+        )
         logging.debug("Variables: %s", self.variables)
-        self.init = _construct_formula(logic, var_map, def_sys_cmd["init"])
+        start = time.perf_counter()
+        builder = _FormulaBuilder(logic, var_map)
+        self.init = builder.build(def_sys_cmd["init"])
         logging.debug("Init formula: %s", self.init)
-        self.trans = _construct_formula(logic, var_map, def_sys_cmd["trans"])
+        self.trans = builder.build(def_sys_cmd["trans"])
         logging.debug("Transition-relation formula: %s", self.trans)
-        self.inv = _construct_formula(logic, var_map, def_sys_cmd["inv"])
+        self.inv = builder.build(def_sys_cmd["inv"])
         logging.debug("Invariant formula: %s", self.inv)
+        self.translation_time = time.perf_counter() - start
+        logging.debug(
+            "Translated system in %.3fs (%d terms, %d from cache)",
+            self.translation_time,
+            builder.num_terms,
+            builder.num_cached,
+        )
+
+    @classmethod
+    def from_formulas(
+        cls,
+        name: str,
+        logic: str,
+        variables: list,
+        input_variables: list,
+        init: FNode,
+        trans: FNode,
+        inv: FNode,
+    ) -> "TransitionSystem":
+        """Creates a system from formulas over `variables` and their next-state
+        versions (see `next_var`), e.g. for front ends other than MoXI."""
+        system = cls.__new__(cls)
+        system.name = name
+        system.logic = logic
+        system._set_variables(variables, input_variables)
+        system.init = init
+        system.trans = trans
+        system.inv = inv
+        system.translation_time = 0.0
+        return system
+
+    def _set_variables(self, variables: list, input_variables: list) -> None:
+        self.variables = variables
+        self.var_index = {v: i for i, v in enumerate(self.variables)}
+        self.input_variables = input_variables
+        self.next_variables = [next_var(v) for v in self.variables]
+        self.prime_map = dict(zip(self.variables, self.next_variables))
+        # timed symbols x@t, indexed by time frame and variable index
+        self._states = []
+        self._subs = []
+        # T(t,t+1) & Inv(t+1), indexed by time frame
+        self._steps = []
+
+    def reduce(self, variables: list, init: FNode, trans: FNode, inv: FNode) -> None:
+        """Replaces the system by one over a subset of its variables."""
+        kept = set(variables)
+        self._set_variables(
+            [v for v in self.variables if v in kept],
+            [v for v in self.input_variables if v in kept],
+        )
+        self.init = init
+        self.trans = trans
+        self.inv = inv
 
+    def get_state(self, t: int) -> list[FNode]:
+        """Returns the variables at time t, in the order of `variables`."""
+        while len(self._states) <= t:
+            i = len(self._states)
+            self._states.append([at_time(v, i) for v in self.variables])
+        return self._states[t]
 
-def get_query(check_sys_cmd: dict, logic: str) -> tuple[str, FNode]:
+    def get_timed_var(self, var: FNode, t: int) -> FNode:
+        """Returns the symbol of the state variable var at time t."""
+        return self.get_state(t)[self.var_index[var]]
+
+    def get_subs(self, t: int) -> dict:
+        """Returns the map from x to x@t and from x' to x@(t+1), for all x.
+
+        The maps are shared between all callers and must not be modified.
+        """
+        while len(self._subs) <= t:
+            i = len(self._subs)
+            subs = dict(zip(self.variables, self.get_state(i)))
+            subs.update(zip(self.next_variables, self.get_state(i + 1)))
+            self._subs.append(subs)
+        return self._subs[t]
+
+    def get_step(self, t: int) -> FNode:
+        """Returns T(t,t+1) & Inv(t+1).
+
+        Each step is built once and shared by all queries and model checkers
+        on the system.
+        """
+        if len(self._steps) <= t:
+            step = And(self.trans, self.inv.substitute(self.prime_map))
+            while len(self._steps) <= t:
+                self._steps.append(step.substitute(self.get_subs(len(self._steps))))
+        return self._steps[t]
+
+
+def get_queries(check_sys_cmd: dict, logic: str) -> list[Query]:
+    """Returns the reachability formulas referenced by the queries, in order"""
     var_map = _get_variables(check_sys_cmd)
+    reachables = {r["symbol"]: r["formula"] for r in check_sys_cmd["reachable"]}
+    builder = _FormulaBuilder(logic, var_map)
+    queries = {}
     for query in check_sys_cmd["query"]:
         for formula in query["formulas"]:
-            for reachables in check_sys_cmd["reachable"]:
-                if reachables["symbol"] == formula:
-                    # return the 1st property found
-                    f = _construct_formula(logic, var_map, reachables["formula"])
-                    logging.debug("Query Formula: %s", f)
-                    return reachables["symbol"], f
-    raise ValueError("No query specified")
+            if formula in reachables and formula not in queries:
+                queries[formula] = builder.build(reachables[formula])
+                logging.debug("Query Formula: %s", queries[formula])
+    if not queries:
+        raise ValueError("No query specified")
+    return list(queries.items())
+
+
+def get_query(check_sys_cmd: dict, logic: str) -> Query:
+    # return the 1st property found
+    return get_queries(check_sys_cmd, logic)[0]
 
 
 def _bv_literal(value: str) -> FNode:
@@ -240,51 +387,88 @@ def _get_variables(system_definition: dict) -> dict:
     return variables
 
 
-def _construct_formula(logic: str, variables: dict, prop: dict) -> FNode:
-    identifier = prop["identifier"]
-    if isinstance(identifier, dict):
-        if "symbol" in identifier:
-            symbol = identifier["symbol"]
-            args = []
-            if "args" in prop:
-                for arg in prop["args"]:
-                    args.append(_construct_formula(logic, variables, arg))
-            if "indices" in identifier and identifier["indices"]:
-                args.extend(identifier["indices"])
-            if symbol == "const":
-                return args[0]
-            if symbol in BOOL_OPERATIONS:
-                return BOOL_OPERATIONS[symbol](args)
-            elif symbol in INT_REAL_OPERATIONS:
-                return INT_REAL_OPERATIONS[symbol](args)
-            elif symbol in BITVEC_OPERATIONS:
-                return BITVEC_OPERATIONS[symbol](args)
-            elif symbol in ARRAY_OPERATIONS:
-                return ARRAY_OPERATIONS[symbol](args)
-            elif symbol in CONVERSION_OPERATIONS:
-                return CONVERSION_OPERATIONS[symbol](args)
-            else:
-                raise ValueError(f"Invalid symbol: {symbol}")
+class _FormulaBuilder:
+    """Translates MoXI-JSON terms to pySMT formulas.
+
+    The term tree is traversed iteratively, so the depth of a term is not
+    limited by the recursion limit. Every JSON node is still visited; the cache
+    of (operator, indices, arguments) only saves the construction and type
+    checking of repeated subterms in pySMT.
+    """
+
+    def __init__(self, logic: str, variables: dict):
+        self.logic = logic
+        self.variables = variables
+        self._cache = {}
+        self.num_terms = 0
+        self.num_cached = 0
+
+    def build(self, prop: dict) -> FNode:
+        results = []
+        # (term, True if its arguments are already translated)
+        stack = [(prop, False)]
+        while stack:
+            term, expanded = stack.pop()
+            identifier = term["identifier"]
+            if isinstance(identifier, str):
+                results.append(self._get_atom(identifier))
+                continue
+            if not isinstance(identifier, dict):
+                raise ValueError("Identifier is neither dict or str")
+            if "symbol" not in identifier:
+                raise ValueError(
+                    f"Invalid identifier format: missing 'symbol' key ({identifier})"
+                )
+            args = term.get("args", [])
+            if not expanded:
+                stack.append((term, True))
+                stack.extend((arg, False) for arg in reversed(args))
+                continue
+            first_arg = len(results) - len(args)
+            arg_formulas = tuple(results[first_arg:])
+            del results[first_arg:]
+            results.append(self._apply(identifier, arg_formulas))
+        return results[0]
+
+    def _apply(self, identifier: dict, args: tuple) -> FNode:
+        symbol = identifier["symbol"]
+        indices = tuple(identifier.get("indices") or ())
+        key = (symbol, indices, args)
+        self.num_terms += 1
+        res = self._cache.get(key)
+        if res is not None:
+            self.num_cached += 1
+            return res
+        if symbol == "const":
+            res = args[0]
+        elif symbol in OPERATIONS:
+            res = OPERATIONS[symbol]([*args, *indices])
         else:
-            raise ValueError(
-                f"Invalid identifier format: missing 'symbol' key ({identifier})"
-            )
-    elif isinstance(identifier, str):
-        if identifier in variables:
-            return variables[identifier]
+            raise ValueError(f"Invalid symbol: {symbol}")
+        self._cache[key] = res
+        return res
+
+    def _get_atom(self, identifier: str) -> FNode:
+        self.num_terms += 1
+        res = self._cache.get(identifier)
+        if res is not None:
+            self.num_cached += 1
+            return res
+        if identifier in self.variables:
+            res = self.variables[identifier]
         elif identifier.endswith("'"):
-            return next_var(variables[identifier[:-1]])
+            res = next_var(self.variables[identifier[:-1]])
         elif identifier == "true":
-            return TRUE()
+            res = TRUE()
         elif identifier == "false":
-            return FALSE()
-        elif logic in BV_LOGIC and identifier.startswith("#"):
-            return _bv_literal(identifier)
-        elif logic in REAL_LOGIC:
-            return Real(float(identifier))
-        elif logic in INT_LOGIC:
-            return Int(int(identifier))
+            res = FALSE()
+        elif self.logic in BV_LOGIC and identifier.startswith("#"):
+            res = _bv_literal(identifier)
+        elif self.logic in REAL_LOGIC:
+            res = Real(float(identifier))
+        elif self.logic in INT_LOGIC:
+            res = Int(int(identifier))
         else:
             raise ValueError(f"Unknown identifier: {identifier}")
-    else:
-        raise ValueError("Identifier is neither dict or str")
+        self._cache[identifier] = res
+        return res
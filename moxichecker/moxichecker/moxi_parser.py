@@ -0,0 +1,189 @@
+"""
+Reader for MoXI files in the S-expression syntax.
+
+The commands are translated into the structures of the MoXI-JSON format, so
+that they can be consumed by `get_logic`, `get_define_system`,
+`get_check_system` and `TransitionSystem` without the JSON conversion step.
+"""
+
+import re
+from typing import Any, Iterator, Union
+
+Sexp = Union[str, list]
+
+# comments, parentheses, quoted symbols, string literals, other atoms, and any
+# other (invalid) character
+_TOKEN = re.compile(r';[^\n]*|[()]|\|[^|]*\||"(?:[^"]|"")*"|[^\s()|;"]+|\S')
+
+_LPAREN = "("
+_RPAREN = ")"
+
+_UNSUPPORTED_BINDERS = {"let", "forall", "exists", "!"}
+
+_FORMULA_ATTRIBUTES = {"init", "trans", "inv"}
+_NAMED_FORMULA_ATTRIBUTES = {"assumption", "fairness", "reachable", "current"}
+_VARIABLE_ATTRIBUTES = {"input", "output", "local"}
+
+
+def parse_moxi(text: str) -> Iterator[dict]:
+    """Yields the commands of a MoXI file one by one"""
+    for sexp in read_sexps(text):
+        yield _to_command(sexp)
+
+
+def read_sexps(text: str) -> Iterator[list]:
+    stack = []
+    current = None
+    for token in _TOKEN.findall(text):
+        if token == _LPAREN:
+            if current is not None:
+                stack.append(current)
+            current = []
+        elif token == _RPAREN:
+            if current is None:
+                raise ValueError("Unbalanced ')'")
+            if stack:
+                stack[-1].append(current)
+                current = stack.pop()
+            else:
+                yield current
+                current = None
+        elif token[0] == ";":
+            continue
+        else:
+            if token in ('"', "|"):
+                raise ValueError(f"Unterminated {token}")
+            if token[0] == "|":
+                token = token[1:-1]
+            if current is None:
+                raise ValueError(f"Unexpected atom '{token}' outside of a command")
+            current.append(token)
+    if current is not None:
+        raise ValueError("Unexpected end of input: unbalanced '('")
+
+
+def _to_command(sexp: list) -> dict:
+    if not sexp or not isinstance(sexp[0], str):
+        raise ValueError(f"Invalid command: {sexp}")
+    name = sexp[0]
+    if name == "set-logic":
+        return {"command": name, "logic": sexp[1]}
+    if name == "define-system":
+        cmd = {
+            "command": name,
+            "symbol": sexp[1],
+            "input": [],
+            "output": [],
+            "local": [],
+            "init": {"identifier": "true"},
+            "trans": {"identifier": "true"},
+            "inv": {"identifier": "true"},
+            "subsys": [],
+        }
+        cmd.update(_get_attributes(sexp[2:]))
+        return cmd
+    if name == "check-system":
+        cmd = {
+            "command": name,
+            "symbol": sexp[1],
+            "input": [],
+            "output": [],
+            "local": [],
+            "assumption": [],
+            "fairness": [],
+            "reachable": [],
+            "current": [],
+            "query": [],
+            "queries": [],
+        }
+        cmd.update(_get_attributes(sexp[2:]))
+        return cmd
+    # other commands are not used by the model checker
+    cmd = {"command": name}
+    if len(sexp) > 1 and isinstance(sexp[1], str):
+        cmd["symbol"] = sexp[1]
+    return cmd
+
+
+def _get_attributes(sexps: list) -> dict:
+    attributes: dict[str, Any] = {}
+    for i in range(0, len(sexps), 2):
+        keyword = sexps[i]
+        if not isinstance(keyword, str) or not keyword.startswith(":"):
+            raise ValueError(f"Expected attribute keyword, got {keyword}")
+        if i + 1 >= len(sexps):
+            raise ValueError(f"Missing value of attribute {keyword}")
+        key, value = keyword[1:], sexps[i + 1]
+        if key in _VARIABLE_ATTRIBUTES:
+            attributes[key] = [
+                {"symbol": symbol, "sort": _to_sort(sort)} for symbol, sort in value
+            ]
+        elif key in _FORMULA_ATTRIBUTES:
+            attributes[key] = _to_term(value)
+        elif key in _NAMED_FORMULA_ATTRIBUTES:
+            attributes.setdefault(key, []).append(
+                {"symbol": value[0], "formula": _to_term(value[1])}
+            )
+        elif key == "query":
+            attributes.setdefault(key, []).append(
+                {"symbol": value[0], "formulas": value[1]}
+            )
+        elif key == "queries":
+            attributes.setdefault(key, []).append(value)
+        elif key == "subsys":
+            symbol, (target, *arguments) = value
+            attributes.setdefault(key, []).append(
+                {"symbol": symbol, "target": {"symbol": target, "arguments": arguments}}
+            )
+        else:
+            raise ValueError(f"Unknown attribute: {keyword}")
+    return attributes
+
+
+def _to_sort(sexp: Sexp) -> dict:
+    if isinstance(sexp, str):
+        return {"identifier": {"symbol": sexp, "indices": []}, "parameters": []}
+    if sexp[0] == "_":
+        return {"identifier": _to_identifier(sexp), "parameters": []}
+    return {
+        "identifier": {"symbol": sexp[0], "indices": []},
+        "parameters": [_to_sort(param) for param in sexp[1:]],
+    }
+
+
+def _to_identifier(sexp: Sexp) -> dict:
+    if isinstance(sexp, str):
+        return {"symbol": sexp, "indices": []}
+    if len(sexp) > 2 and sexp[0] == "_":
+        return {"symbol": sexp[1], "indices": [int(i) for i in sexp[2:]]}
+    if len(sexp) == 3 and sexp[:2] == ["as", "const"]:
+        return {"symbol": "const", "indices": []}
+    raise ValueError(f"Invalid function identifier: {sexp}")
+
+
+def _to_term(sexp: Sexp) -> dict:
+    results = []
+    # (S-expression, True if its arguments are already translated)
+    stack = [(sexp, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, str):
+            results.append({"identifier": node})
+            continue
+        if not node:
+            raise ValueError("Empty term")
+        # tolerate redundant parentheses around a term, e.g. ((and ...))
+        while len(node) == 1 and isinstance(node[0], list):
+            node = node[0]
+        head, args = node[0], node[1:]
+        if isinstance(head, str) and head in _UNSUPPORTED_BINDERS:
+            raise ValueError(f"Unsupported term: {head}")
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((arg, False) for arg in reversed(args))
+            continue
+        first_arg = len(results) - len(args)
+        term = {"identifier": _to_identifier(head), "args": results[first_arg:]}
+        del results[first_arg:]
+        results.append(term)
+    return results[0]
@@ -0,0 +1,28 @@
+"""
+Choices of the command-line options and the formatting of verdicts.
+
+The argument parsers and the benchmark harness import from here, so this
+module must not import pySMT: `--help`, `--version` and invalid arguments are
+handled without loading pySMT and the solver bindings.
+"""
+
+from typing import Optional
+
+MC_ALGORITHMS = {"bmc", "kind", "pdr", "itp", "sim", "portfolio"}
+
+SOLVERS = ["btor", "cvc5", "msat", "yices", "z3"]
+
+
+def combine_verdicts(verdicts: list[Optional[bool]]) -> Optional[bool]:
+    """Unsafe if any property is violated, otherwise unknown if any verdict is"""
+    if False in verdicts:
+        return False
+    if None in verdicts:
+        return None
+    return True
+
+
+def format_verdict(verdict: Optional[bool]) -> str:
+    if verdict is None:
+        return "unknown"
+    return "safe" if verdict else "unsafe"
@@ -0,0 +1,203 @@
+import logging
+from pysmt.shortcuts import And
+from pysmt.fnode import FNode
+from pysmt.oracles import SizeOracle
+from moxichecker.moxi2smt import TransitionSystem
+
+
+def preprocess(system: TransitionSystem, queries: list[FNode]) -> list[FNode]:
+    """Shrinks the system w.r.t. the reachability of the queries.
+
+    The system is reduced in place and the queries over the remaining variables
+    are returned. The reachability of every query is preserved:
+    1. equality propagation: a conjunct x = e of the invariant defines x
+       in every state, so x is replaced by e
+    2. constant propagation: x = c in the initial condition together with
+       x' = x or x' = c in the transition relation makes x a constant
+    3. cone-of-influence reduction: a variable outside the cone of the queries
+       may only be constrained by a unique definition x = e of the initial
+       condition and a unique definition x' = e of the transition relation,
+       which can then be dropped (any other constraint might rule out traces)
+    4. dead-variable elimination: variables that no longer occur are removed
+    """
+    size_before = _get_size(system.init, system.trans, system.inv)
+    num_vars = len(system.variables)
+    pre = _Preprocessor(system, queries)
+    num_eq = pre.propagate_equalities()
+    num_const = pre.propagate_constants()
+    num_coi = pre.reduce_cone_of_influence()
+    init, trans, inv = And(pre.init), And(pre.trans), And(pre.inv)
+    used = (
+        init.get_free_variables()
+        | trans.get_free_variables()
+        | inv.get_free_variables()
+        | And(pre.queries).get_free_variables()
+    )
+    variables = [
+        v for v in system.variables if v in used or system.prime_map[v] in used
+    ]
+    system.reduce(variables, init, trans, inv)
+    logging.info(
+        "Preprocessing removed %d of %d variables "
+        "(equalities: %d, constants: %d, cone of influence: %d, dead: %d); "
+        "formula size %d -> %d DAG nodes",
+        num_vars - len(variables),
+        num_vars,
+        num_eq,
+        num_const,
+        num_coi,
+        num_vars - len(variables) - num_eq - num_const - num_coi,
+        size_before,
+        _get_size(init, trans, inv),
+    )
+    return pre.queries
+
+
+def _get_size(*formulas: FNode) -> int:
+    return And(formulas).size(SizeOracle.MEASURE_DAG_NODES)
+
+
+def get_conjuncts(formula: FNode) -> list[FNode]:
+    res = []
+    stack = [formula]
+    while stack:
+        f = stack.pop()
+        if f.is_and():
+            stack.extend(reversed(f.args()))
+        elif not f.is_true():
+            res.append(f)
+    return res
+
+
+def _get_definition(formula: FNode, candidates) -> tuple:
+    """Returns (x, e) if the formula is x = e for x in candidates and x not in e,
+    otherwise (None, None)."""
+    if formula.is_equals() or formula.is_iff():
+        lhs, rhs = formula.args()
+        for x, e in [(lhs, rhs), (rhs, lhs)]:
+            if x in candidates and x not in e.get_free_variables():
+                return x, e
+    return None, None
+
+
+class _Preprocessor:
+    def __init__(self, system: TransitionSystem, queries: list[FNode]):
+        self.variables = set(system.variables)
+        self.prime_map = system.prime_map
+        self.unprime_map = {n: v for v, n in system.prime_map.items()}
+        self.init = get_conjuncts(system.init)
+        self.trans = get_conjuncts(system.trans)
+        self.inv = get_conjuncts(system.inv)
+        self.queries = queries
+
+    def _substitute(self, subs: dict) -> None:
+        """Applies x -> e to all formulas, and x' -> e' to the transition relation"""
+        next_subs = {
+            self.prime_map[x]: e.substitute(self.prime_map) for x, e in subs.items()
+        }
+        next_subs.update(subs)
+
+        def apply(formulas: list, subs: dict) -> list:
+            res = []
+            for f in formulas:
+                res.extend(get_conjuncts(f.substitute(subs).simplify()))
+            return res
+
+        self.init = apply(self.init, subs)
+        self.trans = apply(self.trans, next_subs)
+        self.inv = apply(self.inv, subs)
+        self.queries = [q.substitute(subs).simplify() for q in self.queries]
+
+    def _get_state_vars(self, formula: FNode) -> set:
+        """Variables of the formula, primed variables are mapped to unprimed ones"""
+        return {self.unprime_map.get(v, v) for v in formula.get_free_variables()}
+
+    def propagate_equalities(self) -> int:
+        subs = {}
+        remaining = []
+        for f in self.inv:
+            f = f.substitute(subs)
+            x, e = _get_definition(f, self.variables - subs.keys())
+            if x is None:
+                remaining.append(f)
+                continue
+            # keep the substitution idempotent
+            subs = {y: d.substitute({x: e}) for y, d in subs.items()}
+            subs[x] = e
+        self.inv = remaining
+        if subs:
+            logging.debug("Equality propagation: %s", subs)
+            self._substitute(subs)
+        return len(subs)
+
+    def propagate_constants(self) -> int:
+        count = 0
+        while True:
+            consts = {}
+            for f in self.init:
+                x, c = _get_definition(f, self.variables)
+                if x is not None and c.is_constant():
+                    consts[x] = c
+            subs = {}
+            next_vars = {self.prime_map[x] for x in consts}
+            for f in self.trans:
+                x_next, e = _get_definition(f, next_vars)
+                if x_next is None:
+                    continue
+                x = self.unprime_map[x_next]
+                if e == x or e == consts[x]:
+                    subs[x] = consts[x]
+            if not subs:
+                return count
+            logging.debug("Constant propagation: %s", subs)
+            count += len(subs)
+            self._substitute(subs)
+
+    def reduce_cone_of_influence(self) -> int:
+        # conjuncts that may be dropped, indexed by the variable they define
+        init_defs, trans_defs = {}, {}
+        init_count, trans_count = {}, {}
+        for f in self.init:
+            for v in f.get_free_variables():
+                init_count[v] = init_count.get(v, 0) + 1
+        for f in self.trans:
+            for v in f.get_free_variables():
+                trans_count[v] = trans_count.get(v, 0) + 1
+        kept_init, kept_trans = [], []
+        next_vars = set(self.unprime_map)
+        for f in self.init:
+            x, _ = _get_definition(f, self.variables)
+            if x is not None and init_count[x] == 1:
+                init_defs[x] = f
+            else:
+                kept_init.append(f)
+        for f in self.trans:
+            x_next, e = _get_definition(f, next_vars)
+            if (
+                x_next is not None
+                and trans_count[x_next] == 1
+                and not (e.get_free_variables() & next_vars)
+            ):
+                trans_defs[self.unprime_map[x_next]] = f
+            else:
+                kept_trans.append(f)
+
+        cone = self._get_state_vars(And(self.queries))
+        for f in kept_init + kept_trans + self.inv:
+            cone |= self._get_state_vars(f)
+        worklist = list(cone)
+        while worklist:
+            x = worklist.pop()
+            for defs, kept in [(init_defs, kept_init), (trans_defs, kept_trans)]:
+                if x in defs:
+                    f = defs.pop(x)
+                    kept.append(f)
+                    for v in self._get_state_vars(f) - cone:
+                        cone.add(v)
+                        worklist.append(v)
+        self.init, self.trans = kept_init, kept_trans
+        # the definitions that were not reached are dropped
+        removed = init_defs.keys() | trans_defs.keys()
+        if removed:
+            logging.debug("Outside of the cone of influence: %s", removed)
+        return len(removed)
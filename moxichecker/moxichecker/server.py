@@ -0,0 +1,397 @@
+"""
+Long-running MoXIchecker server for streams of verification tasks.
+
+The server keeps a pool of worker processes that have pySMT and the solver
+backends loaded already, so that a task does not pay for the start of the
+interpreter and of the solvers. Tasks are read as JSON lines from stdin, or
+from the connections to a Unix socket with --socket. Each task carries the
+command-line arguments of `moxichecker.main`:
+
+    {"id": 1, "args": ["-m", "pdr", "examples/QF_LIA/CounterReset.moxi.json"]}
+
+The result of every task is written back as a JSON line as soon as it is
+known, so results may arrive in a different order than the tasks:
+
+    {"id": 1, "verdict": "safe", "verdicts": {"rch_1": "safe"}, "time": 0.21}
+
+A task that cannot be run yields {"id": ..., "error": "..."} instead. Relative
+paths are resolved against the working directory of the server.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shlex
+import signal
+import socketserver
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+from moxichecker.options import SOLVERS
+
+# seconds between two checks whether the workers are alive
+_POLL_INTERVAL = 0.2
+
+
+def _get_args(argv: Optional[list]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="MoXIchecker server: checks tasks read as JSON lines with a "
+        "pool of warm worker processes"
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="accept tasks on connections to the Unix socket PATH instead of "
+        "stdin; the results of a connection are sent back on it",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--warm-up",
+        metavar="STR",
+        action="append",
+        choices=SOLVERS,
+        help="backend SMT solver that each worker starts once before the first "
+        "task (repeatable, default: 'msat')",
+    )
+    parser.add_argument(
+        "--timeout",
+        metavar="SEC",
+        type=float,
+        help="time limit of the tasks that do not set --timeout themselves",
+    )
+    parser.add_argument(
+        "--max-tasks",
+        metavar="N",
+        type=int,
+        help="replace a worker after N tasks, which releases memory that the "
+        "solver bindings keep",
+    )
+    parser.add_argument(
+        "--debug",
+        help="show the debugging messages of the server and of the tasks",
+        action="store_true",
+    )
+    args = parser.parse_args(argv)
+    args.warm_up = args.warm_up or ["msat"]
+    return args
+
+
+def _parse_request(line: str) -> tuple:
+    """Returns the id and the command-line arguments of a task"""
+    request = json.loads(line)
+    if not isinstance(request, dict) or "args" not in request:
+        raise ValueError("a task must be an object with 'args'")
+    argv = request["args"]
+    if isinstance(argv, str):
+        argv = shlex.split(argv)
+    if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+        raise ValueError("'args' must be a string or a list of strings")
+    return request.get("id"), argv
+
+
+def _run_task(argv: list, timeout: Optional[float]) -> dict:
+    """Runs a task in the worker and returns its result"""
+    from pysmt.environment import reset_env
+    from moxichecker.main import check_task, get_args
+    from moxichecker.options import combine_verdicts, format_verdict
+    from moxichecker.stats import STATS
+
+    start = time.perf_counter()
+    # the formulas and statistics of the previous task are not needed anymore
+    reset_env()
+    STATS.reset()
+    output = io.StringIO()
+    try:
+        # argparse prints its messages, e.g. for --help or invalid arguments
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            args = get_args(argv)
+    except SystemExit:
+        # the last line is the error message, the lines before are the usage
+        return {"error": output.getvalue().strip().splitlines()[-1]}
+    if args.timeout is None:
+        args.timeout = timeout
+    if args.stats:
+        STATS.enable()
+    try:
+        verdicts = check_task(args)
+    except Exception as e:
+        logging.debug("Task %s failed", argv, exc_info=True)
+        return {"error": repr(e)}
+    result = {}
+    if verdicts is not None:
+        result["verdict"] = format_verdict(combine_verdicts(list(verdicts.values())))
+        result["verdicts"] = {
+            name: format_verdict(verdict) for name, verdict in verdicts.items()
+        }
+    result["time"] = time.perf_counter() - start
+    if args.stats:
+        STATS.set("verdicts", verdicts)
+        report = io.StringIO()
+        STATS.report(report)
+        result["stats"] = json.loads(report.getvalue())
+    return result
+
+
+def _warm_up(solvers: list) -> None:
+    """Starts and stops each solver once, which initializes its library"""
+    from pysmt.shortcuts import Solver
+
+    for name in solvers:
+        Solver(name=name).exit()
+
+
+def _work(
+    tasks: multiprocessing.Queue,
+    started,
+    results: multiprocessing.Queue,
+    args: argparse.Namespace,
+) -> None:
+    # the server handles Ctrl-C, and the time limits of the tasks use SIGINT
+    # in processes of their own
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if not args.debug:
+        # the results are reported to the client, not logged
+        logging.getLogger().setLevel(logging.WARNING)
+    _warm_up(args.warm_up)
+    done = 0
+    while args.max_tasks is None or done < args.max_tasks:
+        task = tasks.get()
+        if task is None:
+            return
+        seq, argv = task
+        # written at once, while a Queue sends from a thread that is lost when
+        # the worker dies
+        started.put((seq, os.getpid()))
+        results.put((seq, _run_task(argv, args.timeout)))
+        done += 1
+
+
+class WorkerPool:
+    """Worker processes that run tasks, with a thread that dispatches their
+    results to the callbacks given when the tasks were submitted.
+
+    A worker that exits unexpectedly, e.g. because a solver crashed, is
+    replaced, and its task fails.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        # the workers are forked from this process, which imports pySMT and the
+        # model checker once for all of them; the solvers are only started in
+        # the workers
+        import moxichecker.main
+        import moxichecker.model_checking  # noqa: F401
+        from pysmt.shortcuts import get_env
+
+        available = get_env().factory.all_solvers()
+        for name in args.warm_up:
+            if name not in available:
+                logging.warning("Solver '%s' is not available", name)
+        args.warm_up = [name for name in args.warm_up if name in available]
+        self.args = args
+        self._ctx = multiprocessing.get_context("fork")
+        self._tasks = self._ctx.Queue()
+        # (seq, pid) of the tasks that a worker has started
+        self._started = self._ctx.SimpleQueue()
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()
+        # notified when the last submitted task is finished
+        self._idle = threading.Condition(self._lock)
+        self._callbacks = {}
+        # seq -> pid of the worker running the task
+        self._running = {}
+        self._count = 0
+        self._closing = False
+        self._workers = [self._start_worker() for _ in range(max(args.jobs, 1))]
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def _start_worker(self) -> multiprocessing.process.BaseProcess:
+        worker = self._ctx.Process(
+            target=_work, args=(self._tasks, self._started, self._results, self.args)
+        )
+        worker.start()
+        return worker
+
+    def submit(self, argv: list, callback: Callable[[dict], None]) -> None:
+        with self._lock:
+            seq = self._count
+            self._count += 1
+            self._callbacks[seq] = callback
+        self._tasks.put((seq, argv))
+
+    def _finish(self, seq: int, result: dict) -> None:
+        with self._lock:
+            callback = self._callbacks.pop(seq)
+            self._running.pop(seq, None)
+        callback(result)
+        with self._lock:
+            if not self._callbacks:
+                self._idle.notify_all()
+
+    def _dispatch(self) -> None:
+        while True:
+            try:
+                seq, result = self._results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                # all messages of a dead worker have been received
+                self._check_workers()
+                continue
+            # a task is started before its result is sent
+            self._read_started()
+            self._finish(seq, result)
+
+    def _read_started(self) -> None:
+        while not self._started.empty():
+            seq, pid = self._started.get()
+            with self._lock:
+                self._running[seq] = pid
+
+    def _check_workers(self) -> None:
+        self._read_started()
+        for i, worker in enumerate(self._workers):
+            if worker.is_alive() or self._closing:
+                continue
+            worker.join()
+            with self._lock:
+                lost = [s for s, pid in self._running.items() if pid == worker.pid]
+            for seq in lost:
+                self._finish(
+                    seq, {"error": f"worker exited with code {worker.exitcode}"}
+                )
+            if worker.exitcode != 0:
+                logging.warning("Worker exited with code %d", worker.exitcode)
+            self._workers[i] = self._start_worker()
+
+    def close(self) -> None:
+        """Waits for the submitted tasks and stops the workers"""
+        with self._lock:
+            self._idle.wait_for(lambda: not self._callbacks)
+        self._closing = True
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def terminate(self) -> None:
+        """Stops the workers without waiting for the submitted tasks"""
+        self._closing = True
+        for worker in self._workers:
+            worker.kill()
+            worker.join()
+
+
+class _Output:
+    """Writes results as JSON lines, from several threads"""
+
+    def __init__(self, write: Callable[[str], None]):
+        self._write = write
+        self._lock = threading.Lock()
+
+    def __call__(self, task_id, result: dict) -> None:
+        line = json.dumps({"id": task_id, **result}) + "\n"
+        with self._lock:
+            self._write(line)
+
+
+def _submit(pool: WorkerPool, line: str, output: _Output) -> Optional[threading.Event]:
+    """Submits the task of a line and returns an event that is set when its
+    result is written"""
+    if not line.strip():
+        return None
+    done = threading.Event()
+    try:
+        task_id, argv = _parse_request(line)
+    except ValueError as e:
+        output(None, {"error": f"invalid task: {e}"})
+        done.set()
+        return done
+
+    def callback(result: dict) -> None:
+        output(task_id, result)
+        done.set()
+
+    pool.submit(argv, callback)
+    return done
+
+
+def _serve_stdin(pool: WorkerPool) -> None:
+    def write(line: str) -> None:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+    output = _Output(write)
+    for line in sys.stdin:
+        _submit(pool, line, output)
+
+
+def _serve_socket(pool: WorkerPool, path: str) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def write(line: str) -> None:
+                try:
+                    self.wfile.write(line.encode())
+                    self.wfile.flush()
+                except OSError:
+                    # the client has disconnected
+                    pass
+
+            output = _Output(write)
+            pending = []
+            for line in self.rfile:
+                done = _submit(pool, line.decode(), output)
+                if done is not None:
+                    pending.append(done)
+            # the connection is closed when the handler returns
+            for done in pending:
+                done.wait()
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    with Server(path, Handler) as server:
+        logging.info("Listening on %s", path)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def main(argv: Optional[list] = None) -> None:
+    args = _get_args(argv)
+    logging.basicConfig(
+        format="[%(levelname)s] %(message)s",
+        level=logging.DEBUG if args.debug else logging.INFO,
+    )
+    # stop like on Ctrl-C, which removes the socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    pool = WorkerPool(args)
+    logging.info("Started %d workers", max(args.jobs, 1))
+    try:
+        if args.socket:
+            _serve_socket(pool, args.socket)
+        else:
+            _serve_stdin(pool)
+        pool.close()
+    except KeyboardInterrupt:
+        logging.info("Interrupted")
+    finally:
+        pool.terminate()
+
+
+if __name__ == "__main__":
+    main()
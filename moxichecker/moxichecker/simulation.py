@@ -0,0 +1,598 @@
+"""
+Random simulation of a transition system over many traces at once.
+
+The states of all traces are kept as NumPy arrays, one array per variable, and
+the formulas of the system are evaluated on these arrays, so that one step of
+thousands of traces costs one pass over the formulas.
+
+The simulation is compiled into a plan per step: a conjunct x = e (or x' = e)
+of the initial condition, the transition relation or the invariant whose right
+side is already known defines x; the variables that are not defined this way,
+e.g. inputs, are sampled at random; and the remaining conjuncts filter the
+traces. Traces that violate a filter are resumed by a solver call for a few of
+them, and the others are replaced by copies of surviving traces. A trace that
+reaches a bad state is confirmed by BMC with the sampled values fixed, which
+yields the counterexample in the exact semantics of the solver.
+
+Simulation only finds violations; undetected violations are unknown.
+"""
+
+import logging
+from fractions import Fraction
+from typing import Optional
+import numpy as np
+from pysmt import operators as op
+from pysmt.fnode import FNode
+from pysmt.shortcuts import (
+    And,
+    Not,
+    EqualsOrIff,
+    TRUE,
+    FALSE,
+    Bool,
+    Int,
+    Real,
+    BV,
+    Solver,
+)
+from moxichecker.model_checking import (
+    MultiPropertyMCAlgorithm,
+    _get_trace,
+    _INTERRUPTS,
+    _log_interrupt,
+)
+from moxichecker.moxi2smt import TransitionSystem
+from moxichecker.preprocessing import get_conjuncts
+from moxichecker.stats import STATS
+
+# traces of a step that are resumed by a solver call when they violate a filter
+_SOLVER_SAMPLES = 8
+# bad traces of a step whose confirmation is attempted
+_CONFIRMATIONS = 4
+
+
+class UnsupportedError(Exception):
+    """Raised for formulas that the simulation cannot evaluate"""
+
+
+def _signed(a: np.ndarray, width: int) -> np.ndarray:
+    shift = np.uint64(64 - width)
+    return (a << shift).view(np.int64) >> np.int64(64 - width)
+
+
+def _unsigned(a: np.ndarray, width: int) -> np.ndarray:
+    return a.view(np.uint64) & _mask(width)
+
+
+def _mask(width: int) -> np.uint64:
+    return np.uint64((1 << width) - 1)
+
+
+def _bv_udiv(a, b, w):
+    return np.where(b == 0, _mask(w), a // np.where(b == 0, 1, b))
+
+
+def _bv_urem(a, b, w):
+    return np.where(b == 0, a, a % np.where(b == 0, 1, b))
+
+
+def _bv_negate(a, w):
+    return (np.uint64(0) - a) & _mask(w)
+
+
+def _bv_abs(a, w):
+    """Returns the magnitude as an unsigned value, which also fits the signed
+    minimum, and whether a is negative"""
+    negative = _signed(a, w) < 0
+    return np.where(negative, _bv_negate(a, w), a), negative
+
+
+def _bv_sdiv(a, b, w):
+    (ua, na), (ub, nb) = _bv_abs(a, w), _bv_abs(b, w)
+    q = ua // np.where(ub == 0, np.uint64(1), ub)
+    q = np.where(na != nb, _bv_negate(q, w), q)
+    return np.where(b == 0, np.where(na, np.uint64(1), _mask(w)), q)
+
+
+def _bv_srem(a, b, w):
+    (ua, na), (ub, _) = _bv_abs(a, w), _bv_abs(b, w)
+    r = ua % np.where(ub == 0, np.uint64(1), ub)
+    r = np.where(na, _bv_negate(r, w), r)
+    return np.where(b == 0, a, r)
+
+
+def _bv_shift(a, b, w, shift):
+    in_range = b < w
+    return np.where(in_range, shift(a, np.where(in_range, b, 0)) & _mask(w), 0)
+
+
+def _bv_ashr(a, b, w):
+    sa = _signed(a, w)
+    shifted = sa >> np.where(b < w, b, w - 1).astype(np.int64)
+    return _unsigned(shifted, w)
+
+
+def _bv_rotate(a, k, w):
+    k %= w
+    if k == 0:
+        return a
+    return ((a << np.uint64(k)) | (a >> np.uint64(w - k))) & _mask(w)
+
+
+# node type -> function of the argument arrays and the width of the result
+_BV_OPERATIONS = {
+    op.BV_NOT: lambda A, w: ~A[0] & _mask(w),
+    op.BV_AND: lambda A, w: A[0] & A[1],
+    op.BV_OR: lambda A, w: A[0] | A[1],
+    op.BV_XOR: lambda A, w: A[0] ^ A[1],
+    op.BV_NEG: lambda A, w: (np.uint64(0) - A[0]) & _mask(w),
+    op.BV_ADD: lambda A, w: (A[0] + A[1]) & _mask(w),
+    op.BV_SUB: lambda A, w: (A[0] - A[1]) & _mask(w),
+    op.BV_MUL: lambda A, w: (A[0] * A[1]) & _mask(w),
+    op.BV_UDIV: lambda A, w: _bv_udiv(A[0], A[1], w),
+    op.BV_UREM: lambda A, w: _bv_urem(A[0], A[1], w),
+    op.BV_SDIV: lambda A, w: _bv_sdiv(A[0], A[1], w),
+    op.BV_SREM: lambda A, w: _bv_srem(A[0], A[1], w),
+    op.BV_LSHL: lambda A, w: _bv_shift(A[0], A[1], w, np.left_shift),
+    op.BV_LSHR: lambda A, w: _bv_shift(A[0], A[1], w, np.right_shift),
+    op.BV_ASHR: lambda A, w: _bv_ashr(A[0], A[1], w),
+}
+
+_BV_RELATIONS = {
+    op.BV_ULT: lambda a, b, w: a < b,
+    op.BV_ULE: lambda a, b, w: a <= b,
+    op.BV_SLT: lambda a, b, w: _signed(a, w) < _signed(b, w),
+    op.BV_SLE: lambda a, b, w: _signed(a, w) <= _signed(b, w),
+}
+
+
+_ARITHMETIC = {
+    op.PLUS: np.add.reduce,
+    op.MINUS: lambda A: A[0] - A[1],
+    op.TIMES: np.multiply.reduce,
+}
+
+
+class _Evaluator:
+    """Evaluates formulas on arrays of values, one array per symbol.
+
+    Integers are 64-bit and reals are floats. The traces whose arithmetic
+    leaves this range are marked in `overflow` until the next `reset`.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.reset()
+
+    def reset(self) -> None:
+        self.overflow = np.zeros(self.size, dtype=np.bool_)
+
+    def evaluate(self, formula: FNode, env: dict) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            return self._evaluate(formula, env)
+
+    def _evaluate(self, formula: FNode, env: dict) -> np.ndarray:
+        memo = {}
+        stack = [(formula, False)]
+        while stack:
+            f, expanded = stack.pop()
+            if f in memo:
+                continue
+            if f.is_symbol():
+                if f not in env:
+                    raise UnsupportedError(f"no value of {f}")
+                memo[f] = env[f]
+            elif f.is_constant():
+                memo[f] = self._constant(f)
+            elif not expanded:
+                stack.append((f, True))
+                stack.extend((arg, False) for arg in f.args() if arg not in memo)
+            else:
+                memo[f] = self._apply(f, [memo[arg] for arg in f.args()])
+        return memo[formula]
+
+    def _constant(self, f: FNode) -> np.ndarray:
+        f_type = f.get_type()
+        if f_type.is_bool_type():
+            return np.full(self.size, f.constant_value(), dtype=np.bool_)
+        if f_type.is_int_type():
+            try:
+                return np.full(self.size, f.constant_value(), dtype=np.int64)
+            except OverflowError:
+                raise UnsupportedError(f"integer constant {f}")
+        if f_type.is_real_type():
+            return np.full(self.size, float(f.constant_value()), dtype=np.float64)
+        if f_type.is_bv_type() and f.bv_width() <= 64:
+            return np.full(self.size, f.constant_value(), dtype=np.uint64)
+        raise UnsupportedError(f"constant of type {f_type}")
+
+    def _apply(self, f: FNode, A: list) -> np.ndarray:
+        kind = f.node_type()
+        if kind == op.AND:
+            return np.logical_and.reduce(A) if A else np.ones(self.size, np.bool_)
+        if kind == op.OR:
+            return np.logical_or.reduce(A) if A else np.zeros(self.size, np.bool_)
+        if kind == op.NOT:
+            return ~A[0]
+        if kind == op.IMPLIES:
+            return ~A[0] | A[1]
+        if kind in (op.IFF, op.EQUALS):
+            return A[0] == A[1]
+        if kind == op.ITE:
+            return np.where(A[0], A[1], A[2])
+        if kind in _ARITHMETIC:
+            res = _ARITHMETIC[kind](A)
+            if f.get_type().is_int_type():
+                approx = _ARITHMETIC[kind]([a.astype(np.float64) for a in A])
+                self.overflow |= np.abs(approx) >= 2.0**62
+            else:
+                self.overflow |= ~np.isfinite(res)
+            return res
+        if kind == op.DIV and f.get_type().is_real_type():
+            return A[0] / A[1]
+        if kind == op.LE:
+            return A[0] <= A[1]
+        if kind == op.LT:
+            return A[0] < A[1]
+        if kind == op.TOREAL:
+            return A[0].astype(np.float64)
+        if f.get_type().is_bv_type() and f.bv_width() > 64:
+            raise UnsupportedError(f"bit-vectors of width {f.bv_width()}")
+        if kind in _BV_OPERATIONS:
+            return _BV_OPERATIONS[kind](A, f.bv_width())
+        if kind in _BV_RELATIONS:
+            return _BV_RELATIONS[kind](A[0], A[1], f.arg(0).bv_width())
+        if kind == op.BV_CONCAT:
+            low = np.uint64(f.arg(1).bv_width())
+            return (A[0] << low) | A[1]
+        if kind == op.BV_EXTRACT:
+            start = np.uint64(f.bv_extract_start())
+            return (A[0] >> start) & _mask(f.bv_width())
+        if kind == op.BV_ZEXT:
+            return A[0]
+        if kind == op.BV_SEXT:
+            return _unsigned(_signed(A[0], f.arg(0).bv_width()), f.bv_width())
+        if kind in (op.BV_ROL, op.BV_ROR):
+            k = f.bv_rotation_step()
+            if kind == op.BV_ROR:
+                k = f.bv_width() - k % f.bv_width()
+            return _bv_rotate(A[0], k, f.bv_width())
+        if kind == op.BV_COMP:
+            return (A[0] == A[1]).astype(np.uint64)
+        raise UnsupportedError(f"operator {op.op_to_str(kind)}")
+
+
+def _get_plan(targets: list, known: set, constraints: list) -> tuple:
+    """Orders the computation of the target symbols from the known ones.
+
+    Returns the plan, a list of (symbol, definition or None if the symbol is
+    sampled), and the conjuncts of the constraints that are not used as
+    definitions.
+    """
+    determined = set(known)
+    remaining = list(constraints)
+    pending = list(targets)
+    plan = []
+    while pending:
+        progress = True
+        while progress:
+            progress = False
+            for f in list(remaining):
+                x, e = _get_definition(f, pending, determined)
+                if x is not None:
+                    plan.append((x, e))
+                    determined.add(x)
+                    pending.remove(x)
+                    remaining.remove(f)
+                    progress = True
+        if pending:
+            # the targets are ordered such that the inputs come first
+            x = pending.pop(0)
+            plan.append((x, None))
+            determined.add(x)
+    return plan, remaining
+
+
+def _get_definition(formula: FNode, pending: list, determined: set) -> tuple:
+    """Returns (x, e) if the formula is x = e for a pending x and e only
+    depends on determined symbols, otherwise (None, None)."""
+    if formula.is_symbol():
+        pairs = [(formula, TRUE())]
+    elif formula.is_not() and formula.arg(0).is_symbol():
+        pairs = [(formula.arg(0), FALSE())]
+    elif formula.is_equals() or formula.is_iff():
+        lhs, rhs = formula.args()
+        pairs = [(lhs, rhs), (rhs, lhs)]
+    else:
+        return None, None
+    for x, e in pairs:
+        if x in pending and e.get_free_variables() <= determined:
+            return x, e
+    return None, None
+
+
+def _to_constant(value, var_type) -> FNode:
+    if var_type.is_bool_type():
+        return Bool(bool(value))
+    if var_type.is_int_type():
+        return Int(int(value))
+    if var_type.is_real_type():
+        return Real(Fraction(float(value)))
+    return BV(int(value), var_type.width)
+
+
+def _set_trace(env: dict, model: dict, i: int) -> bool:
+    """Sets the values of a trace to those of a model, if they fit"""
+    try:
+        for var, value in model.items():
+            if value.is_real_constant():
+                env[var][i] = float(value.constant_value())
+            else:
+                env[var][i] = value.constant_value()
+    except OverflowError:
+        return False
+    return True
+
+
+class RandomSimulation(MultiPropertyMCAlgorithm):
+    """Simulates many random traces at once and reports the properties that a
+    trace violates (False); all other properties are unknown (None)."""
+
+    def __init__(
+        self,
+        system: TransitionSystem,
+        solver: str,
+        traces: int = 1000,
+        max_steps: int = 100,
+        seed: int = 0,
+    ):
+        self.system = system
+        self.num_traces = traces
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.solver = Solver(name=solver, logic=system.logic)
+        self.evaluator = _Evaluator(traces)
+        self.next_map = system.prime_map
+        self.solver_calls = 0
+        self._bias = {}
+        # the variables sampled in the initial states and in the steps
+        self._sampled_init = []
+        self._sampled_step = []
+        self.traces = {}
+
+    def __del__(self):
+        if hasattr(self, "solver"):
+            self.solver.exit()
+
+    def check_property(self, prop: FNode) -> Optional[bool]:
+        return self.check_properties([prop])[0]
+
+    def check_properties(self, props: list[FNode]) -> list[Optional[bool]]:
+        logging.debug("Simulating %d traces...", self.num_traces)
+        verdicts = [None] * len(props)
+        step = 0
+        try:
+            self._compile()
+            # per step: the values of the variables, the index of the
+            # predecessor of every trace, and the sampled variables
+            history = []
+            values = self._initial_states()
+            history.append((values, None))
+            while values is not None:
+                self._check_bad(props, verdicts, history)
+                if None not in verdicts or step == self.max_steps:
+                    break
+                step += 1
+                values, parents = self._successors(values)
+                history.append((values, parents))
+                if STATS.enabled:
+                    STATS.event("sim_step", step=step)
+            if values is None:
+                logging.info("Simulation: All traces are stuck at step %d", step)
+        except UnsupportedError as e:
+            logging.warning("Simulation: Not supported: %s", e)
+            return verdicts
+        except _INTERRUPTS as e:
+            _log_interrupt(e)
+        finally:
+            STATS.set("sim_steps", step)
+            STATS.set("sim_solver_calls", self.solver_calls)
+        if None in verdicts:
+            # simulation is not exhaustive, so no safe bound is reported
+            logging.info("Simulation: No violation found in %d steps", step)
+        return verdicts
+
+    def sample_states(self) -> list[dict]:
+        """Simulates the traces without checking properties and returns their
+        states at every step, as an array of values per variable"""
+        self._compile()
+        states = []
+        values = self._initial_states()
+        while values is not None and len(states) <= self.max_steps:
+            states.append(values)
+            values, _ = self._successors(values)
+        return states
+
+    def _compile(self) -> None:
+        system = self.system
+        # inputs are sampled first, as they usually feed the definitions
+        inputs = set(system.input_variables)
+        order = sorted(system.variables, key=lambda v: v not in inputs)
+        for v in system.variables:
+            v_type = v.symbol_type()
+            if v_type.is_array_type() or (v_type.is_bv_type() and v_type.width > 64):
+                raise UnsupportedError(f"variable {v} of type {v_type}")
+        self._init_plan, self._init_filters = _get_plan(
+            order, set(), get_conjuncts(system.init) + get_conjuncts(system.inv)
+        )
+        next_inv = system.inv.substitute(self.next_map)
+        self._step_plan, self._step_filters = _get_plan(
+            [self.next_map[v] for v in order],
+            set(system.variables),
+            get_conjuncts(system.trans) + get_conjuncts(next_inv),
+        )
+        self._sampled_init = [x for x, e in self._init_plan if e is None]
+        unprime = {n: v for v, n in self.next_map.items()}
+        self._sampled_step = [unprime[x] for x, e in self._step_plan if e is None]
+        logging.debug(
+            "Simulation: sampled variables %s, filters %d/%d",
+            self._sampled_step,
+            len(self._init_filters),
+            len(self._step_filters),
+        )
+
+    def _sample(self, var: FNode) -> np.ndarray:
+        """Random values, mostly small ones to pass comparisons with constants"""
+        n = self.num_traces
+        v_type = var.symbol_type()
+        if v_type.is_bool_type():
+            # a probability of true per trace, so that some traces keep e.g.
+            # an enable input set and a reset input unset for many steps
+            if var not in self._bias:
+                self._bias[var] = self.rng.random(n)
+            return self.rng.random(n) < self._bias[var]
+        if v_type.is_bv_type():
+            wide = self.rng.integers(0, 1 << v_type.width, n, dtype=np.uint64)
+            small = self.rng.integers(0, min(16, 1 << v_type.width), n, np.uint64)
+            return np.where(self.rng.random(n) < 0.5, small, wide)
+        small = self.rng.integers(-10, 11, n)
+        wide = self.rng.integers(-1000, 1001, n)
+        res = np.where(self.rng.random(n) < 0.75, small, wide)
+        if v_type.is_real_type():
+            # halves are exact as floats and as rationals
+            return res / 2.0
+        return res
+
+    def _execute(self, plan: list, env: dict) -> None:
+        for x, e in plan:
+            if e is None:
+                env[x] = self._sample(x)
+            else:
+                # a copy, as the traces are modified in place when resampled
+                env[x] = np.array(self.evaluator.evaluate(e, env))
+
+    def _alive(self, filters: list, env: dict) -> np.ndarray:
+        return self.evaluator.evaluate(And(filters), env) & ~self.evaluator.overflow
+
+    def _initial_states(self) -> Optional[dict]:
+        env = {}
+        self.evaluator.reset()
+        self._execute(self._init_plan, env)
+        alive = self._alive(self._init_filters, env)
+        if not alive.any():
+            # enumerate a few initial states with the solver
+            constraint = And(self.system.init, self.system.inv)
+            self.solver.push()
+            for i in range(_SOLVER_SAMPLES):
+                model = self._solve(constraint, self.system.variables)
+                if model is None:
+                    break
+                alive[i] = _set_trace(env, model, i)
+                self.solver.add_assertion(
+                    Not(And(EqualsOrIff(v, model[v]) for v in self.system.variables))
+                )
+            self.solver.pop()
+        return self._resample(env, alive, np.arange(self.num_traces))
+
+    def _successors(self, values: dict) -> tuple:
+        """Returns the successor states and the index of the predecessor of
+        every trace, or (None, None) if all traces are stuck"""
+        env = dict(values)
+        self.evaluator.reset()
+        self._execute(self._step_plan, env)
+        alive = self._alive(self._step_filters, env)
+        if not alive.all():
+            # resume some of the dead traces with the solver
+            step = And(self.system.trans, self.system.inv.substitute(self.next_map))
+            next_vars = [self.next_map[v] for v in self.system.variables]
+            for i in np.flatnonzero(~alive)[:_SOLVER_SAMPLES]:
+                state = And(
+                    EqualsOrIff(v, _to_constant(values[v][i], v.symbol_type()))
+                    for v in self.system.variables
+                )
+                model = self._solve(And(state, step), next_vars)
+                if model is not None:
+                    alive[i] = _set_trace(env, model, i)
+        succ = {v: env[self.next_map[v]] for v in self.system.variables}
+        parents = np.arange(self.num_traces)
+        succ = self._resample(succ, alive, parents)
+        return (None, None) if succ is None else (succ, parents)
+
+    def _solve(self, formula: FNode, variables: list) -> Optional[dict]:
+        self.solver_calls += 1
+        if not self.solver.is_sat(formula):
+            return None
+        return self.solver.get_values(variables)
+
+    def _resample(
+        self, values: dict, alive: np.ndarray, parents: np.ndarray
+    ) -> Optional[dict]:
+        """Replaces the dead traces by copies of random surviving traces"""
+        survivors = np.flatnonzero(alive)
+        if len(survivors) == 0:
+            return None
+        dead = np.flatnonzero(~alive)
+        if len(dead) > 0:
+            copies = self.rng.choice(survivors, len(dead))
+            for array in values.values():
+                array[dead] = array[copies]
+            parents[dead] = parents[copies]
+        return values
+
+    def _check_bad(self, props: list, verdicts: list, history: list) -> None:
+        k = len(history) - 1
+        values = history[-1][0]
+        for i, prop in enumerate(props):
+            if verdicts[i] is not None:
+                continue
+            self.evaluator.reset()
+            bad = ~self.evaluator.evaluate(prop, values) & ~self.evaluator.overflow
+            for trace in np.flatnonzero(bad)[:_CONFIRMATIONS]:
+                if self._confirm(prop, history, int(trace)):
+                    logging.info("Simulation: Query reached at step %d", k)
+                    verdicts[i] = False
+                    break
+
+    def _confirm(self, prop: FNode, history: list, trace: int) -> bool:
+        """Checks by BMC that the trace violates the property, with the sampled
+        values fixed, and stores the counterexample trace"""
+        system = self.system
+        k = len(history) - 1
+        query = [
+            system.init.substitute(system.get_subs(0)),
+            system.inv.substitute(system.get_subs(0)),
+            Not(prop.substitute(system.get_subs(k))),
+        ]
+        step = And(system.trans, system.inv.substitute(self.next_map))
+        query.extend(step.substitute(system.get_subs(i)) for i in range(k))
+        fixed = []
+        for t in range(k, -1, -1):
+            values, parents = history[t]
+            sampled = self._sampled_init if t == 0 else self._sampled_step
+            fixed.extend(
+                EqualsOrIff(
+                    system.get_timed_var(v, t),
+                    _to_constant(values[v][trace], v.symbol_type()),
+                )
+                for v in sampled
+            )
+            if parents is not None:
+                trace = int(parents[trace])
+        # the values of the arithmetic may be inexact, in this case the trace
+        # is only used to select the depth
+        for extra in (And(fixed), TRUE()):
+            self.solver_calls += 1
+            if self.solver.is_sat(And(*query, extra)):
+                self.traces[prop] = _get_trace(system, self.solver, k)
+                return True
+        return False
+
+
+def get_simulation(args, system: TransitionSystem) -> RandomSimulation:
+    return RandomSimulation(
+        system,
+        args.solver,
+        traces=args.sim_traces,
+        max_steps=args.sim_steps,
+        seed=args.sim_seed,
+    )
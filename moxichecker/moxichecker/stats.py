@@ -0,0 +1,71 @@
+"""
+Run-time statistics of the front ends and the model-checking engines.
+
+The statistics are collected by the global `STATS` object. Collection is
+disabled by default; instrumented code checks `STATS.enabled` before doing
+anything that costs more than reading the clock.
+"""
+
+import json
+import sys
+import time
+from typing import Optional, TextIO
+
+
+class Statistics:
+    def __init__(self):
+        self.reset()
+
+    def enable(self, stream: Optional[TextIO] = None) -> None:
+        """Starts collecting statistics.
+
+        If a stream is given, every event is written to it as a JSON line when
+        it happens, otherwise the events are kept for the final report.
+        """
+        self.enabled = True
+        self._stream = stream
+
+    def reset(self) -> None:
+        """Disables the collection and drops the collected statistics, e.g.
+        before the next task of a long-running process"""
+        self.enabled = False
+        self.values = {}
+        self.events = []
+        self._start = time.perf_counter()
+        self._stream = None
+
+    def set(self, key: str, value) -> None:
+        if self.enabled:
+            self.values[key] = value
+
+    def add(self, key: str, value: float) -> None:
+        if self.enabled:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def event(self, kind: str, **fields) -> None:
+        """Records an event, e.g. the check of a single bound"""
+        if not self.enabled:
+            return
+        fields = {"event": kind, "time": time.perf_counter() - self._start, **fields}
+        if self._stream is not None:
+            print(json.dumps(fields), file=self._stream, flush=True)
+        else:
+            self.events.append(fields)
+
+    def restore(self, values: dict, events: list) -> None:
+        """Replaces the collected values and events, e.g. by those of a child
+        process that has continued the collection"""
+        self.values = values
+        self.events = events
+
+    def report(self, stream: TextIO = sys.stdout) -> None:
+        """Writes the collected values (and events) as one JSON object"""
+        report = {"total_time": time.perf_counter() - self._start, **self.values}
+        if self._stream is None:
+            report["events"] = self.events
+        else:
+            report["event"] = "summary"
+        print(json.dumps(report), file=stream, flush=True)
+
+
+STATS = Statistics()
@@ -0,0 +1,50 @@
+import time
+from pathlib import Path
+from pysmt.oracles import SizeOracle
+from moxichecker.btor2_parser import parse_btor2
+from moxichecker.loader import load_commands
+from moxichecker.moxi2smt import (
+    get_check_system,
+    get_define_system,
+    get_logic,
+    get_queries,
+    Query,
+    TransitionSystem,
+)
+from moxichecker.stats import STATS
+from moxichecker.vmt_parser import parse_vmt
+
+
+def load_task(path: str) -> tuple[TransitionSystem, list[Query]]:
+    """Returns the system of a verification task and its queries as
+    (name, formula). The format is selected by the file extension: BTOR2
+    (*.btor2), VMT (*.vmt), MoXI-JSON (*.json) or MoXI (otherwise)."""
+    start = time.perf_counter()
+    suffix = Path(path).suffix
+    if suffix in (".btor2", ".vmt"):
+        parse = parse_btor2 if suffix == ".btor2" else parse_vmt
+        with open(path) as f:
+            system, queries = parse(f.read())
+        if not queries:
+            raise ValueError("No property specified")
+        # the readers build the system while parsing
+        STATS.set("parse_time", time.perf_counter() - start)
+    else:
+        commands = load_commands(path)
+        logic = get_logic(commands)
+        check_sys_cmd = get_check_system(commands)
+        def_sys_cmd = get_define_system(commands, check_sys_cmd["symbol"])
+        STATS.set("parse_time", time.perf_counter() - start)
+        start = time.perf_counter()
+        system = TransitionSystem(def_sys_cmd, logic)
+        queries = get_queries(check_sys_cmd, logic)
+        STATS.set("construction_time", time.perf_counter() - start)
+        STATS.set("translation_time", system.translation_time)
+    if STATS.enabled:
+        STATS.set("num_variables", len(system.variables))
+        STATS.set("num_inputs", len(system.input_variables))
+        STATS.set("num_queries", len(queries))
+        for name in ("init", "trans", "inv"):
+            formula = getattr(system, name)
+            STATS.set(f"{name}_dag_size", formula.size(SizeOracle.MEASURE_DAG_NODES))
+    return system, queries
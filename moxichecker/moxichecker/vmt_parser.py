@@ -0,0 +1,218 @@
+"""
+Reader for transition systems in the VMT format.
+
+VMT is SMT-LIB with annotations: `(! x :next x.next)` declares a state
+variable, and `:init`, `:trans` and `:invar-property` mark the initial
+condition, the transition relation and the invariant properties. Every
+define-fun is translated once and its FNode is shared by all its uses.
+"""
+
+import logging
+from fractions import Fraction
+from itertools import combinations
+from pysmt.shortcuts import (
+    FALSE,
+    TRUE,
+    And,
+    Array,
+    BV,
+    Int,
+    Minus,
+    Not,
+    Real,
+    Symbol,
+)
+from pysmt.typing import ArrayType, BVType, BOOL, INT, REAL, PySMTType
+from pysmt.fnode import FNode
+from moxichecker.moxi2smt import (
+    OPERATIONS,
+    TransitionSystem,
+    _bv_literal,
+    infer_logic,
+    next_var,
+)
+from moxichecker.moxi_parser import read_sexps
+
+# left-associative operators that may have more than two arguments
+_LEFT_ASSOCIATIVE = {"+", "-", "*", "bvadd", "bvmul", "bvand", "bvor", "bvxor"}
+
+_TRUE = "true"
+_FALSE = "false"
+
+
+def parse_vmt(text: str, name: str = "main") -> tuple[TransitionSystem, list]:
+    """Returns the system and its bad-state properties as (name, formula)"""
+    reader = _VmtReader()
+    for sexp in read_sexps(text):
+        reader.add_command(sexp)
+    return reader.get_system(name)
+
+
+class _VmtReader:
+    def __init__(self):
+        self.symbols = {}
+        self.declared = []
+        # let-bound names, each with a stack of values
+        self.bound = {}
+        self.has_reals = False
+        self.next_names = {}
+        self.init = []
+        self.trans = []
+        self.properties = []
+
+    def add_command(self, sexp: list) -> None:
+        command = sexp[0]
+        if command in ("declare-fun", "declare-const"):
+            name = sexp[1]
+            if command == "declare-fun" and sexp[2]:
+                raise ValueError(f"Uninterpreted functions are not supported: {name}")
+            var = Symbol(name, self._get_sort(sexp[-1]))
+            self.symbols[name] = var
+            self.declared.append(var)
+        elif command == "define-fun":
+            name, params, _, body = sexp[1:]
+            if params:
+                raise ValueError(f"Functions with parameters are not supported: {name}")
+            self.symbols[name] = self._get_term(body)
+        # other commands (set-info, set-logic, assert, ...) have no effect on
+        # the transition system
+
+    def get_system(self, name: str) -> tuple[TransitionSystem, list]:
+        states = list(self.next_names)
+        subs = {self.symbols[n]: next_var(v) for v, n in self.next_names.items()}
+        inputs = [v for v in self.declared if v not in subs and v not in states]
+        init = And(self.init)
+        trans = And(self.trans).substitute(subs)
+        bad = [(prop_name, Not(prop)) for prop_name, prop in self.properties]
+        system = TransitionSystem.from_formulas(
+            name,
+            infer_logic([init, trans, *(b for _, b in bad)]),
+            states + inputs,
+            inputs,
+            init,
+            trans,
+            TRUE(),
+        )
+        return system, bad
+
+    def _get_sort(self, sexp) -> PySMTType:
+        if sexp == "Bool":
+            return BOOL
+        if sexp == "Int":
+            return INT
+        if sexp == "Real":
+            self.has_reals = True
+            return REAL
+        if isinstance(sexp, list) and sexp[:2] == ["_", "BitVec"]:
+            return BVType(int(sexp[2]))
+        if isinstance(sexp, list) and sexp[0] == "Array":
+            return ArrayType(self._get_sort(sexp[1]), self._get_sort(sexp[2]))
+        raise ValueError(f"Unknown sort: {sexp}")
+
+    def _get_atom(self, token: str) -> FNode:
+        if self.bound.get(token):
+            return self.bound[token][-1]
+        if token in self.symbols:
+            return self.symbols[token]
+        if token == _TRUE:
+            return TRUE()
+        if token == _FALSE:
+            return FALSE()
+        if token.startswith("#"):
+            return _bv_literal(token)
+        if token.isdigit() and not self.has_reals:
+            return Int(int(token))
+        try:
+            return Real(Fraction(token))
+        except ValueError:
+            raise ValueError(f"Unknown identifier: {token}")
+
+    def _annotate(self, term: FNode, attributes: list) -> None:
+        for i, keyword in enumerate(attributes):
+            if not isinstance(keyword, str) or not keyword.startswith(":"):
+                continue
+            value = attributes[i + 1] if i + 1 < len(attributes) else None
+            if keyword == ":next":
+                self.next_names[term] = value
+            elif keyword == ":init":
+                self.init.append(term)
+            elif keyword == ":trans":
+                self.trans.append(term)
+            elif keyword == ":invar-property":
+                self.properties.append((f"property{value}", term))
+            elif keyword == ":live-property":
+                logging.warning("Live property %s is ignored", value)
+
+    def _apply(self, head, args: list) -> FNode:
+        if isinstance(head, list):
+            if head[0] == "_":
+                return OPERATIONS[head[1]]([*args, *(int(i) for i in head[2:])])
+            if head[:2] == ["as", "const"]:
+                return Array(self._get_sort(head[2]).index_type, args[0])
+            raise ValueError(f"Invalid function identifier: {head}")
+        if head == "-" and len(args) == 1:
+            zero = Real(0) if args[0].get_type().is_real_type() else Int(0)
+            return Minus(zero, args[0])
+        if head not in OPERATIONS:
+            raise ValueError(f"Invalid symbol: {head}")
+        if head in _LEFT_ASSOCIATIVE and len(args) > 2:
+            res = args[0]
+            for arg in args[1:]:
+                res = OPERATIONS[head]([res, arg])
+            return res
+        if head in ("=", "distinct", "=>") and len(args) > 2:
+            return self._apply_nary(head, args)
+        return OPERATIONS[head](args)
+
+    @staticmethod
+    def _apply_nary(head: str, args: list) -> FNode:
+        """Applies a binary relation or implication to more than two arguments"""
+        if head == "=":
+            # chainable
+            return And(OPERATIONS[head](pair) for pair in zip(args, args[1:]))
+        if head == "distinct":
+            # pairwise
+            return And(OPERATIONS[head](pair) for pair in combinations(args, 2))
+        # => is right-associative
+        res = args[-1]
+        for arg in reversed(args[:-1]):
+            res = OPERATIONS[head]([arg, res])
+        return res
+
+    def _get_term(self, sexp) -> FNode:
+        results = []
+        stack = [("eval", sexp)]
+        while stack:
+            action, node = stack.pop()
+            if action == "eval":
+                if isinstance(node, str):
+                    results.append(self._get_atom(node))
+                elif node[0] == "_":
+                    # indexed constant (_ bvN width)
+                    results.append(BV(int(node[1][2:]), int(node[2])))
+                elif node[0] == "let":
+                    names = [name for name, _ in node[1]]
+                    stack.append(("unbind", names))
+                    stack.append(("eval", node[2]))
+                    stack.append(("bind", names))
+                    stack.extend(("eval", term) for _, term in reversed(node[1]))
+                else:
+                    args = node[1:2] if node[0] == "!" else node[1:]
+                    stack.append(("apply", node))
+                    stack.extend(("eval", arg) for arg in reversed(args))
+            elif action == "bind":
+                first = len(results) - len(node)
+                for name, value in zip(node, results[first:]):
+                    self.bound.setdefault(name, []).append(value)
+                del results[first:]
+            elif action == "unbind":
+                for name in node:
+                    self.bound[name].pop()
+            elif node[0] == "!":
+                self._annotate(results[-1], node[2:])
+            else:
+                first = len(results) - (len(node) - 1)
+                res = self._apply(node[0], results[first:])
+                del results[first:]
+                results.append(res)
+        return results[0]
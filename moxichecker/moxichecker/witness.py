@@ -0,0 +1,36 @@
+"""
+Output of counterexample traces.
+
+A trace is written as JSON lines: a header with the query, the system, the
+number of steps and the names of the variables, followed by one line per step
+with the values of the variables in SMT-LIB syntax. Traces can thus be read
+step by step, and several traces can follow each other in one file.
+"""
+
+import json
+import logging
+from typing import TextIO
+from moxichecker.moxi2smt import TransitionSystem
+
+
+def write_trace(
+    stream: TextIO, system: TransitionSystem, query: str, trace: list[list[str]]
+) -> None:
+    header = {
+        "query": query,
+        "system": system.name,
+        "steps": len(trace),
+        "variables": [v.symbol_name() for v in system.variables],
+    }
+    stream.write(json.dumps(header) + "\n")
+    for step in trace:
+        stream.write(json.dumps(step) + "\n")
+
+
+def log_trace(system: TransitionSystem, query: str, trace: list[list[str]]) -> None:
+    logging.debug("Counterexample trace of query '%s':", query)
+    names = [v.symbol_name() for v in system.variables]
+    for i, step in enumerate(trace):
+        logging.debug(
+            "Step %d: %s", i, ", ".join(f"{n} = {v}" for n, v in zip(names, step))
+        )
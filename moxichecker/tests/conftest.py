@@ -0,0 +1,24 @@
+import logging
+import re
+import pytest
+from pysmt.environment import reset_env
+from moxichecker.main import main
+
+SOLVER = "z3"
+
+
+@pytest.fixture
+def check(caplog):
+    """Runs the checker with the command-line options on a task and returns
+    the model-checking result ("safe", "unsafe" or "unknown")"""
+    pytest.importorskip(SOLVER)
+    caplog.set_level(logging.INFO)
+
+    def run(path, *options) -> str:
+        # the formulas of a run are not needed by the following ones
+        reset_env()
+        caplog.clear()
+        main(["-s", SOLVER, *options, str(path)])
+        return re.findall(r"Model-checking result: (\w+)", caplog.text)[-1]
+
+    return run
@@ -0,0 +1,49 @@
+"""The bundled examples and their expected verdicts"""
+
+from pathlib import Path
+from pysmt.environment import reset_env
+from moxichecker.tasks import load_task
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+# expected verdict of the query of each example
+EXPECTED = {
+    "QF_ABV/Arrays": "unsafe",
+    "QF_ABV/BitwiseIncDec": "safe",
+    "QF_ABV/count2": "unsafe",
+    "QF_ABV/recount4": "unsafe",
+    "QF_LIA/CounterReset": "safe",
+    "QF_LIA/FibonacciSequence_reach": "unsafe",
+    "QF_LIA/FibonacciSequence_unreach": "safe",
+    "QF_LIA/FibonacciSequence_unreach2": "safe",
+    "QF_LIA/IncrementalGrowth": "unsafe",
+    "QF_LIA/IntCounter_reach": "unsafe",
+    "QF_LIA/IntCounter_unreach": "safe",
+    "QF_LIA/IntIncrement_reach": "unsafe",
+    "QF_LRA/BoundedLinearGrowth": "safe",
+    "QF_LRA/DoubleDelay2": "unsafe",
+    "QF_NIA/IntMultiply": "safe",
+    "QF_NIA/SafeSystemNIA": "safe",
+    "QF_NIA/UnsafeSystemNIA": "unsafe",
+    "QF_NRA/NonlinearGrowth": "unsafe",
+    "QF_NRA/OscillatingRatio": "safe",
+    "QF_NRA/SafeNonlinearGrowth": "safe",
+}
+UNSAFE = [name for name, verdict in EXPECTED.items() if verdict == "unsafe"]
+
+
+def example(name: str, suffix: str = ".moxi.json") -> Path:
+    return EXAMPLES / (name + suffix)
+
+
+def load_system(name: str, suffix: str = ".moxi.json") -> tuple:
+    """Returns the system and the query of the example, in a new environment"""
+    reset_env()
+    return read_system(example(name, suffix))
+
+
+def read_system(path: Path) -> tuple:
+    """Returns the system and the (1st) query of the task, in the current
+    environment"""
+    system, queries = load_task(str(path))
+    return system, queries[0][1]
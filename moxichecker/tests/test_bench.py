@@ -0,0 +1,114 @@
+import contextlib
+import csv
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+import pytest
+from moxichecker import bench
+from tests.conftest import SOLVER
+from tests.examples import EXAMPLES, example
+
+ROOT = EXAMPLES.parent
+
+
+@pytest.fixture
+def tasks(monkeypatch, tmp_path):
+    """Returns a directory for the tasks; the runs import moxichecker from the
+    source tree"""
+    pytest.importorskip(SOLVER)
+    monkeypatch.setenv("PYTHONPATH", str(ROOT))
+    directory = tmp_path / "tasks"
+    directory.mkdir()
+    return directory
+
+
+def _copy(name: str, directory, new_name: Optional[str] = None) -> None:
+    path = example(name)
+    shutil.copy(path, directory / (new_name or path.name))
+
+
+def _bench(directory, *options) -> tuple:
+    """Runs the harness and returns its exit code and results"""
+    results = directory.parent / "results.json"
+    code = bench.main([str(directory), "-s", SOLVER, "--json", str(results), *options])
+    with open(results) as f:
+        return code, json.load(f)
+
+
+def test_bench(tasks, tmp_path):
+    _copy("QF_LIA/IntCounter_reach", tasks)
+    _copy("QF_LIA/IntCounter_unreach", tasks)
+    _copy("QF_ABV/count2", tasks)
+    table = tmp_path / "results.csv"
+    code, results = _bench(tasks, "-m", "kind", "-m", "pdr", "--csv", str(table))
+    assert code == 0
+    assert len(results) == 6
+    statuses = {(r["task"].split("/")[-1], r["mc_alg"]): r["status"] for r in results}
+    assert statuses == {
+        ("IntCounter_reach.moxi.json", "kind"): "correct",
+        ("IntCounter_reach.moxi.json", "pdr"): "correct",
+        ("IntCounter_unreach.moxi.json", "kind"): "correct",
+        ("IntCounter_unreach.moxi.json", "pdr"): "correct",
+        ("count2.moxi.json", "kind"): "done",
+        ("count2.moxi.json", "pdr"): "done",
+    }
+    with open(table) as f:
+        rows = list(csv.DictReader(f))
+    assert [row["verdict"] for row in rows] == [r["verdict"] for r in results]
+
+
+def test_wrong_verdict(tasks):
+    _copy("QF_LIA/IntCounter_reach", tasks, "Counter_unreach.moxi.json")
+    code, results = _bench(tasks)
+    assert code == 1
+    assert results[0]["status"] == "wrong"
+
+
+def test_timeout(tasks):
+    # PDR does not decide this task within a minute
+    _copy("QF_LIA/FibonacciSequence_unreach", tasks)
+    code, results = _bench(tasks, "-m", "pdr", "--timeout", "1")
+    assert code == 0
+    assert results[0]["status"] == "timeout"
+
+
+def _running(directory) -> list:
+    """Returns the command lines of the processes that check a task in directory"""
+    cmdlines = []
+    for path in Path("/proc").glob("[0-9]*/cmdline"):
+        with contextlib.suppress(OSError):
+            cmdlines.append(path.read_bytes().decode(errors="replace"))
+    return [cmdline for cmdline in cmdlines if str(directory) in cmdline]
+
+
+def test_timeout_kills_checker(tasks):
+    """The model checker of a run with --timeout, which has a session of its
+    own, is killed at the time limit of the harness"""
+    _copy("QF_LIA/FibonacciSequence_unreach", tasks)
+    options = "--options=--timeout 60"
+    code, results = _bench(tasks, "-m", "pdr", options, "--timeout", "2")
+    assert code == 0
+    assert results[0]["status"] == "timeout"
+    # killed processes may take a moment to exit
+    deadline = time.monotonic() + 5
+    while _running(tasks) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert _running(tasks) == []
+
+
+def test_memory_limit(tasks):
+    """The memory limit applies from the start of the checker"""
+    _copy("QF_LIA/IntCounter_reach", tasks)
+    code, results = _bench(tasks, "--memory", "20")
+    assert code == 0
+    assert results[0]["status"] == "memout"
+
+
+def test_no_statistics(tasks):
+    """A run that prints no statistics is an error"""
+    _copy("QF_LIA/IntCounter_reach", tasks)
+    code, results = _bench(tasks, "--options=--version")
+    assert code == 0
+    assert results[0]["status"] == "error"
@@ -0,0 +1,67 @@
+import os
+import pytest
+from moxichecker.cache import VerdictCache
+from moxichecker.main import main
+from tests.examples import example
+
+HIT = "Using the cached result"
+
+
+@pytest.fixture(autouse=True)
+def no_default_cache(monkeypatch):
+    monkeypatch.delenv("MOXICHECKER_CACHE_DIR", raising=False)
+
+
+def _entries(directory) -> list:
+    return sorted(directory.glob("*.json"))
+
+
+def test_hit(check, caplog, tmp_path):
+    cache = tmp_path / "cache"
+    name = example("QF_LIA/IntCounter_reach")
+    witnesses = [tmp_path / "witness1.jsonl", tmp_path / "witness2.jsonl"]
+    options = ["-m", "bmc", "--cache-dir", str(cache)]
+    assert check(name, *options, "--witness", str(witnesses[0])) == "unsafe"
+    assert HIT not in caplog.text
+    assert len(_entries(cache)) == 1
+    assert check(name, *options, "--witness", str(witnesses[1])) == "unsafe"
+    assert HIT in caplog.text
+    assert witnesses[0].read_text() == witnesses[1].read_text()
+    assert len(_entries(cache)) == 1
+
+
+def test_options_miss(check, caplog, tmp_path):
+    name = example("QF_LIA/IntCounter_unreach")
+    for mc_alg in ("kind", "pdr"):
+        assert check(name, "-m", mc_alg, "--cache-dir", str(tmp_path)) == "safe"
+        assert HIT not in caplog.text
+    assert len(_entries(tmp_path)) == 2
+
+
+def test_no_cache(check, caplog, tmp_path):
+    name = example("QF_LIA/IntCounter_reach")
+    check(name, "--cache-dir", str(tmp_path))
+    check(name, "--cache-dir", str(tmp_path), "--no-cache")
+    assert HIT not in caplog.text
+
+
+def test_clear_cache(check, tmp_path):
+    check(example("QF_LIA/IntCounter_reach"), "--cache-dir", str(tmp_path))
+    assert _entries(tmp_path)
+    main(["--cache-dir", str(tmp_path), "--clear-cache"])
+    assert not _entries(tmp_path)
+
+
+def test_eviction(tmp_path):
+    cache = VerdictCache(str(tmp_path), 1)
+    traces = [[["0"] * 1000] * 100]
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, [False], traces)
+        os.utime(cache._path(key), (i, i))
+    size = cache._path("a").stat().st_size
+    cache.max_size = 2.5 * size
+    # reading an entry marks it as used
+    assert cache.get("a") == ([False], traces)
+    cache.put("c", [False], traces)
+    assert [path.stem for path in _entries(tmp_path)] == ["a", "c"]
+    assert cache.get("b") is None
@@ -0,0 +1,108 @@
+import pytest
+from pysmt.environment import reset_env
+from pysmt.shortcuts import BV
+from moxichecker.btor2_parser import parse_btor2
+from moxichecker.moxi2smt import _bv_smod
+from moxichecker.moxi_parser import read_sexps
+from moxichecker.vmt_parser import _VmtReader, parse_vmt
+from tests.examples import EXPECTED, example
+
+FORMATS = [".moxi", ".moxi.json", ".vmt", ".btor2"]
+
+# a 1-bit toggle that starts at 0, with the bad state 1 reachable in one step
+TOGGLE_BTOR2 = """
+1 sort bitvec 1
+2 zero 1
+3 state 1 t
+4 init 1 3 2
+5 not 1 3
+6 next 1 3 5
+7 bad 3 reached
+"""
+
+TOGGLE_VMT = """
+(declare-fun t () Bool)
+(declare-fun t.next () Bool)
+(define-fun .t () Bool (! t :next t.next))
+(define-fun .init () Bool (! (not t) :init true))
+(define-fun .trans () Bool (! (= t.next (not t)) :trans true))
+(define-fun .prop () Bool (! (not t) :invar-property 0))
+"""
+
+
+@pytest.mark.parametrize("suffix", FORMATS)
+@pytest.mark.parametrize("name", ["QF_ABV/count2", "QF_ABV/recount4"])
+@pytest.mark.parametrize("algorithm", ["bmc", "kind"])
+def test_formats(check, name, suffix, algorithm):
+    """All front ends give the same verdicts"""
+    assert check(example(name, suffix), "-m", algorithm) == EXPECTED[name]
+
+
+def test_btor2():
+    reset_env()
+    system, bad = parse_btor2(TOGGLE_BTOR2)
+    assert [var.symbol_name() for var in system.variables] == ["t"]
+    # bit-vectors of width 1 are Booleans
+    assert system.variables[0].symbol_type().is_bool_type()
+    assert [name for name, _ in bad] == ["reached"]
+
+
+def test_vmt():
+    reset_env()
+    system, bad = parse_vmt(TOGGLE_VMT)
+    assert [var.symbol_name() for var in system.variables] == ["t"]
+    assert [name for name, _ in bad] == ["property0"]
+
+
+def test_smod():
+    """bvsmod/smod is the signed modulo, its sign follows the divisor"""
+    reset_env()
+    for a in range(-8, 8):
+        for b in range(-8, 8):
+            res = _bv_smod(BV(a % 16, 4), BV(b % 16, 4)).simplify()
+            assert res.bv_signed_value() == (a % b if b != 0 else a)
+
+
+@pytest.mark.parametrize(
+    "term, value",
+    [
+        ("(= 1 1 1)", True),
+        ("(= 1 1 2)", False),
+        ("(distinct 1 2 3)", True),
+        ("(distinct 1 2 1)", False),
+        ("(=> true true false)", False),
+        # right-associative: false => (true => false)
+        ("(=> false true false)", True),
+    ],
+)
+def test_vmt_nary(term, value):
+    reset_env()
+    assert _VmtReader()._get_term(next(read_sexps(term))).simplify().is_true() == value
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("1 sort list 3", "Unknown sort"),
+        ("1 sort bitvec 1\n2 zero 1\n3 foo 1 2", "Unsupported operator"),
+        ("1 sort bitvec 1\n2 not 1 7", "line 2"),
+    ],
+)
+def test_btor2_errors(text, message):
+    reset_env()
+    with pytest.raises(ValueError, match=message):
+        parse_btor2(text)
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("(declare-fun f (Int) Int)", "Uninterpreted functions"),
+        ("(define-fun f ((x Int)) Int x)", "parameters"),
+        ("(define-fun f () Int y)", "Unknown identifier"),
+    ],
+)
+def test_vmt_errors(text, message):
+    reset_env()
+    with pytest.raises(ValueError, match=message):
+        parse_vmt(text)
@@ -0,0 +1,70 @@
+import pytest
+from pysmt.environment import reset_env
+from pysmt.shortcuts import (
+    GE,
+    LE,
+    TRUE,
+    And,
+    Equals,
+    Implies,
+    Int,
+    Not,
+    Plus,
+    Solver,
+    Symbol,
+)
+from pysmt.typing import INT
+from moxichecker.moxi2smt import TransitionSystem, next_var
+from tests.conftest import SOLVER
+from tests.examples import EXPECTED, example, load_system
+
+invariants = pytest.importorskip("moxichecker.invariants")
+
+
+def _is_valid(formula, logic: str) -> bool:
+    with Solver(name=SOLVER, logic=logic) as solver:
+        return not solver.is_sat(Not(formula))
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_inductive(name):
+    """The invariants hold initially and are preserved by every transition"""
+    pytest.importorskip(SOLVER)
+    system, _ = load_system(name)
+    invariant = And(invariants.find_invariants(system, SOLVER))
+    init = And(system.init, system.inv)
+    assert _is_valid(Implies(init, invariant), system.logic)
+    step = And(
+        invariant, system.inv, system.trans, system.inv.substitute(system.prime_map)
+    )
+    next_invariant = invariant.substitute(system.prime_map)
+    assert _is_valid(Implies(step, next_invariant), system.logic)
+
+
+def test_houdini():
+    """Only the candidates that are inductive together are kept"""
+    pytest.importorskip(SOLVER)
+    reset_env()
+    x = Symbol("x", INT)
+    # x counts up from 0
+    system = TransitionSystem.from_formulas(
+        "main",
+        "QF_LIA",
+        [x],
+        [],
+        Equals(x, Int(0)),
+        Equals(next_var(x), Plus(x, Int(1))),
+        TRUE(),
+    )
+    inductive = GE(x, Int(0))
+    initial_only = LE(x, Int(5))
+    violated = Equals(x, Int(1))
+    candidates = [initial_only, inductive, violated]
+    assert invariants._houdini(system, SOLVER, candidates) == [inductive]
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"], ["--parallel-kind"]])
+@pytest.mark.parametrize("name", EXPECTED)
+def test_aux_invariants(check, name, options):
+    verdict = check(example(name), "-m", "kind", "--aux-invariants", *options)
+    assert verdict == EXPECTED[name]
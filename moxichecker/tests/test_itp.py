@@ -0,0 +1,21 @@
+import pytest
+from tests.examples import EXPECTED, example
+
+# linear examples, for which MathSAT computes interpolants
+LINEAR = [name for name in EXPECTED if name.startswith(("QF_LIA", "QF_LRA"))]
+
+
+@pytest.mark.parametrize("name", LINEAR)
+def test_itp(check, name):
+    pytest.importorskip("mathsat")
+    verdict = check(example(name), "-m", "itp", "-s", "msat", "--max-bound", "20")
+    assert verdict in (EXPECTED[name], "unknown")
+    if EXPECTED[name] == "unsafe":
+        # violations are found by BMC within the bound
+        assert verdict == "unsafe"
+
+
+def test_no_interpolation(check):
+    # the solver of the check fixture computes no interpolants
+    with pytest.raises(ValueError, match="provides no interpolation"):
+        check(example("QF_LIA/IntCounter_unreach"), "-m", "itp")
@@ -0,0 +1,92 @@
+import os
+import re
+import signal
+import pytest
+from pysmt.shortcuts import Not
+from moxichecker.main import get_args
+from moxichecker.model_checking import BMCInductionIncr, ParallelBMCInduction
+from tests.conftest import SOLVER
+from tests.examples import EXPECTED, UNSAFE, example, load_system
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"]])
+@pytest.mark.parametrize("name", EXPECTED)
+def test_kind(check, name, options):
+    assert check(example(name), "-m", "kind", *options) == EXPECTED[name]
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"]])
+@pytest.mark.parametrize("name", UNSAFE)
+def test_bmc(check, name, options):
+    assert check(example(name), "-m", "bmc", *options) == "unsafe"
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"]])
+@pytest.mark.parametrize(
+    "name", ["QF_ABV/count2", "QF_LIA/IntCounter_reach", "QF_LIA/IntCounter_unreach"]
+)
+def test_no_simple_path(check, name, options):
+    verdict = check(example(name), "-m", "kind", "--no-simple-path", *options)
+    assert verdict == EXPECTED[name]
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"]])
+@pytest.mark.parametrize("name", EXPECTED)
+def test_lazy_simple_path(check, name, options):
+    verdict = check(example(name), "-m", "kind", "--lazy-simple-path", *options)
+    assert verdict == EXPECTED[name]
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"]])
+@pytest.mark.parametrize("name", EXPECTED)
+def test_parallel_kind(check, name, options):
+    verdict = check(example(name), "-m", "kind", "--parallel-kind", *options)
+    assert verdict == EXPECTED[name]
+
+
+@pytest.mark.parametrize("stream", ["bmc", "ind"])
+def test_parallel_worker_killed(check, monkeypatch, stream):
+    """The property is unknown if a worker is killed before its result"""
+    run_stream = ParallelBMCInduction._run_stream
+
+    def run_or_die(self, worker_stream, prop, queue):
+        if worker_stream == stream:
+            os.kill(os.getpid(), signal.SIGKILL)
+        run_stream(self, worker_stream, prop, queue)
+
+    monkeypatch.setattr(ParallelBMCInduction, "_run_stream", run_or_die)
+    name = example("QF_LIA/IntCounter_unreach")
+    assert check(name, "-m", "kind", "--parallel-kind") == "unknown"
+
+
+@pytest.mark.parametrize(
+    "name", ["QF_LIA/IntCounter_unreach", "QF_LIA/FibonacciSequence_unreach"]
+)
+def test_incremental_scopes(name):
+    """The incremental engine keeps its queries on a flat assertion stack"""
+    pytest.importorskip(SOLVER)
+    system, query = load_system(name)
+    prover = BMCInductionIncr(system, SOLVER)
+    assert prover.check_property(Not(query))
+    for solver in (prover.bmc_solver, prover.ind_solver):
+        assert solver.z3.num_scopes() == 0
+
+
+def _depth(check, caplog, name, *options) -> int:
+    """Returns the depth of the violation found by BMC"""
+    assert check(example(name), "-m", "bmc", *options) == "unsafe"
+    return int(re.findall(r"Query reached at step (\d+)", caplog.text)[-1])
+
+
+@pytest.mark.parametrize("options", [["--bmc-step", "4"], ["--bmc-geometric"]])
+@pytest.mark.parametrize("name", UNSAFE)
+def test_bound_jumping(check, caplog, name, options):
+    """Jumping finds the shortest counterexample, as step-by-step BMC"""
+    depth = _depth(check, caplog, name)
+    assert _depth(check, caplog, name, *options) == depth
+
+
+def test_bmc_step_positive(capsys):
+    with pytest.raises(SystemExit):
+        get_args(["--bmc-step", "0", str(example("QF_LIA/IntCounter_reach"))])
+    assert "--bmc-step must be positive" in capsys.readouterr().err
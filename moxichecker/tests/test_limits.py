@@ -0,0 +1,72 @@
+import time
+import pytest
+from tests.examples import EXPECTED, example
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"], ["--parallel-kind"]])
+def test_max_bound(check, options):
+    name = example("QF_LIA/FibonacciSequence_unreach")
+    verdict = check(
+        name, "-m", "kind", "--no-simple-path", "--max-bound", "2", *options
+    )
+    assert verdict == "unknown"
+
+
+def test_max_bound_reached(check):
+    """A violation within the maximal bound is still found"""
+    verdict = check(example("QF_LIA/IntCounter_reach"), "-m", "bmc", "--max-bound", "5")
+    assert verdict == "unsafe"
+
+
+def test_max_frames(check):
+    name = example("QF_LIA/FibonacciSequence_unreach")
+    assert check(name, "-m", "pdr", "--max-frames", "2") == "unknown"
+
+
+@pytest.mark.parametrize("mc_alg", ["bmc", "kind", "pdr"])
+def test_timeout(check, mc_alg):
+    """The time limit is kept even if the solver ignores the interrupt"""
+    start = time.perf_counter()
+    name = example("QF_NRA/SafeNonlinearGrowth")
+    verdict = check(name, "-m", mc_alg, "--no-simple-path", "--timeout", "2")
+    assert verdict in (EXPECTED["QF_NRA/SafeNonlinearGrowth"], "unknown")
+    assert time.perf_counter() - start < 10
+
+
+@pytest.mark.parametrize("timeout", ["0", "0.01", "0.1"])
+@pytest.mark.parametrize("mc_alg", ["bmc", "kind", "pdr", "portfolio"])
+def test_timeout_expired(check, mc_alg, timeout):
+    """A time limit that expires before or while the prover is built gives
+    unknown verdicts"""
+    name = "QF_NRA/SafeNonlinearGrowth"
+    verdict = check(example(name), "-m", mc_alg, "--timeout", timeout)
+    if timeout == "0":
+        assert verdict == "unknown"
+    else:
+        assert verdict in (EXPECTED[name], "unknown")
+
+
+def test_timeout_not_reached(check):
+    name = example("QF_LIA/IntCounter_reach")
+    assert check(name, "-m", "kind", "--timeout", "60") == "unsafe"
+
+
+def test_timeout_includes_loading(check, monkeypatch):
+    from moxichecker import model_checking, tasks
+
+    load_task = tasks.load_task
+    time_limits = []
+
+    def slow_load_task(path):
+        time.sleep(0.5)
+        return load_task(path)
+
+    def check_properties(args, system, props, time_limit=None):
+        time_limits.append(time_limit)
+        return [True] * len(props), [None] * len(props)
+
+    monkeypatch.setattr(tasks, "load_task", slow_load_task)
+    monkeypatch.setattr(model_checking, "check_properties", check_properties)
+    name = example("QF_LIA/IntCounter_unreach")
+    assert check(name, "--preprocess", "--timeout", "60") == "safe"
+    assert time_limits[0] <= 59.5
@@ -0,0 +1,73 @@
+import json
+import pytest
+from moxichecker.loader import CommandIndex, load_commands
+from moxichecker.moxi2smt import get_check_system, get_define_system, get_logic
+from tests.examples import EXPECTED, example
+
+COMMANDS = [
+    {"command": "set-logic", "logic": "QF_LIA"},
+    {"command": "define-system", "symbol": "A", "input": [], "init": "true"},
+    {"command": "define-system", "symbol": "B", "input": [], "init": "false"},
+    {"command": "check-system", "symbol": "B", "query": []},
+]
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_same_commands(name):
+    """The index returns the same commands as decoding the whole file"""
+    with open(example(name)) as f:
+        commands = json.load(f)
+    index = load_commands(str(example(name)))
+    assert len(index) == len(commands)
+    assert get_logic(index) == get_logic(commands)
+    check_sys_cmd = get_check_system(index)
+    assert check_sys_cmd == get_check_system(commands)
+    symbol = check_sys_cmd["symbol"]
+    assert get_define_system(index, symbol) == get_define_system(commands, symbol)
+
+
+def test_multiple_systems():
+    index = CommandIndex(json.dumps(COMMANDS, indent=2))
+    assert len(index) == 4
+    assert get_define_system(index, "B") == COMMANDS[2]
+    assert index.find("define-system") == COMMANDS[2]
+    assert index.find("define-system", "C") is None
+    # only the checked system is kept
+    for symbol in ("A", "C"):
+        with pytest.raises(ValueError, match="not defined"):
+            get_define_system(index, symbol)
+
+
+def test_brackets_in_strings():
+    commands = [
+        {"command": "set-logic", "logic": "QF_LIA"},
+        {"command": "define-system", "symbol": ']}\\"[{', "init": "{"},
+        {"command": "check-system", "symbol": ']}\\"[{', "query": []},
+    ]
+    index = CommandIndex(json.dumps(commands))
+    assert len(index) == 3
+    assert get_define_system(index, commands[1]["symbol"]) == commands[1]
+
+
+def test_missing_commands():
+    index = CommandIndex("[]")
+    assert len(index) == 0
+    with pytest.raises(ValueError, match="No set-logic"):
+        get_logic(index)
+    with pytest.raises(ValueError, match="No system check"):
+        get_check_system(index)
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ('{"command": "set-logic"}', "list of commands"),
+        ("[1]", "Invalid command"),
+        ('[{"command": "set-logic"} {"command": "set-logic"}]', "Expected ','"),
+        ('[{"symbol": "A"}]', "Invalid command"),
+        ('[{"command": "set-logic"', "Unterminated"),
+    ],
+)
+def test_invalid_file(text, message):
+    with pytest.raises(ValueError, match=message):
+        CommandIndex(text)
@@ -0,0 +1,65 @@
+import pytest
+from pysmt.environment import reset_env
+from pysmt.shortcuts import Equals, Int, Plus, Symbol, Times
+from pysmt.typing import INT
+from moxichecker.moxi2smt import _FormulaBuilder
+from tests.examples import load_system
+
+
+@pytest.fixture
+def system():
+    system, _ = load_system("QF_LIA/FibonacciSequence_unreach")
+    return system
+
+
+def test_timed_symbols(system):
+    state = system.get_state(3)
+    assert system.get_state(3) is state
+    assert len(set(state)) == len(system.variables)
+    assert not set(state) & set(system.get_state(2))
+    assert [system.get_timed_var(v, 3) for v in system.variables] == state
+
+
+def test_substitution_maps(system):
+    subs = system.get_subs(2)
+    assert system.get_subs(2) is subs
+    for v, v_2, v_3 in zip(system.variables, system.get_state(2), system.get_state(3)):
+        assert subs[v] == v_2
+        assert subs[system.prime_map[v]] == v_3
+
+
+def test_steps(system):
+    step = system.get_step(2)
+    assert system.get_step(2) is step
+    trans = system.trans.substitute(system.get_subs(2))
+    inv = system.inv.substitute(system.get_subs(3))
+    assert step.args() == (trans, inv)
+
+
+def _apply(symbol: str, *args) -> dict:
+    return {"identifier": {"symbol": symbol}, "args": list(args)}
+
+
+def test_deep_term():
+    reset_env()
+    x = Symbol("x", INT)
+    term = {"identifier": "x"}
+    for _ in range(10000):
+        term = _apply("+", term, {"identifier": "1"})
+    formula = _FormulaBuilder("QF_LIA", {"x": x}).build(term)
+    depth = 0
+    while formula.is_plus():
+        formula = formula.arg(0)
+        depth += 1
+    assert (depth, formula) == (10000, x)
+
+
+def test_shared_terms():
+    reset_env()
+    x = Symbol("x", INT)
+    sum_ = _apply("+", {"identifier": "x"}, {"identifier": "1"})
+    builder = _FormulaBuilder("QF_LIA", {"x": x})
+    formula = builder.build(_apply("=", sum_, _apply("*", sum_, sum_)))
+    assert formula == Equals(Plus(x, Int(1)), Times(Plus(x, Int(1)), Plus(x, Int(1))))
+    # the second and third copy of the sum are cached
+    assert builder.num_cached == 6
@@ -0,0 +1,53 @@
+import pytest
+from pysmt.environment import reset_env
+from moxichecker.moxi_parser import parse_moxi
+from tests.examples import EXPECTED, example, read_system
+
+# the query bound of the shipped .moxi.json file is stale
+STALE_QUERY = {"QF_NIA/UnsafeSystemNIA"}
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_same_formulas(name):
+    """Both formats of an example are translated to the same formulas"""
+    reset_env()
+    system, query = read_system(example(name, ".moxi"))
+    json_system, json_query = read_system(example(name))
+    assert system.init == json_system.init
+    assert system.trans == json_system.trans
+    assert system.inv == json_system.inv
+    if name not in STALE_QUERY:
+        assert query == json_query
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_moxi_verdict(check, name):
+    assert check(example(name, ".moxi"), "-m", "kind") == EXPECTED[name]
+
+
+def test_comments_and_quoted_symbols():
+    text = """
+    ; a comment
+    (set-logic QF_LIA) ; another comment
+    (define-system |the system| :input ((x Int)) :init (= x 0))
+    """
+    logic, system = parse_moxi(text)
+    assert logic == {"command": "set-logic", "logic": "QF_LIA"}
+    assert system["symbol"] == "the system"
+    assert [var["symbol"] for var in system["input"]] == ["x"]
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("(set-logic QF_LIA))", "Unbalanced"),
+        ("(set-logic QF_LIA", "unbalanced"),
+        ("set-logic", "outside of a command"),
+        ('(echo "text)', "Unterminated"),
+        ("(define-system S :init)", "Missing value"),
+        ("(define-system S :foo true)", "Unknown attribute"),
+    ],
+)
+def test_syntax_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        list(parse_moxi(text))
@@ -0,0 +1,52 @@
+import pytest
+from moxichecker.model_checking import PDR
+from tests.examples import EXPECTED, example
+
+# examples that PDR decides quickly with z3
+DECIDED = [
+    "QF_ABV/Arrays",
+    "QF_ABV/BitwiseIncDec",
+    "QF_ABV/count2",
+    "QF_ABV/recount4",
+    "QF_LIA/CounterReset",
+    "QF_LIA/FibonacciSequence_reach",
+    "QF_LIA/IncrementalGrowth",
+    "QF_LIA/IntCounter_reach",
+    "QF_LIA/IntCounter_unreach",
+    "QF_LIA/IntIncrement_reach",
+    "QF_NIA/IntMultiply",
+    "QF_NIA/SafeSystemNIA",
+    "QF_NRA/OscillatingRatio",
+]
+
+
+@pytest.mark.parametrize("name", DECIDED)
+def test_pdr(check, name):
+    assert check(example(name), "-m", "pdr") == EXPECTED[name]
+
+
+@pytest.mark.parametrize("name", DECIDED)
+def test_no_lifting(check, name):
+    assert check(example(name), "-m", "pdr", "--no-lifting") == EXPECTED[name]
+
+
+def test_lifting(check):
+    # decided only with lifted cubes
+    assert check(example("QF_LRA/DoubleDelay2"), "-m", "pdr") == "unsafe"
+
+
+@pytest.mark.parametrize(
+    "name", ["QF_ABV/Arrays", "QF_ABV/count2", "QF_LIA/IntCounter_reach"]
+)
+def test_spurious_counterexample(check, monkeypatch, name):
+    confirm = PDR._confirm_counterexample
+    lifting = []
+
+    def spurious_once(self, *args):
+        lifting.append(self.lifting)
+        return len(lifting) > 1 and confirm(self, *args)
+
+    # the first counterexample is spurious, PDR continues without lifting
+    monkeypatch.setattr(PDR, "_confirm_counterexample", spurious_once)
+    assert check(example(name), "-m", "pdr") == "unsafe"
+    assert lifting[0] and not lifting[-1]
@@ -0,0 +1,64 @@
+import json
+import os
+import signal
+import pytest
+from moxichecker.model_checking import Portfolio
+from tests.examples import EXPECTED, example
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_default_portfolio(check, name):
+    assert check(example(name), "-m", "portfolio") == EXPECTED[name]
+
+
+@pytest.mark.parametrize("name", ["QF_LIA/IntCounter_reach", "QF_NIA/IntMultiply"])
+def test_portfolio_log(check, tmp_path, name):
+    log = tmp_path / "portfolio.jsonl"
+    configs = ["-m kind --incr-solving", "-m kind --no-simple-path"]
+    verdict = check(
+        example(name),
+        "-m",
+        "portfolio",
+        *(f"--portfolio-config={config}" for config in configs),
+        "--portfolio-log",
+        str(log),
+    )
+    assert verdict == EXPECTED[name]
+    (record,) = [json.loads(line) for line in log.read_text().splitlines()]
+    assert record["verdict"] == EXPECTED[name]
+    assert record["winner"] in configs
+    assert record["configurations"] == configs
+
+
+def test_nested_portfolio(check):
+    with pytest.raises(SystemExit):
+        check(
+            example("QF_LIA/IntCounter_reach"),
+            "-m",
+            "portfolio",
+            "--portfolio-config=-m portfolio",
+        )
+
+
+@pytest.mark.parametrize(
+    "killed, expected",
+    [(["-m kind"], "safe"), (["-m kind", "-m pdr"], "unknown")],
+)
+def test_member_killed(check, monkeypatch, killed, expected):
+    """Members that are killed have no verdict"""
+    run_member = Portfolio._run_member
+
+    def run_or_die(self, i, prop, queue):
+        if self.members[i][0] in killed:
+            os.kill(os.getpid(), signal.SIGKILL)
+        run_member(self, i, prop, queue)
+
+    monkeypatch.setattr(Portfolio, "_run_member", run_or_die)
+    verdict = check(
+        example("QF_LIA/IntCounter_unreach"),
+        "-m",
+        "portfolio",
+        "--portfolio-config=-m kind",
+        "--portfolio-config=-m pdr",
+    )
+    assert verdict == expected
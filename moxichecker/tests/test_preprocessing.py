@@ -0,0 +1,25 @@
+import pytest
+from moxichecker.preprocessing import preprocess
+from tests.examples import EXPECTED, example, load_system
+from tests.test_pdr import DECIDED
+
+
+@pytest.mark.parametrize("options", [["-m", "kind"], ["-m", "kind", "--incr-solving"]])
+@pytest.mark.parametrize("name", EXPECTED)
+def test_kind(check, name, options):
+    assert check(example(name), "--preprocess", *options) == EXPECTED[name]
+
+
+@pytest.mark.parametrize("name", DECIDED)
+def test_pdr(check, name):
+    assert check(example(name), "--preprocess", "-m", "pdr") == EXPECTED[name]
+
+
+@pytest.mark.parametrize(
+    "name, variables",
+    [("QF_LIA/IntCounter_reach", 2), ("QF_LRA/DoubleDelay2", 3), ("QF_ABV/count2", 1)],
+)
+def test_removed_variables(name, variables):
+    system, query = load_system(name)
+    preprocess(system, [query])
+    assert len(system.variables) == variables
@@ -0,0 +1,38 @@
+import re
+import pytest
+
+# a counter that counts up from 0: it reaches 3, but never a negative value
+COUNTER = """
+(set-logic QF_LIA)
+(define-system main
+   :output ((x Int))
+   :init (= x 0)
+   :trans (= x' (+ x 1)))
+(check-system main
+   :output ((x Int))
+   :reachable (r_three (= x 3))
+   :reachable (r_negative (< x 0))
+   :reachable (r_unused (= x 1))
+   :query (q_three (r_three))
+   :query (q_negative (r_negative)))
+"""
+
+ALGORITHMS = [
+    ["-m", "kind"],
+    ["-m", "kind", "--incr-solving"],
+    ["-m", "kind", "--parallel-kind"],
+    ["-m", "kind", "--preprocess"],
+    ["-m", "pdr"],
+    ["-m", "portfolio"],
+]
+
+
+@pytest.mark.parametrize("options", ALGORITHMS)
+def test_queries(check, caplog, tmp_path, options):
+    path = tmp_path / "counter.moxi"
+    path.write_text(COUNTER)
+    assert check(path, *options) == "unsafe"
+    verdicts = dict(
+        re.findall(r"Model-checking result of query '(\w+)': (\w+)", caplog.text)
+    )
+    assert verdicts == {"r_three": "unsafe", "r_negative": "safe"}
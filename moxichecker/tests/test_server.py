@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import pytest
+from moxichecker import server
+from tests.conftest import SOLVER
+from tests.examples import EXAMPLES, example
+
+ROOT = EXAMPLES.parent
+
+
+def _start_pool() -> server.WorkerPool:
+    pytest.importorskip(SOLVER)
+    return server.WorkerPool(server._get_args(["-j", "1", "--warm-up", SOLVER]))
+
+
+@pytest.fixture
+def pool():
+    pool = _start_pool()
+    yield pool
+    pool.terminate()
+
+
+def _run(pool, argv: list) -> dict:
+    """Runs a task in the pool and returns its result"""
+    results = []
+    done = threading.Event()
+
+    def callback(result: dict) -> None:
+        results.append(result)
+        done.set()
+
+    pool.submit(argv, callback)
+    assert done.wait(60)
+    return results[0]
+
+
+def test_stdin():
+    pytest.importorskip(SOLVER)
+    tasks = [
+        {"id": 1, "args": ["-s", SOLVER, str(example("QF_LIA/IntCounter_reach"))]},
+        "not a task",
+        {"id": "b", "args": f"-s {SOLVER} {example('QF_LIA/IntCounter_unreach')}"},
+        {"id": 3, "args": ["--no-such-option"]},
+    ]
+    lines = [task if isinstance(task, str) else json.dumps(task) for task in tasks]
+    proc = subprocess.run(
+        [sys.executable, "-m", "moxichecker.server", "-j", "2", "--warm-up", SOLVER],
+        input="\n".join(lines) + "\n",
+        capture_output=True,
+        # the exit code is asserted below, with the output of the server
+        check=False,
+        text=True,
+        timeout=120,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    assert proc.returncode == 0, proc.stderr
+    results = {}
+    for line in proc.stdout.splitlines():
+        result = json.loads(line)
+        results[result.pop("id")] = result
+    assert results.keys() == {1, "b", 3, None}
+    assert results[1]["verdict"] == "unsafe"
+    assert results[1]["verdicts"] == {"rch_1": "unsafe"}
+    assert results["b"]["verdict"] == "safe"
+    assert "unrecognized arguments" in results[3]["error"]
+    assert results[None]["error"].startswith("invalid task")
+
+
+def test_worker_exits(monkeypatch):
+    run_task = server._run_task
+
+    def exit_on_die(argv, timeout):
+        if argv == ["die"]:
+            os._exit(3)
+        return run_task(argv, timeout)
+
+    # the workers are forked from the test and run the patched function
+    monkeypatch.setattr(server, "_run_task", exit_on_die)
+    pool = _start_pool()
+    try:
+        assert _run(pool, ["die"]) == {"error": "worker exited with code 3"}
+        # the worker is replaced
+        result = _run(pool, ["-s", SOLVER, str(example("QF_LIA/IntCounter_reach"))])
+        assert result["verdict"] == "unsafe"
+    finally:
+        pool.terminate()
+
+
+def test_task_error(pool):
+    result = _run(pool, ["-s", SOLVER, str(EXAMPLES / "missing.moxi.json")])
+    assert "FileNotFoundError" in result["error"]
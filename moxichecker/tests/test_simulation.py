@@ -0,0 +1,159 @@
+import pytest
+from pysmt.environment import reset_env
+from pysmt.shortcuts import (
+    BV,
+    GT,
+    LT,
+    And,
+    BVAShr,
+    BVAdd,
+    BVAnd,
+    BVConcat,
+    BVExtract,
+    BVLShl,
+    BVLShr,
+    BVMul,
+    BVNeg,
+    BVNot,
+    BVOr,
+    BVRol,
+    BVRor,
+    BVSDiv,
+    BVSExt,
+    BVSLE,
+    BVSLT,
+    BVSRem,
+    BVSub,
+    BVUDiv,
+    BVULE,
+    BVULT,
+    BVURem,
+    BVXor,
+    BVZExt,
+    Int,
+    Plus,
+    Symbol,
+    TRUE,
+)
+from pysmt.typing import BVType, INT
+from moxichecker.moxi2smt import TransitionSystem, next_var
+from tests.conftest import SOLVER
+from tests.examples import EXPECTED, UNSAFE, example
+from tests.test_witness import _check_witness
+
+np = pytest.importorskip("numpy")
+simulation = pytest.importorskip("moxichecker.simulation")
+
+# arrays are not simulated
+NOT_SIMULATED = ["QF_ABV/Arrays"]
+
+BINARY = [
+    BVAdd,
+    BVSub,
+    BVMul,
+    BVUDiv,
+    BVURem,
+    BVSDiv,
+    BVSRem,
+    BVAnd,
+    BVOr,
+    BVXor,
+    BVLShl,
+    BVLShr,
+    BVAShr,
+    BVConcat,
+    BVULT,
+    BVULE,
+    BVSLT,
+    BVSLE,
+]
+UNARY = [
+    BVNot,
+    BVNeg,
+    lambda a: BVExtract(a, 1, 2),
+    lambda a: BVZExt(a, 3),
+    lambda a: BVSExt(a, 3),
+    lambda a: BVRol(a, 1),
+    lambda a: BVRor(a, 3),
+]
+# edge cases of 64-bit values: zero, one, the signed minimum and -1
+EDGE_VALUES = [0, 1, 5, 63, 64, 1 << 63, (1 << 64) - 1, (1 << 64) - 7]
+
+
+@pytest.mark.parametrize("name", UNSAFE)
+def test_unsafe(check, name):
+    expected = "unknown" if name in NOT_SIMULATED else "unsafe"
+    assert check(example(name), "-m", "sim") == expected
+
+
+@pytest.mark.parametrize("name", [n for n in EXPECTED if EXPECTED[n] == "safe"])
+def test_safe(check, name):
+    assert check(example(name), "-m", "sim") == "unknown"
+
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_prepass(check, name):
+    verdict = check(example(name), "-m", "kind", "--sim-prepass")
+    assert verdict == EXPECTED[name]
+
+
+@pytest.mark.parametrize("name", ["QF_ABV/count2", "QF_NRA/NonlinearGrowth"])
+def test_witness(check, tmp_path, name):
+    _check_witness(check, tmp_path, name, ["-m", "sim"])
+
+
+def _pairs(values: list) -> list:
+    return [[a for a in values for _ in values], [b for _ in values for b in values]]
+
+
+def _check_evaluation(formula, symbols: list, columns: list) -> None:
+    """The evaluation of the formula on all rows agrees with pySMT"""
+    evaluator = simulation._Evaluator(len(columns[0]))
+    env = {s: np.array(c, dtype=np.uint64) for s, c in zip(symbols, columns)}
+    res = evaluator.evaluate(formula, env)
+    for i, row in enumerate(zip(*columns)):
+        subs = {s: BV(v, s.bv_width()) for s, v in zip(symbols, row)}
+        expected = formula.substitute(subs).simplify()
+        if expected.is_bool_constant():
+            assert bool(res[i]) == expected.constant_value(), (formula, row)
+        else:
+            assert int(res[i]) == expected.constant_value(), (formula, row)
+
+
+@pytest.mark.parametrize("operation", BINARY)
+def test_bv_binary(operation):
+    reset_env()
+    for width, values in [(4, range(16)), (64, EDGE_VALUES)]:
+        if operation is BVConcat and width == 64:
+            continue
+        a, b = Symbol(f"a{width}", BVType(width)), Symbol(f"b{width}", BVType(width))
+        _check_evaluation(operation(a, b), [a, b], _pairs(list(values)))
+
+
+@pytest.mark.parametrize("operation", UNARY)
+def test_bv_unary(operation):
+    reset_env()
+    a = Symbol("a", BVType(4))
+    _check_evaluation(operation(a), [a], [list(range(16))])
+
+
+def test_solver_resumption():
+    """Traces that no random values continue are resumed by the solver"""
+    reset_env()
+    pytest.importorskip(SOLVER)
+    x = Symbol("x", INT)
+    # x starts at 5001 or 5002 and grows by 3001 per step
+    init = And(GT(x, Int(5000)), LT(x, Int(5003)))
+    trans = And(
+        GT(next_var(x), Plus(x, Int(3000))), LT(next_var(x), Plus(x, Int(3002)))
+    )
+    system = TransitionSystem.from_formulas(
+        "main", "QF_LIA", [x], [], init, trans, TRUE()
+    )
+    prop = LT(x, Int(20000))
+    checker = simulation.RandomSimulation(system, SOLVER, traces=100, max_steps=10)
+    assert checker.check_properties([prop]) == [False]
+    assert checker.solver_calls > 0
+    trace = checker.traces[prop]
+    assert len(trace) == 6
+    assert int(trace[-1][0]) >= 20000
@@ -0,0 +1,44 @@
+import json
+import pytest
+from moxichecker.stats import STATS
+from tests.examples import example
+
+
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    """Restores the global statistics after each test"""
+    monkeypatch.setattr(STATS, "enabled", False)
+    monkeypatch.setattr(STATS, "values", {})
+    monkeypatch.setattr(STATS, "events", [])
+    monkeypatch.setattr(STATS, "_stream", None)
+
+
+@pytest.mark.parametrize("options", [[], ["--incr-solving"]])
+def test_json(check, options):
+    check(example("QF_LIA/IntCounter_reach"), *options, "--stats", "json")
+    assert STATS.values["verdicts"] == {"rch_1": False}
+    assert STATS.values["num_queries"] == 1
+    assert {event["event"] for event in STATS.events} == {"bmc", "ind", "unrolling"}
+
+
+def test_pdr(check):
+    check(example("QF_LIA/IntCounter_unreach"), "-m", "pdr", "--stats", "json")
+    assert STATS.values["verdicts"] == {"rch_1": True}
+    frames = [event for event in STATS.events if event["event"] == "pdr_frame"]
+    assert STATS.values["pdr_frames"] == frames[-1]["frame"]
+
+
+def test_jsonl(check, capsys):
+    check(example("QF_LIA/IntCounter_reach"), "--preprocess", "--stats", "jsonl")
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines
+    assert {line["event"] for line in lines} == {"bmc", "ind", "unrolling"}
+    # the events are written when they happen instead of being kept
+    assert not STATS.events
+    assert "preprocessing_time" in STATS.values
+
+
+def test_disabled(check, capsys):
+    check(example("QF_LIA/IntCounter_reach"))
+    assert not capsys.readouterr().out
+    assert not STATS.values and not STATS.events
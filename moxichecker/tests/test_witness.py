@@ -0,0 +1,65 @@
+import io
+import json
+import pytest
+from pysmt.smtlib.parser import SmtLibParser, Tokenizer
+from tests.examples import UNSAFE, example, read_system
+from tests.test_pdr import DECIDED
+
+ALGORITHMS = [
+    ["-m", "bmc"],
+    ["-m", "bmc", "--incr-solving"],
+    ["-m", "kind", "--parallel-kind"],
+    ["-m", "portfolio"],
+]
+# PDR only on the examples it decides, DoubleDelay2 only with lifted cubes
+PDR_CASES = [
+    (name, options)
+    for options in [["-m", "pdr"], ["-m", "pdr", "--no-lifting"]]
+    for name in UNSAFE
+    if name in DECIDED
+] + [("QF_LRA/DoubleDelay2", ["-m", "pdr"])]
+
+
+def _parse_value(text: str):
+    # the parser only reads applications
+    term = SmtLibParser().get_expression(
+        Tokenizer(io.StringIO(f"(ite true {text} {text})"))
+    )
+    return term.simplify()
+
+
+def _check_trace(path, header: dict, steps: list) -> None:
+    """Checks that the trace is a path of the system that reaches the query"""
+    system, query = read_system(path)
+    assert header["variables"] == [v.symbol_name() for v in system.variables]
+    states = [
+        dict(zip(system.variables, [_parse_value(value) for value in step]))
+        for step in steps
+    ]
+    assert system.init.substitute(states[0]).simplify().is_true()
+    for state, succ in zip(states, states[1:]):
+        subs = {**state, **{system.prime_map[v]: value for v, value in succ.items()}}
+        assert system.trans.substitute(subs).simplify().is_true()
+    for state in states:
+        assert system.inv.substitute(state).simplify().is_true()
+    assert query.substitute(states[-1]).simplify().is_true()
+
+
+def _check_witness(check, tmp_path, name, options) -> None:
+    witness = tmp_path / "witness.jsonl"
+    assert check(example(name), *options, "--witness", str(witness)) == "unsafe"
+    with open(witness) as f:
+        header, *steps = [json.loads(line) for line in f]
+    assert header["steps"] == len(steps)
+    _check_trace(example(name), header, steps)
+
+
+@pytest.mark.parametrize("options", ALGORITHMS)
+@pytest.mark.parametrize("name", UNSAFE)
+def test_witness(check, tmp_path, name, options):
+    _check_witness(check, tmp_path, name, options)
+
+
+@pytest.mark.parametrize(("name", "options"), PDR_CASES)
+def test_pdr_witness(check, tmp_path, name, options):
+    _check_witness(check, tmp_path, name, options)